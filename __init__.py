@@ -0,0 +1,17 @@
+"""phyvista : extension of pyvista for the creation of 3D illustrations for physics.
+
+Submodules are imported lazily, when first accessed (e.g. 'phyvista.light'), so that importing phyvista stays fast.
+"""
+import importlib
+
+SUBMODULES = ("animation","cache","colors","compositing","constructors","core","export","lattices","light","materials","optics","parallel","profiling","quality","raytracing","scene","serialization")
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module("phyvista."+name)
+    if name == "profile":
+        return importlib.import_module("phyvista.profiling").profile
+    raise AttributeError(f"module 'phyvista' has no attribute '{name}'")
+
+def __dir__():
+    return sorted(list(globals().keys())+list(SUBMODULES)+["profile"])
@@ -0,0 +1,52 @@
+import time
+import numpy as np
+from phyvista.core import *
+
+def animate(plotter,frames,fps=30,filename=None,interactive=True):
+    """Runs a frame loop, rendering the scene after each frame.
+
+    The geometry is typically updated in place by the frames generator, through the handles returned by Plotter.add (see core.Handle), so that each frame only overwrites point arrays or actor matrices. Example :
+
+        handle = plotter.add(crystal,(-5,5),(-5,5),(-5,5),instanced=True)
+        def frames():
+            for t in np.linspace(0,1,100):
+                handle.translate(amplitude*np.sin(2*np.pi*t)*polarization)
+                yield t
+        animate(plotter,frames())
+
+    Args:
+        plotter (pyvista.Plotter)
+        frames (iterable): Iterable (e.g. generator) doing the updates of each frame before yielding it. The yielded values are ignored.
+        fps (float, optional): Maximal number of frames per second. If None, the frames are rendered as fast as possible. Defaults to 30.
+        filename (str, optional): If given, the frames are also written to this file, as a gif (.gif extension) or a movie (see pyvista.Plotter.open_movie). Defaults to None.
+        interactive (bool, optional): If True (and the plotter is not off-screen), the window is shown and kept responsive during the animation. Defaults to True.
+    """
+    if filename != None:
+        if filename.endswith(".gif"):
+            plotter.open_gif(filename,fps=fps or 30)
+        else:
+            plotter.open_movie(filename,framerate=fps or 30)
+    if interactive and not plotter.off_screen:
+        plotter.show(interactive_update=True)
+    period = 0 if fps == None else 1/fps
+    next_time = time.perf_counter()
+    for frame in frames:
+        if interactive and not plotter.off_screen:
+            plotter.update()
+        else:
+            plotter.render()
+        if filename != None:
+            plotter.write_frame()
+        next_time += period
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        else: # Late : the next frames are not sped up to catch up
+            next_time = time.perf_counter()
+
+def oscillation(amplitudes,frequency=1.0,duration=1.0,fps=30,phases=0.0):
+    """Yields the times and the sinusoidal displacements amplitudes*sin(2*pi*frequency*t + phases) at each frame (e.g. for phonons, with amplitudes of shape (n_instances,3) given to Handle.translate)."""
+    amplitudes = np.asarray(amplitudes,dtype=np.float64)
+    phases = np.broadcast_to(np.asarray(phases,dtype=np.float64),amplitudes.shape[:-1])[...,None] # One phase per displacement vector
+    for t in np.arange(int(round(duration*fps)))/fps:
+        yield t,amplitudes*np.sin(2*np.pi*frequency*t + phases)
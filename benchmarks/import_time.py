@@ -0,0 +1,46 @@
+"""Measures the import time of phyvista and of its submodules, and checks it against a time budget.
+
+Each import is timed in a fresh interpreter (median of several runs). As phyvista depends on pyvista, the budget of the submodules applies to the time spent on top of 'import pyvista'.
+
+Usage (from the directory containing the phyvista package) :
+    python -m phyvista.benchmarks.import_time [--runs 5]
+Exits with status 1 if a budget is exceeded.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+BUDGET_PACKAGE = 0.05 # 'import phyvista' alone (s)
+BUDGET_SUBMODULE = 0.3 # Time on top of 'import pyvista' (s)
+SUBMODULES = ("core","animation","materials","constructors","colors","lattices","optics","light","cache","serialization","parallel","profiling","quality","raytracing","compositing","export","scene")
+
+def importTime(module,runs):
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter()-t)"
+    return statistics.median(float(subprocess.run([sys.executable,"-c",code],capture_output=True,text=True,check=True).stdout.split()[-1]) for i in range(runs))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs",type=int,default=5)
+    args = parser.parse_args()
+
+    exceeded = []
+    pyvista_time = importTime("pyvista",args.runs)
+    package_time = importTime("phyvista",args.runs)
+    print(f"{'module':26s} {'time (s)':>9s} {'overhead (s)':>13s} {'budget (s)':>11s}")
+    print(f"{'pyvista':26s} {pyvista_time:9.3f}")
+    print(f"{'phyvista':26s} {package_time:9.3f} {package_time:13.3f} {BUDGET_PACKAGE:11.3f}")
+    if package_time > BUDGET_PACKAGE:
+        exceeded.append("phyvista")
+    for submodule in SUBMODULES:
+        name = "phyvista."+submodule
+        total = importTime(name,args.runs)
+        print(f"{name:26s} {total:9.3f} {total-pyvista_time:13.3f} {BUDGET_SUBMODULE:11.3f}")
+        if total-pyvista_time > BUDGET_SUBMODULE:
+            exceeded.append(name)
+    if exceeded:
+        print("Import time budget exceeded :",", ".join(exceeded))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Benchmarks of phyvista's hot paths, parameterized by scale.
+
+Each benchmark builds geometry and adds it to a headless plotter (a recording mock plotter by default, or an off-screen pyvista.Plotter), and records :
+wall time (best of several repeats), peak memory allocated through Python/numpy (tracemalloc), number of actors, and total number of points and cells added.
+
+Usage (from the directory containing the phyvista package) :
+    python -m phyvista.benchmarks.run_benchmarks [--scale small|medium|large] [--precision double|single] [--offscreen] [--save] [--compare] [--tolerance 0.5]
+
+Baselines are stored in baselines.json next to this file, by scale.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+import pyvista as pv
+from phyvista.core import *
+from phyvista import cache, colors, light, optics, quality
+from phyvista import lattices as lat
+from phyvista import materials as mat
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),"baselines.json")
+
+SCALES = {
+    "small":{"lattice_size":2,"beam_resolution":10,"element_count":100,"wavelength_count":1000},
+    "medium":{"lattice_size":5,"beam_resolution":25,"element_count":1000,"wavelength_count":100000},
+    "large":{"lattice_size":10,"beam_resolution":50,"element_count":10000,"wavelength_count":1000000},
+}
+
+class RecordingActor:
+    def __init__(self,grid):
+        self.grid = grid
+        self.user_matrix = np.eye(4)
+
+class RecordingPlotter:
+    """Mock plotter recording the added grids instead of rendering them."""
+    add = add # Same 'add' method as pyvista.Plotter, added by phyvista.core
+
+    def __init__(self):
+        self.recorded = []
+
+    def add_mesh(self,grid,**kwargs):
+        self.recorded.append(RecordingActor(grid))
+        return self.recorded[-1]
+
+    def add_volume(self,grid,**kwargs):
+        return self.add_mesh(grid)
+
+    def counts(self):
+        return len(self.recorded),sum(actor.grid.n_points for actor in self.recorded),sum(actor.grid.n_cells for actor in self.recorded)
+
+class OffScreenPlotter(pv.Plotter):
+    def __init__(self):
+        super().__init__(off_screen=True)
+
+    def counts(self):
+        actors = [actor for actor in self.actors.values() if getattr(actor,"mapper",None) != None and actor.mapper.dataset != None]
+        return len(self.actors),sum(actor.mapper.dataset.n_points for actor in actors),sum(actor.mapper.dataset.n_cells for actor in actors)
+
+def NaClCrystal():
+    salt = lat.Crystal(ORIGIN,[U_X,U_Y,U_Z])
+    salt.addElement(Element(pv.Sphere(radius=0.3),mat.SmoothMaterial("lime")),[(0,0,0),(0.5,0.5,0),(0,0.5,0.5),(0.5,0,0.5)])
+    salt.addElement(Element(pv.Sphere(radius=0.2),mat.SmoothMaterial("purple")),[(0.5,0,0),(0,0.5,0),(0,0,0.5),(0.5,0.5,0.5)])
+    return salt
+
+def benchCylindricalVolumeGrid(plotter,params):
+    n = params["beam_resolution"]
+    grid = light.CylindricalVolumeGrid(ORIGIN,U_X,lambda p:0.5+0*p,resolution_height=n,resolution_radius=n,resolution_theta=2*n)
+    plotter.add(grid,"red")
+
+def benchVolumicBeams(backend):
+    def bench(plotter,params):
+        for i in range(params["element_count"]//10): # Beams clipped on both ends, as between optics elements
+            plotter.add(light.StraightBeam((i,0,0),(i,5,0),0.3,style="semirealistic",backend=backend,clipping_normal_start=U_Y+U_Z,clipping_normal_end=U_Y-U_X))
+    return bench
+
+def benchCrystal(mode):
+    def bench(plotter,params):
+        n = params["lattice_size"]
+        plotter.add(NaClCrystal(),(-n,n),(-n,n),(-n,n),**({mode:True} if mode else {}))
+    return bench
+
+def benchBiconvexLens(plotter,params):
+    plotter.add(optics.BiconvexLensGrid((0,0,0),U_X,0.5,1,minimum_width=0.05),"lightblue")
+
+def benchGroupTransforms(plotter,params):
+    group = Group([Element(pv.Sphere(radius=0.1,center=(i,0,0)),"red") for i in range(params["element_count"])])
+    group = group.translate(U_Y).rotate_z(30).rotate_x(10,point=U_Z).translate(-U_Y)
+    plotter.add(group)
+
+def benchFromWavelength(plotter,params):
+    colors.fromWavelength(np.linspace(380,780,params["wavelength_count"]))
+
+BENCHMARKS = {
+    "CylindricalVolumeGrid":benchCylindricalVolumeGrid,
+    "StraightBeam(unstructured)":benchVolumicBeams("unstructured"),
+    "StraightBeam(image)":benchVolumicBeams("image"),
+    "Crystal.plotSelf":benchCrystal(None),
+    "Crystal.plotSelf(instanced)":benchCrystal("instanced"),
+    "Crystal.plotSelf(batched)":benchCrystal("batched"),
+    "BiconvexLensGrid":benchBiconvexLens,
+    "Group transforms":benchGroupTransforms,
+    "colors.fromWavelength":benchFromWavelength,
+}
+
+def run(name,params,offscreen=False,repeats=3):
+    """Runs a benchmark and returns its measurements as a dictionnary."""
+    bench = BENCHMARKS[name]
+    times = []
+    for i in range(repeats):
+        cache.clearCache() # Each repeat pays the full cost
+        plotter = OffScreenPlotter() if offscreen else RecordingPlotter()
+        tracemalloc.start()
+        start = time.perf_counter()
+        bench(plotter,params)
+        times.append(time.perf_counter()-start)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        actors,points,cells = plotter.counts()
+        if offscreen:
+            plotter.close()
+    return {"time":min(times),"peak_memory":peak,"actors":actors,"points":points,"cells":cells}
+
+def compare(results,baselines,tolerance):
+    """Returns the list of regressions (strings) of the results with respect to the baselines."""
+    regressions = []
+    for name,result in results.items():
+        if name not in baselines:
+            continue
+        base = baselines[name]
+        for key in ("time","peak_memory"):
+            if result[key] > base[key]*(1+tolerance):
+                regressions.append(f"{name} : {key} {result[key]:.4g} > {base[key]:.4g} (baseline)")
+        for key in ("actors","points","cells"):
+            if result[key] > base[key]:
+                regressions.append(f"{name} : {key} {result[key]} > {base[key]} (baseline)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale",choices=SCALES.keys(),default="small")
+    parser.add_argument("--precision",choices=quality.PRECISIONS.keys(),default="double",help="precision of the generated grids (see phyvista.quality.setPrecision)")
+    parser.add_argument("--offscreen",action="store_true",help="use an off-screen pyvista.Plotter instead of a recording mock plotter")
+    parser.add_argument("--only",nargs="*",help="names of the benchmarks to run (default : all)")
+    parser.add_argument("--repeats",type=int,default=3)
+    parser.add_argument("--save",action="store_true",help="store the results as the new baselines for this scale")
+    parser.add_argument("--compare",action="store_true",help="compare the results to the stored baselines, exit with status 1 on regression")
+    parser.add_argument("--tolerance",type=float,default=0.5,help="relative tolerance on time and memory for --compare")
+    args = parser.parse_args()
+
+    params = SCALES[args.scale]
+    quality.setPrecision(args.precision)
+    results = {}
+    print(f"{'benchmark':30s} {'time (s)':>10s} {'peak (MB)':>10s} {'actors':>8s} {'points':>10s} {'cells':>10s}")
+    for name in (args.only or BENCHMARKS.keys()):
+        results[name] = result = run(name,params,args.offscreen,args.repeats)
+        print(f"{name:30s} {result['time']:10.4f} {result['peak_memory']/1e6:10.2f} {result['actors']:8d} {result['points']:10d} {result['cells']:10d}")
+
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH) as file:
+            baselines = json.load(file)
+    if args.compare:
+        regressions = compare(results,baselines.get(args.scale,{}),args.tolerance)
+        for regression in regressions:
+            print("REGRESSION",regression)
+        if regressions:
+            sys.exit(1)
+    if args.save:
+        baselines.setdefault(args.scale,{}).update(results)
+        with open(BASELINES_PATH,"w") as file:
+            json.dump(baselines,file,indent=2,sort_keys=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Checks that the scenes rendered with single-precision grids look the same as in double precision (see phyvista.quality.setPrecision).
+
+Each scene is built and rendered off-screen once per precision, and the two screenshots are compared with pyvista.compare_images.
+
+Usage (from the directory containing the phyvista package) :
+    python -m phyvista.benchmarks.visual_check [--threshold 10] [--save DIRECTORY]
+Exits with status 1 if the images of a scene differ by more than the threshold.
+"""
+import argparse
+import os
+import sys
+import numpy as np
+import pyvista as pv
+from phyvista.core import *
+from phyvista import cache, light, optics, quality
+from phyvista import lattices as lat
+from phyvista import materials as mat
+
+WINDOW_SIZE = (600,400)
+
+def latticeScene(plotter):
+    salt = lat.Crystal(ORIGIN,[U_X,U_Y,U_Z])
+    salt.addNewElement(pv.Sphere(radius=0.3),mat.SmoothMaterial("lime"),[(0,0,0),(0.5,0.5,0),(0,0.5,0.5),(0.5,0,0.5)],species="Cl")
+    salt.addNewElement(pv.Sphere(radius=0.2),mat.SmoothMaterial("purple"),[(0.5,0,0),(0,0.5,0),(0,0,0.5),(0.5,0.5,0.5)],species="Na")
+    plotter.add(salt.bonds((-2,2),(-2,2),(-2,2),cutoff=0.55,radius=0.05))
+    plotter.add(salt,(-2,2),(-2,2),(-2,2),instanced=True)
+
+def opticsScene(plotter):
+    mirror = optics.Mirror((0,0,0),(1,1,0),radius=0.6)
+    splitter = optics.CubicSplitter((0,3,0),U_Y,U_X,size=0.8)
+    lens = optics.BiconvexLens((4,3,0),(1,0,0),0.6,2,minimum_width=0.05)
+    plotter.add(Group([mirror,splitter,lens]))
+    plotter.add(light.StraightBeam((-4,0,0),mirror,0.2,style="semirealistic"))
+    plotter.add(light.StraightBeam(mirror,splitter,0.2,style="semirealistic"))
+    plotter.add(light.StraightBeam(splitter,(4,3,0),0.2,style="semirealistic",backend="image"))
+    plotter.add(light.FocusedBeam((4,3,0),(8,3,0),0.5,starting_radius=0.2,style="semirealistic"))
+
+def orbsScene(plotter):
+    for i,color in enumerate(("red","green","blue")):
+        plotter.add(light.GlowingOrb((1.5*i,0,0),0.8,color))
+
+SCENES = {"lattice":latticeScene,"optics":opticsScene,"orbs":orbsScene}
+
+def imageData(image):
+    """Wraps a screenshot (array of shape (height,width,3)) into an ImageData, as expected by pyvista.compare_images."""
+    grid = pv.ImageData(dimensions=(image.shape[1],image.shape[0],1))
+    grid.point_data["rgb"] = image[::-1].reshape(-1,image.shape[2])
+    return grid
+
+def render(scene,precision):
+    """Returns the screenshot of the scene built with the given precision."""
+    quality.setPrecision(precision)
+    cache.clearCache()
+    plotter = pv.Plotter(off_screen=True,window_size=WINDOW_SIZE)
+    SCENES[scene](plotter)
+    plotter.view_isometric()
+    image = plotter.screenshot(return_img=True)
+    plotter.close()
+    return image
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threshold",type=float,default=10.0,help="maximum error returned by pyvista.compare_images (volumes may differ slightly in their sampling)")
+    parser.add_argument("--save",help="directory where the screenshots are saved")
+    args = parser.parse_args()
+
+    failed = []
+    print(f"{'scene':10s} {'error':>8s} {'differing pixels (%)':>21s}")
+    for scene in SCENES:
+        double,single = render(scene,"double"),render(scene,"single")
+        error = pv.compare_images(imageData(double),imageData(single))
+        differing = 100*np.mean(np.any(np.abs(double.astype(int)-single.astype(int)) > 8,axis=-1))
+        print(f"{scene:10s} {error:8.3f} {differing:21.3f}")
+        if args.save:
+            os.makedirs(args.save,exist_ok=True)
+            for precision,image in (("double",double),("single",single)):
+                imageData(image).save(os.path.join(args.save,f"{scene}_{precision}.png"))
+        if error > args.threshold:
+            failed.append(scene)
+    quality.setPrecision("double")
+    if failed:
+        print("DIFFERENT",", ".join(failed))
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
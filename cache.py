@@ -0,0 +1,247 @@
+import functools
+import hashlib
+import inspect
+import os
+import shutil
+import time
+import zlib
+from collections import OrderedDict
+import numpy as np
+import pyvista as pv
+from phyvista.profiling import recordCopy
+from phyvista.quality import qualityState
+
+class GeometryCache:
+    """Bounded LRU cache of built geometries, keyed on normalized constructor arguments."""
+    def __init__(self,maxsize=256):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self,key,build):
+        """Returns the geometry stored for key, building (and storing) it with build() if needed."""
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        value = build()
+        self.entries[key] = value
+        self.shrink()
+        return value
+
+    def shrink(self):
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def resize(self,maxsize):
+        self.maxsize = maxsize
+        self.shrink()
+
+    def evict(self,key):
+        """Removes the entry for key. Returns True if there was one."""
+        if key in self.entries:
+            del self.entries[key]
+            self.evictions += 1
+            return True
+        return False
+
+    def clear(self):
+        self.evictions += len(self.entries)
+        self.entries.clear()
+
+    def stats(self):
+        return {"hits":self.hits,"misses":self.misses,"evictions":self.evictions,"size":len(self.entries),"maxsize":self.maxsize}
+
+GEOMETRY_CACHE = GeometryCache()
+
+def normalizedArgument(value):
+    """Converts an argument to a hashable value, equal for arguments describing the same geometry (e.g. a tuple and a numpy array with the same values)."""
+    if isinstance(value,(np.ndarray,list,tuple)):
+        array = np.asarray(value)
+        if array.dtype != object:
+            return (array.shape,tuple(array.ravel().tolist()))
+        return tuple(normalizedArgument(v) for v in value)
+    if isinstance(value,dict):
+        return tuple(sorted((key,normalizedArgument(v)) for key,v in value.items()))
+    if isinstance(value,np.generic):
+        return value.item()
+    return value
+
+def argumentsKey(func,signature,args,kwargs):
+    """Returns a hashable key identifying a call to func, from its normalized arguments (defaults included) and the quality settings (which may change the default resolutions)."""
+    bound = signature.bind(*args,**kwargs)
+    bound.apply_defaults()
+    return (func.__module__,func.__qualname__,normalizedArgument(bound.arguments),qualityState())
+
+def arrayViews(grid):
+    """Returns numpy views of the explicit points and of the numeric point and cell data arrays of grid."""
+    views = [np.asarray(grid.points)] if grid.GetPoints() != None else []
+    for data in (grid.point_data,grid.cell_data):
+        views += [array for array in (np.asarray(data[name]) for name in data.keys()) if array.dtype != object]
+    return views
+
+def arraysChecksum(views):
+    checksum = 0
+    for view in views:
+        checksum = zlib.crc32(np.ascontiguousarray(view),checksum)
+    return checksum
+
+def memoized(func):
+    """Decorator caching the grids returned by a geometry constructor in GEOMETRY_CACHE.
+
+    The decorated function returns a shallow copy of the cached grid : it can be transformed, clipped... (including inplace) without modifying the cache, but its point and cell arrays are shared.
+    To write into them, call it with copy=True, which returns an independent deep copy instead. Writing into the arrays of a shared grid is detected at the next call with the same arguments, which raises a RuntimeError and drops the modified entry.
+    Calls with unhashable arguments bypass the cache.
+    """
+    signature = inspect.signature(func)
+
+    def key(*args,**kwargs):
+        return argumentsKey(func,signature,args,kwargs)
+
+    @functools.wraps(func)
+    def wrapper(*args,copy=False,**kwargs):
+        try:
+            call_key = key(*args,**kwargs)
+            hash(call_key)
+        except TypeError: # Unhashable argument
+            return func(*args,**kwargs)
+        def build():
+            grid = func(*args,**kwargs)
+            views = arrayViews(grid)
+            return grid,views,arraysChecksum(views)
+        grid,views,checksum = GEOMETRY_CACHE.get(call_key,build)
+        if arraysChecksum(views) != checksum: # numpy and VTK ignore the writeable flag of the arrays wrapped by pyvista : writes can only be detected afterwards
+            GEOMETRY_CACHE.evict(call_key)
+            raise RuntimeError(f"The arrays of a grid returned by {func.__qualname__} were modified, which modified all the grids it returned : call it with copy=True to get a grid that can be written to")
+        if copy:
+            start = time.perf_counter()
+            grid = grid.copy(deep=True)
+            recordCopy(func.__qualname__+" (cached copy)",grid,start)
+            return grid
+        return grid.copy(deep=False)
+
+    def evict(*args,**kwargs):
+        """Removes the cached grid built with these arguments."""
+        return GEOMETRY_CACHE.evict(key(*args,**kwargs))
+
+    wrapper.evict = evict
+    return wrapper
+
+def cacheStats():
+    """Returns the number of hits, misses and evictions of the geometry cache, as well as its current and maximum size."""
+    return GEOMETRY_CACHE.stats()
+
+def clearCache():
+    GEOMETRY_CACHE.clear()
+
+def setCacheSize(maxsize):
+    """Sets the maximum number of grids kept in the geometry cache (least recently used ones are evicted first)."""
+    GEOMETRY_CACHE.resize(maxsize)
+
+class DiskCache:
+    """Persistent cache of grids, Elements and Groups, stored in a directory with one subdirectory per entry (see serialization.save).
+    Least recently used entries are removed when the total size or number of entries exceeds the limits.
+    """
+    def __init__(self,directory,max_bytes=2**30,max_entries=1000):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory,exist_ok=True)
+
+    def get(self,key,build):
+        """Returns the object stored for key (a hash string), loading it with memory-mapped arrays, or builds and stores it with build()."""
+        from phyvista.serialization import save,load
+        path = os.path.join(self.directory,key)
+        if os.path.isdir(path):
+            try:
+                obj = load(path)
+                os.utime(path) # Marks the entry as recently used
+                self.hits += 1
+                return obj
+            except Exception: # Corrupted or incompatible entry : rebuilt
+                shutil.rmtree(path,ignore_errors=True)
+        self.misses += 1
+        obj = build()
+        save(obj,path)
+        self.shrink()
+        return obj
+
+    def entries(self):
+        """Returns the list of (last use time, size in bytes, path) of the entries, least recently used first. The directories of entries still being saved are ignored."""
+        from phyvista.serialization import TEMPORARY_PREFIX
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory,name)
+            if os.path.isdir(path) and not name.startswith(TEMPORARY_PREFIX):
+                size = sum(entry.stat().st_size for entry in os.scandir(path))
+                entries.append((os.stat(path).st_mtime,size,path))
+        return sorted(entries)
+
+    def shrink(self):
+        entries = self.entries()
+        total = sum(size for mtime,size,path in entries)
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            mtime,size,path = entries.pop(0)
+            shutil.rmtree(path,ignore_errors=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self):
+        for mtime,size,path in self.entries():
+            shutil.rmtree(path,ignore_errors=True)
+            self.evictions += 1
+
+    def stats(self):
+        entries = self.entries()
+        return {"hits":self.hits,"misses":self.misses,"evictions":self.evictions,"size":len(entries),"bytes":sum(size for mtime,size,path in entries),"max_entries":self.max_entries,"max_bytes":self.max_bytes}
+
+DISK_CACHE = DiskCache(os.environ["PHYVISTA_CACHE_DIR"]) if "PHYVISTA_CACHE_DIR" in os.environ else None
+
+def setDiskCache(directory,max_bytes=2**30,max_entries=1000):
+    """Enables the persistent cache of the functions decorated with 'persistent', in the given directory. If directory is None, disables it.
+    It can also be enabled by setting the environment variable PHYVISTA_CACHE_DIR.
+    """
+    global DISK_CACHE
+    DISK_CACHE = None if directory == None else DiskCache(directory,max_bytes,max_entries)
+    return DISK_CACHE
+
+@functools.lru_cache(maxsize=None)
+def libraryVersion():
+    """Returns a hash of the phyvista sources and of the versions of pyvista, VTK and numpy, which invalidates the persistent cache entries when any of them changes."""
+    h = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(".py"):
+            with open(os.path.join(directory,name),"rb") as file:
+                h.update(name.encode()+file.read())
+    h.update(f"{pv.__version__} {pv.vtk_version_info} {np.__version__}".encode())
+    return h.hexdigest()
+
+def isPlain(value):
+    """Returns True if the (normalized) value only contains numbers, strings, booleans and None, so that its repr is the same from one run to the other."""
+    if isinstance(value,tuple):
+        return all(isPlain(v) for v in value)
+    return value is None or isinstance(value,(bool,int,float,str,bytes))
+
+def persistent(func):
+    """Decorator storing the grids, Elements or Groups returned by a function in the persistent DISK_CACHE (if enabled, see setDiskCache).
+    Entries are keyed on a hash of the function name, its normalized arguments, the current pyvista theme and the library version. Calls with other arguments than numbers, strings and arrays bypass the cache.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args,**kwargs):
+        if DISK_CACHE == None:
+            return func(*args,**kwargs)
+        key = argumentsKey(func,signature,args,kwargs) + (pv.global_theme.name,libraryVersion())
+        if not isPlain(key):
+            return func(*args,**kwargs)
+        return DISK_CACHE.get(hashlib.sha256(repr(key).encode()).hexdigest(),lambda: func(*args,**kwargs))
+    return wrapper
@@ -1,56 +1,80 @@
 import numpy as np
+import functools
 
-def fromWavelength(wavelength: float) -> str:
+def fromWavelength(wavelength):
     """Returns an approximate color corresponding to the given light wavelength
 
     Args:
-        wavelength (float): wavelength (nm)
+        wavelength (float or array of floats): wavelength (nm)
 
     Returns:
-        str: color in RGB hex notation, in sRGB color space
+        str (or list of str for an array of wavelengths): color in RGB hex notation, in sRGB color space
     """
-    r,g,b = CIEXYZtosRGB(wavelengthToCIEXYZ(wavelength))
-    return fromRGB(r,g,b)
+    RGB = CIEXYZtosRGB(wavelengthToCIEXYZ(wavelength))
+    return fromRGB(RGB[...,0],RGB[...,1],RGB[...,2])
 
-def fromRGB(r: float,g: float,b: float) -> str:
+def fromRGB(r,g,b):
     """
-    Converts an r,g,b float values (between 0 and 1) to a usable hex color string
+    Converts an r,g,b float values (between 0 and 1) to a usable hex color string.
+    If arrays of values are given, returns a list of color strings.
     """
-    return '#%02x%02x%02x' % (int(255*r),int(255*g),int(255*b))
+    RGB = (255*np.stack(np.broadcast_arrays(r,g,b),axis=-1)).astype(int)
+    if RGB.ndim == 1:
+        return '#%02x%02x%02x' % tuple(RGB)
+    return ['#%02x%02x%02x' % tuple(c) for c in RGB.reshape(-1,3)]
 
 def CIEXYZtosRGB(XYZ:np.array) -> np.array:
+    """Converts CIE XYZ colors (array of shape (...,3)) to sRGB colors (floats between 0 and 1, same shape)."""
     matrix = np.array([3.2406,-1.5372,-0.4986,-0.9689,1.8758,0.0415,0.0557,-0.204,1.057]).reshape((3,3))
-    RGB_linear = matrix @ XYZ
-    def unlinearize(c):# Unlinearize and clamp
-        if c <= 0.0031308:
-            v = 12.92*c
-        else:
-            v = 1.055*np.power(c,1/2.4)-0.055
-        return min(1,max(v,0))# This clamping leads to a very simple approximation of the real color that could be improved.
-    RGB = np.array([unlinearize(c) for c in RGB_linear])
-    return RGB
-
-def wavelengthToCIEXYZ(wavelength: float) -> np.array:
+    RGB_linear = np.asarray(XYZ) @ matrix.T
+    # Unlinearize and clamp
+    RGB = np.where(RGB_linear <= 0.0031308, 12.92*RGB_linear, 1.055*np.power(np.maximum(RGB_linear,0.0031308),1/2.4)-0.055)
+    return np.clip(RGB,0,1)# This clamping leads to a very simple approximation of the real color that could be improved.
+
+def wavelengthToCIEXYZ(wavelength) -> np.array:
     """Returns the CIE XYZ color for a monochromatic light. 
     Approximation taken from : Wyman, Chris; Sloan, Peter-Pike; Shirley, Peter (July 12, 2013). "Simple Analytic Approximations to the CIE XYZ Color Matching Functions". Journal of Computer Graphics Techniques.
 
     Args:
-        wavelength (float): Wavelength (nm)
+        wavelength (float or array of floats): Wavelength (nm)
 
     Returns:
-        numpy array (3D vector): X,Y,Z components of the CIE XYZ color
+        numpy array of shape (...,3): X,Y,Z components of the CIE XYZ color
     """
     g = piecewiseGaussian # Just a shorthand
+    wavelength = np.asarray(wavelength,dtype=np.float64)
     x = 1.056*g(wavelength,599.8,0.0264,0.0323) + 0.362*g(wavelength,442,0.0624,0.0374) - 0.065*g(wavelength,501.1,0.049,0.0382)
     y = 0.821*g(wavelength,568.8,0.0213,0.0247) + 0.286*g(wavelength,530.9,0.0613,0.0322)
     z = 1.217*g(wavelength,437.0,0.0845,0.0278) + 0.681*g(wavelength,459,0.0385,0.0725)
-    return np.array((x,y,z))
+    return np.stack((x,y,z),axis=-1)
+
+@functools.lru_cache(maxsize=None)
+def spectralLUT(start=360.0,stop=830.0,step=0.1):
+    """Returns a (cached, read-only) lookup table of sRGB colors of monochromatic lights.
+
+    Returns:
+        (numpy array of shape (N,), numpy array of shape (N,3)): wavelengths (nm) and corresponding sRGB colors (floats between 0 and 1)
+    """
+    wavelengths = np.arange(start,stop+step/2,step)
+    RGB = CIEXYZtosRGB(wavelengthToCIEXYZ(wavelengths))
+    wavelengths.flags.writeable = False
+    RGB.flags.writeable = False
+    return wavelengths,RGB
+
+def wavelengthToRGB(wavelength) -> np.array:
+    """Returns the sRGB colors (floats between 0 and 1, array of shape (...,3)) of monochromatic lights, interpolated in the precomputed spectralLUT. Much faster than the exact computation for large arrays of wavelengths (nm)."""
+    wavelengths,RGB = spectralLUT()
+    wavelength = np.asarray(wavelength,dtype=np.float64)
+    return np.stack([np.interp(wavelength,wavelengths,RGB[:,i]) for i in range(3)],axis=-1)
+
+def spectralColormap(start=380,stop=780,N=256):
+    """Returns a matplotlib colormap going through the colors of monochromatic lights, from the wavelengths start to stop (nm)."""
+    from matplotlib.colors import ListedColormap
+    return ListedColormap(wavelengthToRGB(np.linspace(start,stop,N)),name="spectrum")
 
 ### HELPER FUNCTIONS
 def gaussian(x,mu,tau):
     return np.exp(-(tau**2)*((x-mu)**2)/2)
 
 def piecewiseGaussian(x,mu,tau1,tau2):
-    if x < mu:
-        return gaussian(x,mu,tau1)
-    return gaussian(x,mu,tau2)
\ No newline at end of file
+    return np.where(x < mu,gaussian(x,mu,tau1),gaussian(x,mu,tau2))
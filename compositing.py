@@ -0,0 +1,102 @@
+import pyvista as pv
+import numpy as np
+from phyvista.core import *
+from phyvista.profiling import instrumented
+from phyvista.quality import resolution as qualityResolution
+
+LUT_SIZE = 256 # Number of values of the transfer functions
+MAX_OPACITY = 0.999 # Opacities are clamped below 1 to get finite extinction coefficients
+UNIT_DISTANCE = 1.0 # The volume mappers ignore the opacity unit distance of RGBA volumes : the opacities are given for this distance
+CHUNK_SIZE = 2**16 # Number of points evaluated at once
+
+def isComposable(element) -> bool:
+    """Returns True if the element is a volume with an analytic field (see Element.field), which can be merged into a composite volume."""
+    material = getattr(element,"material",None)
+    return getattr(material,"renderingStyle",None) == "volume" and getattr(element,"field",None) != None
+
+class VolumeSource:
+    """Transfer function of a volumetric element, converting the values of its field into colors and extinction coefficients.
+    The colors and opacities are those that pyvista would give to the element plotted alone (same colormap, opacity mapping and scalar range)."""
+    def __init__(self,element):
+        self.element = element
+        self.field = element.worldField()
+        properties = dict(element.material.properties)
+        clim = properties.get("clim")
+        if clim == None: # Range of the plotted field of the grid, as pyvista does
+            scalars = element._grid[element.material.plottedField] if element.material.plottedField != None else element._grid.active_scalars
+            clim = (np.nanmin(scalars),np.nanmax(scalars))
+        self.clim = np.array(clim,dtype=np.float64)
+        from pyvista.plotting.colors import get_cmap_safe
+        lut = pv.LookupTable()
+        lut.apply_cmap(get_cmap_safe(properties.get("cmap",pv.global_theme.cmap)),LUT_SIZE)
+        lut.apply_opacity(properties.get("opacity","linear"))
+        values = np.array(lut.values,dtype=np.float64)/255
+        self.colors = values[:,0:3]
+        self.unit_distance = properties.get("opacity_unit_distance",1.0)
+        self.extinctions = -np.log(1-np.minimum(values[:,3],MAX_OPACITY))/self.unit_distance # Opacity per unit length
+
+    def bounds(self):
+        """World-space bounds of the grid of the element, as an array of shape (3,2)."""
+        bounds = np.array(self.element._grid.bounds,dtype=np.float64).reshape(3,2)
+        corners = np.stack(np.meshgrid(*bounds,indexing="ij"),axis=-1).reshape(-1,3)
+        corners = corners @ self.element.matrix[0:3,0:3].T + self.element.matrix[0:3,3]
+        return np.stack((corners.min(axis=0),corners.max(axis=0)),axis=-1)
+
+    def __call__(self,points):
+        """Returns the extinction coefficients (N,) and colors (N,3) at the given world-space points."""
+        values = self.field(points)
+        index = np.rint(np.clip((values-self.clim[0])/max(self.clim[1]-self.clim[0],1e-300),0,1)*(LUT_SIZE-1)).astype(np.int64)
+        return self.extinctions[index],self.colors[index]
+
+@instrumented("constructor")
+def compositeVolumes(elements,resolution=None,spacing=None,bounds=None) -> Element:
+    """Splats volumetric elements (GlowingOrbs, semirealistic beams...) into a single ImageData of RGBA colors, to be rendered as one volume.
+    Each element is evaluated from its analytic field (see Element.field) on the voxels of its bounding box only. Overlapping volumes are combined physically : their extinction coefficients add up, and their colors are averaged with the extinctions as weights.
+
+    Args:
+        elements (list of Element or Group): Elements to be merged. The ones which are not composable (see isComposable) are ignored.
+        resolution (int, optional): Number of voxels along the largest side. If None, depends on the quality settings (see phyvista.quality). Defaults to None.
+        spacing (float, optional): Size of the voxels, instead of resolution. Defaults to None.
+        bounds (6-tuple, optional): World-space bounds of the volume. Defaults to the bounds of all the elements.
+
+    Returns:
+        Element
+    """
+    if isinstance(elements,Group):
+        elements = elements.elements
+    sources = [VolumeSource(element) for element in elements if isComposable(element)]
+    if len(sources) == 0:
+        raise ValueError("No composable volumetric element (with an analytic field) was given.")
+    if bounds is None:
+        all_bounds = np.array([source.bounds() for source in sources])
+        bounds = np.stack((all_bounds[:,:,0].min(axis=0),all_bounds[:,:,1].max(axis=0)),axis=-1)
+    bounds = np.asarray(bounds,dtype=np.float64).reshape(3,2)
+    size = bounds[:,1]-bounds[:,0]
+    if spacing == None:
+        resolution = qualityResolution(100) if resolution == None else resolution
+        spacing = size.max()/(resolution-1)
+    dimensions = np.maximum(np.ceil(size/spacing).astype(int)+1,2)
+    image = pv.ImageData(dimensions=dimensions,origin=bounds[:,0],spacing=(spacing,)*3)
+
+    extinction = np.zeros(image.n_points,dtype=np.float32)
+    weighted_colors = np.zeros((image.n_points,3),dtype=np.float32)
+    for source in sources:
+        # Voxels of the bounding box of the source
+        source_bounds = source.bounds()
+        low = np.clip(np.floor((source_bounds[:,0]-bounds[:,0])/spacing).astype(int),0,dimensions-1)
+        high = np.clip(np.ceil((source_bounds[:,1]-bounds[:,0])/spacing).astype(int),0,dimensions-1)
+        box = high-low+1
+        n = int(np.prod(box))
+        for start in range(0,n,CHUNK_SIZE):
+            local = np.arange(start,min(start+CHUNK_SIZE,n))
+            ijk = low + np.stack((local % box[0],(local // box[0]) % box[1],local // (box[0]*box[1])),axis=-1)
+            index = ijk[:,0] + dimensions[0]*(ijk[:,1] + dimensions[1]*ijk[:,2]) # Point order of VTK images (x fastest)
+            sigma,colors = source(bounds[:,0] + ijk*spacing)
+            extinction[index] += sigma
+            weighted_colors[index] += sigma[:,None]*colors
+
+    rgba = np.empty((image.n_points,4),dtype=np.uint8)
+    rgba[:,0:3] = np.rint(255*np.clip(weighted_colors/np.maximum(extinction,1e-30)[:,None],0,1))
+    rgba[:,3] = np.rint(255*(1-np.exp(-extinction*UNIT_DISTANCE)))
+    image["rgba"] = rgba
+    return Element(image,Material("volume","rgba",clim=[0,255],opacity_unit_distance=UNIT_DISTANCE))
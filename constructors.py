@@ -1,22 +1,142 @@
 import pyvista as pv
 import numpy as np
-from phyvista.core import norm,normalized
+from phyvista.core import norm,normalized,poseMatrix,ORIGIN,U_X
+from phyvista.cache import memoized
+from phyvista.profiling import instrumented
+from phyvista.quality import resolution as qualityResolution
+from phyvista.quality import floatType,indexType
 
+# Compact grids : the arrays are built directly with the types of the precision settings (see phyvista.quality.setPrecision), then handed to VTK without copy
+def cellArray(connectivity,offsets):
+    """Returns a vtkCellArray sharing the memory of the connectivity and offsets arrays (the offsets ending with the length of the connectivity) when they already have the index type of the precision settings."""
+    from vtkmodules.vtkCommonCore import VTK_TYPE_INT32,VTK_TYPE_INT64
+    from vtkmodules.vtkCommonDataModel import vtkCellArray
+    from vtkmodules.util.numpy_support import numpy_to_vtk
+    dtype = indexType()
+    array_type = VTK_TYPE_INT32 if dtype == np.int32 else VTK_TYPE_INT64
+    cells = vtkCellArray()
+    cells.SetData(numpy_to_vtk(np.ascontiguousarray(offsets,dtype=dtype),deep=False,array_type=array_type),numpy_to_vtk(np.ascontiguousarray(connectivity,dtype=dtype),deep=False,array_type=array_type))
+    return cells
+
+def UnstructuredGridFromCells(points,cells,celltype) -> pv.UnstructuredGrid:
+    """Returns an UnstructuredGrid made of cells of a single type, given as an array of point indices of shape (number of cells, points per cell)."""
+    from vtkmodules.vtkCommonCore import VTK_UNSIGNED_CHAR
+    from vtkmodules.util.numpy_support import numpy_to_vtk
+    n,size = np.shape(cells)
+    grid = pv.UnstructuredGrid()
+    grid.points = np.ascontiguousarray(points,dtype=floatType()).reshape(-1,3)
+    grid.SetCells(numpy_to_vtk(np.full(n,celltype,dtype=np.uint8),deep=True,array_type=VTK_UNSIGNED_CHAR),cellArray(np.reshape(cells,-1),np.arange(n+1)*size))
+    return grid
+
+def PolyDataFromFaces(points,connectivity,offsets) -> pv.PolyData:
+    """Returns a PolyData of polygonal faces, given by their connectivity and offsets (see cellArray)."""
+    grid = pv.PolyData()
+    grid.points = np.ascontiguousarray(points,dtype=floatType()).reshape(-1,3)
+    grid.SetPolys(cellArray(connectivity,offsets))
+    return grid
+
+def compactGrid(grid):
+    """Converts in place a grid made by a VTK source or filter to the precision settings, if they are single precision : float64 points and fields are changed into float32, and the cells into 32-bit storage. Returns the grid."""
+    if floatType() == np.float64:
+        return grid
+    if grid.points.dtype == np.float64:
+        grid.points = grid.points.astype(np.float32)
+    for data in (grid.point_data,grid.cell_data):
+        for name in data.keys():
+            if data[name].dtype == np.float64:
+                data[name] = data[name].astype(np.float32)
+    for cells in (grid.GetCells(),) if isinstance(grid,pv.UnstructuredGrid) else (grid.GetVerts(),grid.GetLines(),grid.GetPolys(),grid.GetStrips()) if isinstance(grid,pv.PolyData) else ():
+        cells.ConvertTo32BitStorage()
+    return grid
+
+# Canonical shapes, centered on the origin and pointing towards U_X. They are tessellated once, then only moved by rigid transforms.
+@memoized
+def CanonicalCylinder(radius,height,resolution=100,capping=True):
+    return compactGrid(pv.Cylinder(center=ORIGIN,direction=U_X,radius=radius,height=height,resolution=resolution,capping=capping))
+
+@memoized
+def CanonicalCone(radius,height,resolution=100,capping=True,angle=None):
+    return compactGrid(pv.Cone(center=ORIGIN,direction=U_X,height=height,radius=radius,capping=capping,angle=angle,resolution=resolution))
+
+@memoized
+def CanonicalSphere(radius,theta_resolution=30,phi_resolution=30):
+    return compactGrid(pv.Sphere(radius=radius,center=ORIGIN,theta_resolution=theta_resolution,phi_resolution=phi_resolution))
+
+@instrumented("constructor")
+@memoized
+def Cylinder(center,direction,radius=0.5,height=1.0,resolution=None,capping=True):
+    """Same as pyvista.Cylinder, but cached (see phyvista.cache.memoized). The default resolution depends on the quality settings (see phyvista.quality)."""
+    if resolution == None:
+        resolution = qualityResolution(100,max(2*radius,height))
+    return CanonicalCylinder(radius,height,resolution,capping).transform(poseMatrix(center,direction),inplace=False)
+
+@instrumented("constructor")
+@memoized
+def Sphere(radius=0.5,center=ORIGIN,theta_resolution=None,phi_resolution=None):
+    """Same as pyvista.Sphere, but cached (see phyvista.cache.memoized). The default resolutions depend on the quality settings (see phyvista.quality)."""
+    if theta_resolution == None:
+        theta_resolution = qualityResolution(30,2*radius)
+    if phi_resolution == None:
+        phi_resolution = qualityResolution(30,2*radius)
+    return CanonicalSphere(radius,theta_resolution,phi_resolution).translate(center,inplace=False)
+
+@instrumented("constructor")
+@memoized
 def CylinderStartEnd(start,end,radius,**kwargs):
     start = np.array(start)
     end = np.array(end)
     center = (start+end)/2
     axis = end-start
     height = norm(axis)
-    return pv.Cylinder(center,axis,radius,height,**kwargs)
+    return Cylinder(center,axis,radius,height,**kwargs)
 
-
-def ConeStartEnd(start,end,radius,resolution=100,**kwargs):
+@instrumented("constructor")
+@memoized
+def ConeStartEnd(start,end,radius,resolution=None,**kwargs):
     start = np.array(start)
     end = np.array(end)
     center = (start+end)/2
     axis = end-start
     height = norm(axis)
-    return pv.Cone(center,axis,height,radius,resolution=resolution,**kwargs)
+    if resolution == None:
+        resolution = qualityResolution(100,max(2*radius,height))
+    return CanonicalCone(radius,height,resolution,**kwargs).transform(poseMatrix(center,axis),inplace=False)
+
+@instrumented("constructor")
+def CylindersStartEnd(starts,ends,radius,resolution=None,capping=False) -> pv.PolyData:
+    """Returns a single PolyData made of many cylinders (e.g. bonds), built at once from one template instead of one by one.
 
+    Args:
+        starts (array of shape (N,3)): Starting points of the cylinders axes
+        ends (array of shape (N,3)): Endpoints of the cylinders axes
+        radius (float): Radius of all the cylinders
+        resolution (int, optional): Number of sides of the cylinders. If None, depends on the quality settings (see phyvista.quality). Defaults to None.
+        capping (bool, optional): Whether to close the cylinders. Defaults to False.
 
+    Returns:
+        pyvista.PolyData
+    """
+    starts = np.asarray(starts,dtype=np.float64).reshape(-1,3)
+    ends = np.asarray(ends,dtype=np.float64).reshape(-1,3)
+    if resolution == None:
+        resolution = qualityResolution(12,2*radius)
+    template = CanonicalCylinder(1.0,1.0,resolution,capping)
+    axes = ends-starts
+    # Orthonormal frame (axis,u,v) of each cylinder, the template axis U_X being mapped onto the cylinder axis
+    lengths = np.linalg.norm(axes,axis=1)
+    a = axes/np.maximum(lengths,1e-300)[:,None]
+    helper = np.where((np.abs(a[:,0]) < 0.9)[:,None],(1.0,0,0),(0,1.0,0))
+    u = np.cross(a,helper)
+    u /= np.linalg.norm(u,axis=1)[:,None]
+    v = np.cross(a,u)
+    local = template.points # Axis coordinate from -0.5 to 0.5, transverse coordinates within the unit disk
+    centers,axes,u,v = (np.asarray(w,dtype=floatType()) for w in ((starts+ends)/2,axes,radius*u,radius*v)) # The points are computed directly in the precision of the settings
+    points = centers[:,None,:] + local[None,:,0:1]*axes[:,None,:] + local[None,:,1:2]*u[:,None,:] + local[None,:,2:3]*v[:,None,:]
+    # The faces of the template are repeated with shifted point indices
+    polys = template.GetPolys()
+    connectivity = pv.convert_array(polys.GetConnectivityArray())
+    offsets = pv.convert_array(polys.GetOffsetsArray())
+    dtype = indexType()
+    all_connectivity = connectivity.astype(dtype)[None,:] + (np.arange(len(starts),dtype=dtype)*template.n_points)[:,None]
+    all_offsets = np.concatenate(((offsets[:-1].astype(dtype)[None,:] + (np.arange(len(starts),dtype=dtype)*len(connectivity))[:,None]).reshape(-1),[len(starts)*len(connectivity)]))
+    return PolyDataFromFaces(points,all_connectivity.reshape(-1),all_offsets)
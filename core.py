@@ -1,6 +1,12 @@
 import pyvista as pv
 import numpy as np
+import sys as _sys # Underscored, so that 'from phyvista.core import *' does not export them
+import time as _time
+import importlib.abc as _importlib_abc
+import importlib.util as _importlib_util
+from copy import copy as _shallowCopy
 from phyvista.materials import plotGridWithMaterial,Material
+from phyvista.profiling import instrumented,recordCopy
 from pyvista.core.utilities import transformations as transf
 
 
@@ -15,37 +21,284 @@ def normalized(v):
 def norm(v):
     return np.linalg.norm(v)
 
+def rotationMatrix(v_from,v_to):
+    """Returns the 3x3 matrix of the smallest rotation bringing the direction v_from onto the direction v_to."""
+    a,b = normalized(np.asarray(v_from,dtype=np.float64)),normalized(np.asarray(v_to,dtype=np.float64))
+    v,c = np.cross(a,b),np.dot(a,b)
+    if c < -1+1e-12: # Opposite directions : half-turn around any perpendicular axis
+        p = normalized(np.cross(a,U_X if norm(np.cross(a,U_X)) > 1e-6 else U_Y))
+        return 2*np.outer(p,p)-np.eye(3)
+    vx = np.array(((0,-v[2],v[1]),(v[2],0,-v[0]),(-v[1],v[0],0)))
+    return np.eye(3) + vx + vx@vx/(1+c) # Rodrigues formula
+
+def poseMatrix(position,direction=U_X,reference=U_X):
+    """Returns the 4x4 matrix of the rigid transform bringing the origin onto position, and the reference direction onto direction."""
+    matrix = np.eye(4)
+    matrix[0:3,0:3] = rotationMatrix(reference,direction)
+    matrix[0:3,3] = position
+    return matrix
+
+@instrumented("constructor")
+def mergeGrids(grids):
+    """Merges several grids into a single one (a PolyData if they all are, an UnstructuredGrid otherwise), without merging their points."""
+    if len(grids) == 1:
+        return grids[0]
+    from phyvista.constructors import compactGrid # The append filters always use 64-bit cells
+    return compactGrid(pv.merge(grids,merge_points=False))
+
 # New method for adding any object (Element,Group...) (or a grid with an associated material)
+@instrumented("Plotter.add",typed_argument=1)
 def add(self,obj,*args,**kwargs):
     """Adds an object to the plot.
 
     Args:
         obj (Element,Group,... or subclass of pyvista.DataSet): Object to be added. If it inherits from pyvista.DataSet, a Material or a color string is expected as second argument.
+
+    Returns:
+        Handle: to update the plotted geometry in place (see Handle), or None if the object does not return its actors
     """
     if issubclass(type(obj),pv.DataSet): # In this case, we expect a material as 2nd argument
         material = args[0]
-        plotGridWithMaterial(self,obj,material)
+        result = plotGridWithMaterial(self,obj,material)
     else:
-        obj.plotSelf(self,*args,**kwargs)
-pv.Plotter.add=add
+        result = obj.plotSelf(self,*args,**kwargs)
+    if result == None or isinstance(result,Handle):
+        return result
+    handle = Handle()
+    handle.addActor(result)
+    return handle
+
+class PlotterPatcher(_importlib_abc.MetaPathFinder):
+    """Import hook adding the 'add' method to pyvista.Plotter as soon as the (heavy) plotting module of pyvista is imported, instead of importing it with phyvista."""
+    def find_spec(self,name,path,target=None):
+        if name != "pyvista.plotting.plotter":
+            return None
+        _sys.meta_path.remove(self)
+        spec = _importlib_util.find_spec(name)
+        exec_module = spec.loader.exec_module
+        def execAndPatch(module):
+            exec_module(module)
+            module.Plotter.add = add
+        spec.loader.exec_module = execAndPatch
+        return spec
+
+if "pyvista.plotting.plotter" in _sys.modules:
+    pv.Plotter.add=add
+else:
+    _sys.meta_path.insert(0,PlotterPatcher())
+
+def reflectionMatrix(normal,point):
+    """Returns the 4x4 matrix of the reflection through the plane defined by its normal and a point."""
+    n = normalized(np.asarray(normal,dtype=np.float64))
+    matrix = np.eye(4)
+    matrix[0:3,0:3] -= 2*np.outer(n,n)
+    matrix[0:3,3] = 2*np.dot(point,n)*n
+    return matrix
+
+class Handle:
+    """Handle on the actors of an object added to a plotter (see Plotter.add), to update its geometry in place between frames (see phyvista.animation).
+    The points of the plotted grids are overwritten, without creating new actors or grids.
+
+    The plotted geometry is made of 'instances' (e.g. the elements of a Group, or the copies of the pattern of a Crystal, in the order in which they were added), which can be moved separately with translate.
+    Datasets with implicit points (such as the ImageData of image-backend beams) are moved rigidly through the user matrix of their actor instead, and cannot be displaced point by point.
+    """
+    def __init__(self):
+        self.actors = []
+        self.parts = [] # For each actor : number of points of each of its instances, and indices of these instances in the handle
+        self.n_instances = 0
+        self.rest_points = {} # Rest points and rest matrix of the actors, stored at their first update
+        self.rest_matrices = {}
+        self.offsets = {} # Current offset of the actors moved through their user matrix
+        self.matrix = np.eye(4) # Rigid transform of all the actors (see transform)
+
+    def addActor(self,actor,sizes=None,instances=None):
+        """Adds an actor to the handle.
+
+        Args:
+            actor (pyvista.Actor or pyvista.Volume)
+            sizes (list of int, optional): Number of points of each instance in the dataset of the actor (consecutive points). Defaults to a single instance.
+            instances (array of int, optional): Indices of these instances in the handle. Defaults to new indices, after the current ones.
+        """
+        if sizes is None:
+            sizes = [actor.mapper.dataset.n_points] if hasattr(actor,"mapper") else [0]
+        sizes = np.asarray(sizes,dtype=np.int64)
+        if instances is None:
+            instances = self.n_instances + np.arange(len(sizes))
+        instances = np.asarray(instances,dtype=np.int64)
+        self.actors.append(actor)
+        self.parts.append((sizes,instances))
+        self.n_instances = max(self.n_instances,int(instances.max())+1 if len(instances) > 0 else 0)
+
+    def extend(self,handle):
+        """Adds all the actors of another handle, with instances numbered after the current ones."""
+        offset = self.n_instances
+        for actor,(sizes,instances) in zip(handle.actors,handle.parts):
+            self.addActor(actor,sizes,offset+instances)
+
+    def hasImplicitPoints(self,actor):
+        return not isinstance(actor.mapper.dataset,(pv.PolyData,pv.UnstructuredGrid,pv.StructuredGrid,pv.PointSet)) # e.g. ImageData
+
+    def restPoints(self,actor):
+        """Returns the rest points of the actor. The dataset is given its own point array at the first call, as it may share it with other grids."""
+        key = id(actor)
+        if key not in self.rest_points:
+            dataset = actor.mapper.dataset
+            if self.hasImplicitPoints(actor):
+                raise TypeError(f"The points of a {type(dataset).__name__} are implicit : it can only be moved rigidly, with translate or transform")
+            self.rest_points[key] = np.array(dataset.points)
+            dataset.SetPoints(pv.vtk_points(self.rest_points[key],deep=True)) # New points object : assigning to dataset.points would write into the shared one
+        return self.rest_points[key]
+
+    def restMatrix(self,actor):
+        key = id(actor)
+        if key not in self.rest_matrices:
+            self.rest_matrices[key] = np.array(actor.user_matrix)
+        return self.rest_matrices[key]
+
+    def moveActor(self,actor,offset):
+        """Moves an actor by a world-space offset from its rest position, through its user matrix."""
+        translation = np.eye(4)
+        translation[0:3,3] = offset
+        self.offsets[id(actor)] = translation
+        actor.user_matrix = self.matrix @ translation @ self.restMatrix(actor)
+
+    def writePoints(self,actor,local_displacements):
+        """Writes rest points + displacements (in the frame of the actor) into the point array of the dataset of the actor."""
+        points = self.restPoints(actor)
+        dataset = actor.mapper.dataset
+        np.add(points,local_displacements,out=dataset.points)
+        dataset.GetPoints().Modified()
+
+    def localVectors(self,actor,vectors):
+        """Converts world-space displacements into the frame of the actor (whose rest user matrix may rotate its dataset)."""
+        matrix = self.restMatrix(actor)
+        if np.array_equal(matrix[0:3,0:3],np.eye(3)):
+            return vectors
+        return vectors @ np.linalg.inv(matrix[0:3,0:3]).T
+
+    def translate(self,offsets):
+        """Moves each instance by an offset from its rest position.
+
+        Args:
+            offsets (array of shape (n_instances,3)): World-space offsets, in the order of the instances
+        """
+        offsets = np.asarray(offsets,dtype=np.float64).reshape(-1,3)
+        if len(offsets) != self.n_instances:
+            raise ValueError(f"Expected {self.n_instances} offsets, got {len(offsets)}")
+        for actor,(sizes,instances) in zip(self.actors,self.parts):
+            if len(instances) == 0: # Only moved by transform (e.g. composite volume)
+                continue
+            if self.hasImplicitPoints(actor):
+                if len(instances) > 1:
+                    raise TypeError(f"The instances of a {type(actor.mapper.dataset).__name__} can not be moved separately")
+                self.moveActor(actor,offsets[instances[0]])
+            else:
+                self.writePoints(actor,np.repeat(self.localVectors(actor,offsets[instances]),sizes,axis=0))
+
+    def displace(self,displacements):
+        """Moves each point from its rest position.
+
+        Args:
+            displacements (array of shape (n_points,3)): World-space displacements of all the points, actor after actor
+        """
+        displacements = np.asarray(displacements,dtype=np.float64).reshape(-1,3)
+        start = 0
+        for actor,(sizes,instances) in zip(self.actors,self.parts):
+            if len(instances) == 0:
+                continue
+            n = int(sizes.sum())
+            self.writePoints(actor,self.localVectors(actor,displacements[start:start+n]))
+            start += n
+        if start != len(displacements):
+            raise ValueError(f"Expected {start} displacements, got {len(displacements)}")
+
+    def transform(self,matrix):
+        """Moves all the actors rigidly by a 4x4 matrix from their rest position (only changes their user matrix)."""
+        self.matrix = np.asarray(matrix,dtype=np.float64)
+        for actor in self.actors:
+            actor.user_matrix = self.matrix @ self.offsets.get(id(actor),np.eye(4)) @ self.restMatrix(actor)
+
+class MovedField:
+    """Scalar field (function of an (N,3) array of points) moved by a 4x4 matrix."""
+    def __init__(self,field,matrix):
+        self.field = field
+        self.inverse = np.linalg.inv(np.asarray(matrix,dtype=np.float64))
+
+    def __call__(self,points):
+        return self.field(np.asarray(points,dtype=np.float64) @ self.inverse[0:3,0:3].T + self.inverse[0:3,3])
 
 class Element:
-    def __init__(self,grid,material):
-        self.grid = grid
+    def __init__(self,grid,material,matrix=None,field=None):
+        self._grid = grid # Base grid, possibly shared with copies of the element (flyweight)
+        self._shared = False # If True, the base grid is copied before being exposed to possible mutations
+        self.matrix = np.eye(4) if type(matrix) == type(None) else np.array(matrix,dtype=np.float64) # Pending transforms, applied lazily
+        self.field = field # Optional analytic version of the plotted field of volumes (function of points in the frame of the base grid), see phyvista.compositing
         self.material = material
         if type(material) == str:
             self.material = Material(color=material)# Simple color material
 
+    @property
+    def grid(self):
+        """Grid of the element, owned by this element only. The pending transforms are applied (once) when it is accessed."""
+        if not np.array_equal(self.matrix,np.eye(4)):
+            start = _time.perf_counter()
+            self._grid = self._grid.transform(self.matrix,inplace=False)
+            if self.field != None: # The field follows the base grid
+                self.field = MovedField(self.field,self.matrix)
+            self.matrix = np.eye(4)
+            recordCopy("Element.grid (transform)",self._grid,start)
+        elif self._shared: # Copy on write : the arrays may be written to through the returned grid
+            start = _time.perf_counter()
+            self._grid = self._grid.copy(deep=True)
+            recordCopy("Element.grid (copy on write)",self._grid,start)
+        self._shared = False
+        return self._grid
+
+    @grid.setter
+    def grid(self,grid):
+        self._grid = grid
+        self._shared = False
+        self.matrix = np.eye(4)
+        self.field = None
+
+    def worldField(self):
+        """Returns the analytic field of the element (if any) as a function of world-space points, taking the pending transforms into account."""
+        if self.field == None or np.array_equal(self.matrix,np.eye(4)):
+            return self.field
+        return MovedField(self.field,self.matrix)
+
     def plotSelf(self,plotter):
-        plotGridWithMaterial(plotter,self.grid,self.material)
+        grid = self._grid.copy(deep=False) if self._shared else self._grid # Distinct grid objects (sharing their arrays) are needed for distinct actors
+        actor = plotGridWithMaterial(plotter,grid,self.material)
+        if not np.array_equal(self.matrix,np.eye(4)): # Pending transforms are done by the actor
+            actor.user_matrix = self.matrix
+        return actor
+
+    def copy(self,deep=False):
+        """Returns a copy of the element (of the same class).
 
-    def copy(self):
-        return Element(self.grid.copy(),self.material.copy())
+        Args:
+            deep (bool, optional): If False, the copy references the same base grid and no point or cell array is duplicated (the grid is only copied when modified, see 'grid'). If True, the grid is fully copied. Defaults to False.
+        """
+        newelmt = _shallowCopy(self)
+        newelmt.material = self.material.copy()
+        newelmt.matrix = self.matrix.copy()
+        if deep:
+            start = _time.perf_counter()
+            newelmt.grid = self.grid.copy(deep=True)
+            newelmt.field = self.field # Follows the grid (see the 'grid' property)
+            recordCopy("Element.copy",newelmt.grid,start)
+        else:
+            self._shared = newelmt._shared = True
+        return newelmt
 
     def transform(self,transform,inplace=False):
-        newgrid = self.grid.transform(transform,inplace=inplace)
+        """Transforms the element by a 4x4 matrix. The transform is only composed with the pending ones, the grid itself is not modified until needed."""
         if not inplace:
-            return Element(newgrid,self.material.copy())
+            newelmt = self.copy()
+            newelmt.transform(transform,inplace=True)
+            return newelmt
+        self.matrix = np.asarray(transform,dtype=np.float64) @ self.matrix
 
     def translate(self,vector,inplace=False):
         matrix = np.eye(4)
@@ -53,7 +306,7 @@ class Element:
         return self.transform(matrix,inplace=inplace)
 
     def rotate_vector(self,vector,angle,point,inplace=False):
-        return self.transform(transf.axis_angle_rotation(vector,angle,point),inplace=inplace)
+        return self.transform(transf.axis_angle_rotation(vector,angle,point=point),inplace=inplace)
 
     def rotate_x(self,angle,point=ORIGIN,inplace=False):
         return self.rotate_vector(U_X,angle,point,inplace)
@@ -65,14 +318,13 @@ class Element:
         return self.rotate_vector(U_Z,angle,point,inplace)
 
     def reflect(self,normal,point,inplace=False):
-        newgrid = self.grid.reflect(normal,point,inplace=inplace)
-        if not inplace:
-            return Element(newgrid,self.material.copy())
+        return self.transform(reflectionMatrix(normal,point),inplace=inplace)
 
     def clip(self,normal,origin,inplace=False):
         newgrid = self.grid.clip(normal,origin,inplace=inplace)
         if not inplace:
             return Element(newgrid,self.material.copy())
+        self.field = None
 
 class Group:
     def __init__(self,elements=[], grids = [],materials = []):
@@ -84,9 +336,39 @@ class Group:
     def append(self,element):
         self.elements.append(element)
 
-    def plotSelf(self,plotter):
-        for element in self.elements:
-            element.plotSelf(plotter)
+    def plotSelf(self,plotter,batched=False,composite=False):
+        """Plots all the elements of the group.
+
+        Args:
+            plotter (pyvista.Plotter)
+            batched (bool, optional): If True, the grids of the elements sharing an equal material are merged and plotted as a single actor. Much faster to render for groups with many elements. Defaults to False.
+            composite (bool, optional): If True, the volumetric elements with an analytic field (GlowingOrbs, semirealistic beams...) are merged into a single volume (see phyvista.compositing), rendered faster and with correct overlaps. Defaults to False.
+
+        Returns:
+            Handle: with one instance per element. Composited elements can not be moved separately : their volume is only moved by Handle.transform, and their offsets are ignored by Handle.translate.
+        """
+        handle = Handle() # One instance per element
+        handle.n_instances = len(self.elements)
+        indices = list(range(len(self.elements)))
+        if composite:
+            from phyvista.compositing import compositeVolumes,isComposable
+            volumes = [i for i in indices if isComposable(self.elements[i])]
+            if len(volumes) > 0:
+                actor = compositeVolumes([self.elements[i] for i in volumes]).plotSelf(plotter)
+                handle.addActor(actor,[],[])
+                indices = [i for i in indices if not isComposable(self.elements[i])]
+        if not batched:
+            for i in indices:
+                handle.addActor(self.elements[i].plotSelf(plotter),instances=[i])
+            return handle
+        batches = {}
+        for i in indices:
+            batches.setdefault(self.elements[i].material,[]).append(i) # Equal materials are the same object
+        for batch in batches.values():
+            grids = [self.elements[i].grid for i in batch]
+            actor = plotGridWithMaterial(plotter,mergeGrids(grids),self.elements[batch[0]].material)
+            handle.addActor(actor,[grid.n_points for grid in grids],batch)
+        return handle
 
     def translate(self,vector,inplace=False):
         if not inplace:
@@ -119,7 +401,7 @@ class Group:
 
     def reflect(self,normal,point):# TODO : Make not inplace
         for elmt in self.elements:
-            elmt.grid.reflect(normal,point,inplace=True)
+            elmt.reflect(normal,point,inplace=True)
 
     def extend(self,group):
         self.elements.extend(group.elements)
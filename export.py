@@ -0,0 +1,259 @@
+import pyvista as pv
+import numpy as np
+import hashlib
+import json
+import os
+import struct
+from phyvista.core import *
+from phyvista.profiling import instrumented
+
+# glTF constants
+ARRAY_BUFFER,ELEMENT_ARRAY_BUFFER = 34962,34963 # Targets of the buffer views
+FLOAT,UNSIGNED_INT = 5126,5125 # Component types of the accessors
+LINES,TRIANGLES = 1,4 # Modes of the primitives
+INSTANCING = "EXT_mesh_gpu_instancing"
+Z_UP_TO_Y_UP = [-np.sqrt(0.5),0.0,0.0,np.sqrt(0.5)] # Quaternion (x,y,z,w) of the rotation of the root node, glTF scenes being Y-up
+TRS_TOLERANCE = 1e-6 # Matrices further than this from a rotation times a scale are applied to the points instead
+
+def instanceBatches(obj,*indices_ranges,mask=None,cutaway=None,cull_interior=False):
+    """Walks through Elements, Groups, Crystals (or lists of them) and returns the list of their (base grid, material, array of 4x4 matrices of shape (K,4,4)) batches.
+    The base grids are not transformed : copies of an Element sharing their grid (see Element.copy), and all the cells of a Crystal, form a single batch of instances."""
+    from phyvista.lattices import Crystal
+    if isinstance(obj,Element):
+        return [(obj._grid,obj.material,obj.matrix[None])]
+    if isinstance(obj,Group):
+        return [batch for element in obj.elements for batch in instanceBatches(element)]
+    if isinstance(obj,Crystal):
+        if cull_interior:
+            positions = obj.pointsFromIndices(obj.visibleIndices(*indices_ranges,mask=mask,cutaway=cutaway))
+        else:
+            positions = obj.pointsFromIndices(obj.indices(*indices_ranges,mask=mask,cutaway=cutaway))
+        batches = []
+        for element in obj.pattern.elements:
+            matrices = np.broadcast_to(element.matrix,(len(positions),4,4)).copy()
+            matrices[:,0:3,3] += positions
+            batches.append((element._grid,element.material,matrices))
+        return batches
+    if isinstance(obj,(list,tuple)):
+        return [batch for item in obj for batch in instanceBatches(item,*indices_ranges,mask=mask,cutaway=cutaway,cull_interior=cull_interior)]
+    raise TypeError(f"Cannot export an object of type '{type(obj).__name__}'")
+
+def decomposeMatrices(matrices):
+    """Splits 4x4 matrices (K,4,4) into translations (K,3), rotation quaternions (K,4) in glTF order (x,y,z,w) and scales (K,3).
+    Also returns a boolean array telling which matrices are exactly such a composition (no shear), the others having to be applied to the points."""
+    linear = matrices[:,0:3,0:3]
+    scales = np.linalg.norm(linear,axis=1) # Norms of the columns
+    scales[np.linalg.det(linear) < 0,0] *= -1 # Reflections are given by a negative scale
+    rotations = linear/np.where(scales == 0,1,scales)[:,None,:]
+    valid = np.all(np.abs(rotations.transpose(0,2,1) @ rotations - np.eye(3)) < TRS_TOLERANCE,axis=(1,2)) & np.all(scales != 0,axis=1)
+    # Quaternions of the rotation matrices, from the largest of the diagonal combinations for accuracy
+    r = rotations
+    trace = r[:,0,0]+r[:,1,1]+r[:,2,2]
+    candidates = np.stack((1+trace,1+r[:,0,0]-r[:,1,1]-r[:,2,2],1-r[:,0,0]+r[:,1,1]-r[:,2,2],1-r[:,0,0]-r[:,1,1]+r[:,2,2]),axis=-1)
+    case = np.argmax(candidates,axis=-1)
+    s = 2*np.sqrt(np.maximum(candidates[np.arange(len(r)),case],1e-300))
+    quaternions = np.empty((len(r),4))
+    a,b,c,d = (case == i for i in range(4))
+    quaternions[a] = np.stack((r[a,2,1]-r[a,1,2],r[a,0,2]-r[a,2,0],r[a,1,0]-r[a,0,1],s[a]**2/4),axis=-1)/s[a,None]
+    quaternions[b] = np.stack((s[b]**2/4,r[b,0,1]+r[b,1,0],r[b,0,2]+r[b,2,0],r[b,2,1]-r[b,1,2]),axis=-1)/s[b,None]
+    quaternions[c] = np.stack((r[c,0,1]+r[c,1,0],s[c]**2/4,r[c,1,2]+r[c,2,1],r[c,0,2]-r[c,2,0]),axis=-1)/s[c,None]
+    quaternions[d] = np.stack((r[d,0,2]+r[d,2,0],r[d,1,2]+r[d,2,1],s[d]**2/4,r[d,1,0]-r[d,0,1]),axis=-1)/s[d,None]
+    quaternions /= np.linalg.norm(quaternions,axis=1)[:,None]
+    return matrices[:,0:3,3],quaternions,scales,valid
+
+def geometryArrays(grid,smooth=False,split_sharp_edges=False):
+    """Returns the arrays of the surface of a grid, as written in glTF : positions (N,3), normals (N,3) or None (flat shading), triangles and line segments (flat arrays of point indices)."""
+    surface = grid if isinstance(grid,pv.PolyData) else grid.extract_surface()
+    triangles = np.zeros(0,dtype=np.int64)
+    if surface.GetNumberOfPolys() > 0 or surface.GetNumberOfStrips() > 0:
+        surface = surface.triangulate()
+        if smooth: # Otherwise the normals are left to the viewer, which then shades the faces flat
+            surface = surface.compute_normals(cell_normals=False,point_normals=True,split_vertices=split_sharp_edges)
+        triangles = pv.convert_array(surface.GetPolys().GetConnectivityArray())
+    segments = np.zeros(0,dtype=np.int64)
+    if surface.n_lines > 0: # Each polyline is cut into segments
+        lines = surface.GetLines()
+        connectivity = pv.convert_array(lines.GetConnectivityArray())
+        offsets = pv.convert_array(lines.GetOffsetsArray())
+        inside = np.ones(len(connectivity)-1,dtype=bool)
+        inside[offsets[1:-1]-1] = False
+        segments = np.stack((connectivity[:-1][inside],connectivity[1:][inside]),axis=-1).reshape(-1)
+    normals = surface.point_data["Normals"] if smooth and "Normals" in surface.point_data.keys() else None
+    return np.asarray(surface.points,dtype=np.float32),normals,triangles.astype(np.uint32),segments.astype(np.uint32)
+
+def gltfMaterial(material):
+    """Returns the glTF description of a Material (or color string) : the color, opacity, specularity and ambient lighting are converted into their closest PBR equivalents."""
+    properties = material.properties if isinstance(material,Material) else {"color":material}
+    opacity = properties.get("opacity",1.0)
+    opacity = float(opacity) if isinstance(opacity,(int,float)) else 1.0 # Opacity mappings (strings, arrays) are not supported
+    color = pv.Color(properties.get("color"),default_color=pv.global_theme.color).float_rgb
+    specular = properties.get("specular",0.0)
+    description = {
+        "pbrMetallicRoughness":{"baseColorFactor":[*color,opacity],"metallicFactor":float(properties.get("metallic",0.0)),"roughnessFactor":float(properties.get("roughness",np.clip(1-0.5*specular,0,1)))},
+        "doubleSided":True, # As VTK renders both sides of the faces
+    }
+    if opacity < 1:
+        description["alphaMode"] = "BLEND"
+    ambient = min(properties.get("ambient",0.0),1.0)
+    if ambient > 0: # Light emitted regardless of the lighting
+        description["emissiveFactor"] = [ambient*c for c in color]
+    return description
+
+class GLTFWriter:
+    """Assembles the JSON document and the binary buffer of a glTF file, meshes and materials being written once for all their instances."""
+    def __init__(self):
+        self.document = {"asset":{"version":"2.0","generator":"phyvista"},"buffers":[],"bufferViews":[],"accessors":[],"materials":[],"meshes":[],"nodes":[],"scenes":[{"nodes":[0]}],"scene":0}
+        self.binary = bytearray()
+        self.materials = {} # Material key : index
+        self.geometries = {} # Geometry key : dictionnary of accessors (or None if empty)
+        self.meshes = {} # (geometry key, material key) : index
+        self.grid_keys = {} # id of a grid : (grid, its content key), so that shared grids are hashed once
+        self.instances = {} # Mesh index : lists of the translations, rotations and scales of its instances
+        self.skipped = 0
+
+    def accessor(self,array,accessor_type,target=None,bounds=False):
+        """Appends an array to the binary buffer (4-byte aligned) and returns the index of its accessor."""
+        array = np.ascontiguousarray(array)
+        self.binary.extend(b"\0"*(-len(self.binary) % 4))
+        view = {"buffer":0,"byteOffset":len(self.binary),"byteLength":array.nbytes}
+        if target != None:
+            view["target"] = target
+        self.binary.extend(array.tobytes())
+        self.document["bufferViews"].append(view)
+        accessor = {"bufferView":len(self.document["bufferViews"])-1,"componentType":FLOAT if array.dtype == np.float32 else UNSIGNED_INT,"count":len(array) if array.ndim > 1 else array.size,"type":accessor_type}
+        if bounds: # Required for the positions
+            accessor["min"] = array.reshape(len(array),-1).min(axis=0).tolist()
+            accessor["max"] = array.reshape(len(array),-1).max(axis=0).tolist()
+        self.document["accessors"].append(accessor)
+        return len(self.document["accessors"])-1
+
+    def gridKey(self,grid):
+        """Returns a key identical for grids with the same points and cells."""
+        if id(grid) not in self.grid_keys:
+            h = hashlib.sha1(type(grid).__name__.encode())
+            h.update(np.ascontiguousarray(grid.points).tobytes())
+            cells = (grid.GetCells(),) if isinstance(grid,pv.UnstructuredGrid) else (grid.GetVerts(),grid.GetLines(),grid.GetPolys(),grid.GetStrips()) if isinstance(grid,pv.PolyData) else ()
+            for cell_array in cells:
+                h.update(pv.convert_array(cell_array.GetConnectivityArray()).astype(np.int64).tobytes())
+                h.update(pv.convert_array(cell_array.GetOffsetsArray()).astype(np.int64).tobytes())
+            self.grid_keys[id(grid)] = (grid,h.hexdigest())
+        return self.grid_keys[id(grid)][1]
+
+    def geometry(self,grid,smooth,split_sharp_edges):
+        """Returns the accessors of the geometry of a grid, written at its first use."""
+        key = (self.gridKey(grid),smooth,split_sharp_edges)
+        if key not in self.geometries:
+            positions,normals,triangles,segments = geometryArrays(grid,smooth,split_sharp_edges)
+            if len(triangles) == 0 and len(segments) == 0:
+                self.geometries[key] = None
+            else:
+                attributes = {"POSITION":self.accessor(positions,"VEC3",ARRAY_BUFFER,bounds=True)}
+                if normals is not None:
+                    attributes["NORMAL"] = self.accessor(np.asarray(normals,dtype=np.float32),"VEC3",ARRAY_BUFFER)
+                self.geometries[key] = {"attributes":attributes,"primitives":[(mode,self.accessor(indices,"SCALAR",ELEMENT_ARRAY_BUFFER)) for mode,indices in ((TRIANGLES,triangles),(LINES,segments)) if len(indices) > 0]}
+        return key
+
+    def mesh(self,grid,material):
+        """Returns the index of the mesh of a grid with a material, or None if it has no surface."""
+        properties = material.properties if isinstance(material,Material) else {}
+        geometry_key = self.geometry(grid,bool(properties.get("smooth_shading",False)),bool(properties.get("split_sharp_edges",False)))
+        geometry = self.geometries[geometry_key]
+        if geometry == None:
+            return None
+        key = (geometry_key,material) # Equal materials are the same object (see Material)
+        if key not in self.meshes:
+            if key[1] not in self.materials:
+                self.document["materials"].append(gltfMaterial(material))
+                self.materials[key[1]] = len(self.document["materials"])-1
+            primitives = [{"attributes":geometry["attributes"],"indices":indices,"mode":mode,"material":self.materials[key[1]]} for mode,indices in geometry["primitives"]]
+            self.document["meshes"].append({"primitives":primitives})
+            self.meshes[key] = len(self.document["meshes"])-1
+        return self.meshes[key]
+
+    def addInstances(self,mesh,translations,rotations,scales):
+        """Adds instances of a mesh (see decomposeMatrices), gathered with the previous ones of the same mesh."""
+        for transforms,array in zip(self.instances.setdefault(mesh,([],[],[])),(translations,rotations,scales)):
+            transforms.append(array)
+
+    def addNodes(self):
+        """Adds the node placing each mesh at its instances : a plain node for a single instance, a node with GPU instancing otherwise."""
+        for mesh,transforms in self.instances.items():
+            self.addNode(mesh,*(np.concatenate(arrays) for arrays in transforms))
+
+    def addNode(self,mesh,translations,rotations,scales):
+        if len(translations) == 1:
+            node = {"mesh":mesh,"translation":translations[0].tolist(),"rotation":rotations[0].tolist(),"scale":scales[0].tolist()}
+        else:
+            attributes = {"TRANSLATION":self.accessor(translations.astype(np.float32),"VEC3")}
+            if np.any(rotations[:,0:3] != 0): # Attributes with only default values are omitted
+                attributes["ROTATION"] = self.accessor(rotations.astype(np.float32),"VEC4")
+            if np.any(scales != 1):
+                attributes["SCALE"] = self.accessor(scales.astype(np.float32),"VEC3")
+            node = {"mesh":mesh,"extensions":{INSTANCING:{"attributes":attributes}}}
+            self.document.setdefault("extensionsUsed",[INSTANCING])
+        self.document["nodes"].append(node)
+        self.document["nodes"][0]["children"].append(len(self.document["nodes"])-1)
+
+    def addBatch(self,grid,material,matrices):
+        """Adds the instances of a grid with a material, placed by 4x4 matrices of shape (K,4,4)."""
+        if isinstance(material,Material) and material.renderingStyle != "mesh": # Volumes have no glTF equivalent
+            self.skipped += len(matrices)
+            return
+        translations,rotations,scales,valid = decomposeMatrices(np.asarray(matrices,dtype=np.float64))
+        for matrix in matrices[~valid]: # Sheared instances : the transform is applied to the points
+            mesh = self.mesh(grid.transform(matrix,inplace=False),material)
+            if mesh != None:
+                self.addInstances(mesh,np.zeros((1,3)),np.array([[0,0,0,1.0]]),np.ones((1,3)))
+        if np.any(valid):
+            mesh = self.mesh(grid,material)
+            if mesh != None:
+                self.addInstances(mesh,translations[valid],rotations[valid],scales[valid])
+
+    def write(self,path):
+        """Writes the document as a binary .glb file, or as a .gltf JSON file next to a .bin file."""
+        self.binary.extend(b"\0"*(-len(self.binary) % 4))
+        for key in ("bufferViews","accessors","materials","meshes"):
+            if len(self.document[key]) == 0:
+                del self.document[key]
+        if path.lower().endswith(".gltf"):
+            binary_path = os.path.splitext(path)[0]+".bin"
+            self.document["buffers"] = [{"byteLength":len(self.binary),"uri":os.path.basename(binary_path)}]
+            with open(binary_path,"wb") as file:
+                file.write(self.binary)
+            with open(path,"w") as file:
+                json.dump(self.document,file)
+            return
+        self.document["buffers"] = [{"byteLength":len(self.binary)}]
+        content = json.dumps(self.document,separators=(",",":")).encode()
+        content += b" "*(-len(content) % 4) # Chunks are 4-byte aligned, the JSON one being padded with spaces
+        with open(path,"wb") as file:
+            file.write(struct.pack("<4sII",b"glTF",2,12+8+len(content)+8+len(self.binary)))
+            file.write(struct.pack("<I4s",len(content),b"JSON")+content)
+            file.write(struct.pack("<I4s",len(self.binary),b"BIN\0")+bytes(self.binary))
+
+@instrumented("export")
+def exportGLTF(obj,path,*indices_ranges,mask=None,cutaway=None,cull_interior=False,rotate_scene=True):
+    """Exports Elements, Groups or Crystals to a glTF file, for interactive 3D on the web.
+    Identical grids and materials are written once : all the instances of a same shape (such as the atoms of a crystal) are placed by GPU instancing (extension EXT_mesh_gpu_instancing), with a translation, rotation and scale per instance.
+    Volumes (GlowingOrbs, semirealistic beams...) have no glTF equivalent and are skipped.
+
+    Args:
+        obj (Element, Group, Crystal or list of them): Objects to be exported
+        path (str): Path of the file. A '.glb' file is a single binary file, a '.gltf' file is written with its binary buffer in a '.bin' file next to it.
+        *indices_ranges ((int,int)): Inclusive ranges of indices of the Crystals, one for each lattice vector (see Crystal.plotSelf).
+        mask, cutaway, cull_interior : Selection of the cells of the Crystals, see Crystal.plotSelf.
+        rotate_scene (bool, optional): If True, the scene is rotated so that its Z axis is the vertical axis of glTF (Y). Defaults to True.
+
+    Returns:
+        dict: Number of distinct meshes and materials written, of instances and of skipped volumetric instances.
+    """
+    writer = GLTFWriter()
+    root = {"children":[]}
+    if rotate_scene:
+        root["rotation"] = Z_UP_TO_Y_UP
+    writer.document["nodes"].append(root)
+    for grid,material,matrices in instanceBatches(obj,*indices_ranges,mask=mask,cutaway=cutaway,cull_interior=cull_interior):
+        writer.addBatch(grid,material,matrices)
+    writer.addNodes()
+    writer.write(path)
+    return {"meshes":len(writer.meshes),"materials":len(writer.materials),"instances":sum(sum(len(t) for t in transforms[0]) for transforms in writer.instances.values()),"skipped":writer.skipped}
@@ -1,7 +1,9 @@
 import pyvista as pv
 import numpy as np
 import os
+import itertools
 from phyvista.core import *
+from phyvista.profiling import instrumented
 
 class Crystal:
     def __init__(self,position,vectors,pattern=None):
@@ -9,43 +11,263 @@ class Crystal:
         self.vectors = [np.array(v,dtype=np.float64) for v in vectors]
         self.dimension = len(vectors)
         self.pattern = Group() if pattern == None else pattern
+        self.sites = [] # (position in the cell, species) of the elements added with indices, used for the bonds
     
     def point(self,*indices):
+        """Returns the position of the lattice point with the given indices. The indices may also be arrays (broadcasted together), in which case an array of positions of shape (...,3) is returned."""
         if len(indices) != self.dimension:
             raise ValueError("The number of indices should be the same of the dimension of the crystal.")
-        r = self.position.copy()
-        for i in range(self.dimension):
-            r += indices[i]*self.vectors[i]
-        return r
+        return self.pointsFromIndices(np.stack(np.broadcast_arrays(*indices),axis=-1))
+
+    def pointsFromIndices(self,indices):
+        """Returns the positions of the lattice points for an array of indices of shape (...,dimension), as an array of shape (...,3)."""
+        indices = np.asarray(indices,dtype=np.float64)
+        if indices.shape[-1] != self.dimension:
+            raise ValueError("The number of indices should be the same of the dimension of the crystal.")
+        return self.position + indices @ np.array(self.vectors)
+
+    def indices(self,*indices_ranges,mask=None,cutaway=None):
+        """Returns all the indices within the given ranges as an integer array of shape (N,dimension).
+
+        Args:
+            *indices_ranges ((int,int)): Inclusive ranges of indices, one for each lattice vector.
+            mask (callable or array of bool, optional): Restricts the indices to a non-box domain. Either a function taking the (N,dimension) indices array and returning N booleans (see millerSlab), or a boolean array of the shape of the box of indices. Defaults to None.
+            cutaway (callable or array of bool, optional): Same as mask, but selects the indices to be removed. Defaults to None.
+
+        Returns:
+            numpy.array of shape (N,dimension)
+        """
+        indices,occupied = self.occupancy(*indices_ranges,mask=mask,cutaway=cutaway)
+        return indices[occupied.reshape(-1)]
+
+    def occupancy(self,*indices_ranges,mask=None,cutaway=None):
+        """Returns all the indices of the box defined by the ranges (as an integer array of shape (N,dimension)), and a boolean array of the shape of the box telling which ones are kept by mask and cutaway (see indices)."""
+        if len(indices_ranges) != self.dimension:
+            raise ValueError("The number of indices should be the same of the dimension of the crystal.")
+        ranges = [np.arange(r[0],r[1]+1) for r in indices_ranges]
+        shape = tuple(len(r) for r in ranges)
+        indices = np.stack(np.meshgrid(*ranges,indexing="ij"),axis=-1).reshape(-1,self.dimension)
+        occupied = np.ones(len(indices),dtype=bool)
+        if mask is not None:
+            occupied &= maskArray(mask,indices)
+        if cutaway is not None:
+            occupied &= ~maskArray(cutaway,indices)
+        return indices,occupied.reshape(shape)
+
+    def visibleIndices(self,*indices_ranges,mask=None,cutaway=None,depth=1):
+        """Returns the indices (as an integer array of shape (N,dimension)) of the cells which are not completely surrounded by other cells, i.e. the visible shell of the crystal.
+        A cell is hidden when all its neighbouring cells (sharing a face, an edge or a corner) are occupied. Only 3D crystals are culled, all the cells of lower-dimensional crystals are visible.
+
+        Args:
+            *indices_ranges ((int,int)): Inclusive ranges of indices, one for each lattice vector.
+            mask (callable or array of bool, optional): Restricts the cells to a non-box domain, see indices. Defaults to None.
+            cutaway (callable or array of bool, optional): Cells removed to show the inside of the crystal, see indices. The cells uncovered by the cutaway are visible. Defaults to None.
+            depth (int, optional): Thickness of the visible shell, in cells. Defaults to 1.
+
+        Returns:
+            numpy.array of shape (N,dimension)
+        """
+        indices,occupied = self.occupancy(*indices_ranges,mask=mask,cutaway=cutaway)
+        if self.dimension < 3:
+            return indices[occupied.reshape(-1)]
+        hidden = occupied
+        for i in range(depth): # Each pass peels one layer of cells
+            hidden = surroundedCells(hidden)
+        return indices[(occupied & ~hidden).reshape(-1)]
+
+    def points(self,*indices_ranges,mask=None,cutaway=None,return_indices=False):
+        """Returns the positions of all the lattice points within the given ranges, computed in one matrix product.
+
+        Args:
+            *indices_ranges ((int,int)): Inclusive ranges of indices, one for each lattice vector.
+            mask (callable or array of bool, optional): Restricts the points to a non-box domain, see indices. Defaults to None.
+            cutaway (callable or array of bool, optional): Removes points, see indices. Defaults to None.
+            return_indices (bool, optional): If True, also returns the matching (N,dimension) indices array. Defaults to False.
+
+        Returns:
+            numpy.array of shape (N,3) (and numpy.array of shape (N,dimension) if return_indices)
+        """
+        indices = self.indices(*indices_ranges,mask=mask,cutaway=cutaway)
+        points = self.pointsFromIndices(indices)
+        if return_indices:
+            return points,indices
+        return points
 
     def plotPattern(self,plotter,indices):
         pos = self.point(*indices)
         self.pattern.translate(pos).plotSelf(plotter)
 
-    def plotSelf(self,plotter,*indices_ranges):
-        if len(indices_ranges) != self.dimension:
-            raise ValueError("The number of indices should be the same of the dimension of the crystal.")
-        for i in range(indices_ranges[0][0],indices_ranges[0][1]+1):
-            if self.dimension == 1:# I should be able to do it without 'if's
-                self.plotPattern(plotter,(i,))
-                continue
-            for j in range(indices_ranges[1][0],indices_ranges[1][1]+1):
-                if self.dimension == 2:
-                    self.plotPattern(plotter,(i,j))
-                    continue
-                for k in range(indices_ranges[2][0],indices_ranges[2][1]+1):
-                    self.plotPattern(plotter,(i,j,k))
-
-    def addElement(self,element:Element,indices=None):# Add a particule with position defined by indices
+    def plotSelf(self,plotter,*indices_ranges,mask=None,instanced=False,batched=False,cull_interior=False,cutaway=None):
+        """Plots the pattern at each lattice point within the given indices ranges.
+
+        Args:
+            plotter (pyvista.Plotter)
+            *indices_ranges ((int,int)): Inclusive ranges of indices, one for each lattice vector.
+            mask (callable or array of bool, optional): Restricts the plotted cells to a non-box domain, see indices. Defaults to None.
+            instanced (bool, optional): If True, each pattern element is tessellated once and placed at all the lattice points in a single actor (much faster for large crystals). Defaults to False.
+            batched (bool, optional): If True, all the translated elements sharing an equal material are merged in a single actor (see Group.plotSelf). Defaults to False.
+            cull_interior (bool, optional): If True, only the visible shell of cells is plotted (see visibleIndices), so that the geometry scales with the surface of the crystal instead of its volume. Defaults to False.
+            cutaway (callable or array of bool, optional): Cells removed to show the inside of the crystal, see indices. Defaults to None.
+
+        Returns:
+            Handle: with one instance per pattern element and per cell, ordered by cell then element (e.g. to animate phonons with Handle.translate)
+        """
+        if cull_interior:
+            positions = self.pointsFromIndices(self.visibleIndices(*indices_ranges,mask=mask,cutaway=cutaway))
+        else:
+            positions = self.pointsFromIndices(self.indices(*indices_ranges,mask=mask,cutaway=cutaway))
+        if instanced:
+            return self.plotInstanced(plotter,positions)
+        if batched:
+            crystal = Group()
+            for pos in positions:
+                crystal.extend(self.pattern.translate(pos))
+            return crystal.plotSelf(plotter,batched=True)
+        handle = Handle()
+        for pos in positions:
+            handle.extend(self.pattern.translate(pos).plotSelf(plotter))
+        return handle
+
+    def plotInstanced(self,plotter,positions):
+        """Plots the crystal with a single actor per pattern element, placed at all the given lattice positions (N,3) at once. Returns a Handle (see plotSelf)."""
+        handle = Handle()
+        n_elements = len(self.pattern.elements)
+        for i,element in enumerate(self.pattern.elements):
+            grid = element.grid
+            actor = plotGridWithMaterial(plotter,instancedGrid(grid,positions),element.material)
+            handle.addActor(actor,np.full(len(positions),grid.n_points),i+n_elements*np.arange(len(positions)))
+        return handle
+
+    def addElement(self,element:Element,indices=None,species=None):# Add a particule with position defined by indices
+        """Adds an element to the pattern, translated to the point defined by indices. If indices is an array of shape (M,dimension), one copy of the element is added for each row.
+        Elements added with indices are also sites of the crystal (see bonds), with an optional species label (e.g. "C")."""
         if type(indices)==type(None): # Default : no translation
-            pos = np.zeros((3,))
+            positions = np.zeros((1,3))
         else:
-            pos = self.point(*indices)
-        self.pattern.append(element.translate(pos))
+            positions = self.pointsFromIndices(np.atleast_2d(indices))
+            self.sites.extend((pos-self.position,species) for pos in positions)
+        for pos in positions:
+            self.pattern.append(element.translate(pos))
 
-    def addNewElement(self,grid,material,indices=None):
+    def addNewElement(self,grid,material,indices=None,species=None):
         element = Element(grid,material)
-        self.addElement(element,indices)
+        self.addElement(element,indices,species)
+
+    def sitePositions(self,*indices_ranges,mask=None,cutaway=None):
+        """Returns the positions of all the sites (see addElement) in the cells within the given ranges, as an array of shape (N,3), and their species as an array of shape (N,)."""
+        points = self.points(*indices_ranges,mask=mask,cutaway=cutaway)
+        offsets = np.array([site[0] for site in self.sites]).reshape(-1,3)
+        species = np.empty(len(self.sites),dtype=object)
+        species[:] = [site[1] for site in self.sites]
+        return (points[:,None,:]+offsets[None,:,:]).reshape(-1,3),np.tile(species,len(points))
+
+    @instrumented("constructor")
+    def bonds(self,*indices_ranges,cutoff=None,rules=None,radius=0.05,material="grey",resolution=None,mask=None,cutaway=None,min_distance=1e-6) -> Element:
+        """Returns a single Element made of bonds (cylinders) between all the neighbouring sites within the given ranges, including across cells.
+        Neighbours are found with a spatial grid index over all the sites, so that large crystals (up to millions of sites) can be handled.
+
+        Args:
+            *indices_ranges ((int,int)): Inclusive ranges of indices, one for each lattice vector.
+            cutoff (float, optional): Maximal length of the bonds between any species. Defaults to None.
+            rules (dict, optional): Bond lengths by pair of species, {(species1,species2):max_length or (min_length,max_length)}, order of the species not mattering. Pairs absent from rules are not bonded, unless cutoff is given. Defaults to None.
+            radius (float, optional): Radius of the bonds. Defaults to 0.05.
+            material (Material or str, optional): Defaults to "grey".
+            resolution (int, optional): Number of sides of the bonds, see constructors.CylindersStartEnd. Defaults to None.
+            mask, cutaway (optional): Restrict the cells, see indices. Default to None.
+            min_distance (float, optional): Sites closer than this are considered identical and are not bonded. Defaults to 1e-6.
+
+        Returns:
+            Element
+        """
+        from phyvista.constructors import CylindersStartEnd
+        if cutoff == None and rules == None:
+            raise ValueError("Please provide either a cutoff distance or bonding rules.")
+        rules = {} if rules == None else {tuple(pair):(length if np.ndim(length) == 1 else (min_distance,length)) for pair,length in rules.items()}
+        points,species = self.sitePositions(*indices_ranges,mask=mask,cutaway=cutaway)
+        search_distance = max([length[1] for length in rules.values()] + ([cutoff] if cutoff != None else []))
+        i,j = neighbourPairs(points,search_distance)
+        distances = np.linalg.norm(points[i]-points[j],axis=1)
+        keep = np.zeros(len(i),dtype=bool) if cutoff == None else (distances <= cutoff) & (distances > min_distance)
+        for (species1,species2),(low,high) in rules.items():
+            pair = ((species[i] == species1) & (species[j] == species2)) | ((species[i] == species2) & (species[j] == species1))
+            keep |= pair & (distances > max(low,min_distance)) & (distances <= high)
+        return Element(CylindersStartEnd(points[i[keep]],points[j[keep]],radius,resolution),material)
+
+def millerSlab(miller,low=0,high=0):
+    """Returns a mask (to be used with Crystal.indices, points or plotSelf) selecting the lattice points between two lattice planes.
+
+    Args:
+        miller (tuple of int): Miller indices of the planes, one for each lattice vector
+        low (int, optional): Index of the first plane. Defaults to 0.
+        high (int, optional): Index of the last plane (included). Defaults to 0.
+
+    Returns:
+        callable: mask function of an (N,dimension) indices array
+    """
+    miller = np.array(miller)
+    def mask(indices):
+        plane_index = indices @ miller
+        return (plane_index >= low) & (plane_index <= high)
+    return mask
+
+def maskArray(mask,indices):
+    """Evaluates a mask (function of the (N,dimension) indices array, or boolean array of the shape of the box of indices) as N booleans."""
+    if callable(mask):
+        return np.asarray(mask(indices),dtype=bool)
+    return np.asarray(mask,dtype=bool).reshape(-1)
+
+def surroundedCells(occupied):
+    """Returns the boolean array of the occupied cells whose neighbours (sharing a face, an edge or a corner) are all occupied. Cells outside of the array are empty."""
+    padded = np.pad(occupied,1,constant_values=False)
+    surrounded = occupied.copy()
+    for offset in itertools.product((-1,0,1),repeat=occupied.ndim):
+        surrounded &= padded[tuple(slice(1+o,1+o+n) for o,n in zip(offset,occupied.shape))]
+    return surrounded
+
+NEIGHBOUR_OFFSETS = [offset for offset in itertools.product((-1,0,1),repeat=3) if offset >= (0,0,0)] # Half of the neighbour cells (and the cell itself), so that each pair is found once
+
+@instrumented("constructor")
+def neighbourPairs(points,distance):
+    """Returns all the pairs of points closer than distance, as two integer arrays (i,j) of the same length.
+    The points are sorted in a grid of cubic cells of size distance, and only the points of neighbouring cells are compared."""
+    points = np.asarray(points,dtype=np.float64).reshape(-1,3)
+    n = len(points)
+    if n < 2:
+        return np.zeros(0,dtype=np.int64),np.zeros(0,dtype=np.int64)
+    cells = np.floor((points-points.min(axis=0))/distance).astype(np.int64) + 1 # Margin of one cell for the neighbours
+    dimensions = cells.max(axis=0) + 2
+    keys = (cells[:,0]*dimensions[1] + cells[:,1])*dimensions[2] + cells[:,2]
+    order = np.argsort(keys,kind="stable")
+    sorted_keys = keys[order]
+    pairs_i,pairs_j = [],[]
+    for offset in NEIGHBOUR_OFFSETS:
+        neighbour_keys = keys + (offset[0]*dimensions[1] + offset[1])*dimensions[2] + offset[2]
+        first = np.searchsorted(sorted_keys,neighbour_keys,side="left")
+        counts = np.searchsorted(sorted_keys,neighbour_keys,side="right") - first
+        i = np.repeat(np.arange(n),counts)
+        j = order[np.arange(len(i)) - np.repeat(np.cumsum(counts)-counts,counts) + np.repeat(first,counts)]
+        keep = np.sum((points[i]-points[j])**2,axis=1) <= distance**2
+        if offset == (0,0,0): # Pairs within the same cell : each one once, without self-pairs
+            keep &= i < j
+        pairs_i.append(i[keep])
+        pairs_j.append(j[keep])
+    return np.concatenate(pairs_i),np.concatenate(pairs_j)
+
+@instrumented("constructor")
+def instancedGrid(grid,positions):
+    """Returns a single grid made of copies of 'grid', translated by each of the given positions.
+
+    Args:
+        grid (pyvista.DataSet): Geometry to be repeated
+        positions (numpy.array of shape (N,3)): Translation vectors
+
+    Returns:
+        pyvista.PolyData (or pyvista.UnstructuredGrid if grid is not a PolyData)
+    """
+    positions = np.asarray(positions,dtype=np.float64).reshape(-1,3)
+    if type(grid) == pv.PolyData: # The glyph filter copies the geometry at each point in one pass
+        return pv.PolyData(positions).glyph(geom=grid,orient=False,scale=False)
+    return pv.merge([grid.translate(pos) for pos in positions],merge_points=False)
 
 def hexagonalLatticeVectors(scale=1):#Returns base vectors for a hexagonal lattice (TODO : generalize)
     angle = 2*np.pi/3
@@ -1,10 +1,14 @@
 import numpy as np
 from phyvista.core import *
-from matplotlib import colors
 from phyvista import materials
 from phyvista.optics import OpticsElement
+from phyvista.cache import memoized
+from phyvista.profiling import instrumented
+from phyvista.quality import resolution,floatType
+from phyvista.constructors import UnstructuredGridFromCells,compactGrid
 
-def StraightBeam(pos1,pos2,radius,style="simple",radial_fade_factor=2,color="red",opacity_unit_distance=0.4,relative_intensity=1.0,clipping_normal_start=None,clipping_normal_end=None) -> Element:
+@instrumented("constructor")
+def StraightBeam(pos1,pos2,radius,style="simple",radial_fade_factor=2,color="red",opacity_unit_distance=0.4,relative_intensity=1.0,clipping_normal_start=None,clipping_normal_end=None,backend="unstructured") -> Element:
     """
     Returns an Element representing a straight (cylindrical) laser beam, going from pos1 to pos2 with a given beam radius.
     Optional Parameters :
@@ -15,10 +19,18 @@ def StraightBeam(pos1,pos2,radius,style="simple",radial_fade_factor=2,color="red
         relative_intensity : used in the both styles, changes the diffuse parameter or the opacity respectively. Defaults to 1.0.
         clipping_normal_start : normal vector of the plane according to which the laser beam should be clipped, at the first position. Facing outwards. No additionnal clipping if None (default).
         clipping_normal_end : idem for the second position.
+        backend : used in the 'semirealistic' style, either 'unstructured' (grid of wedges following the beam) or 'image' (much lighter regular grid in the frame of the beam, faster to render). default : 'unstructured'
     """
+    if backend not in ("unstructured","image"):
+        raise ValueError(f"Unknown beam backend '{backend}'")
+    if style=="semirealistic" and backend=="image":
+        grid,matrix = StraightBeamImageGrid(pos1,pos2,radius,radial_fade_factor,clipping_normal_start=clipping_normal_start,clipping_normal_end=clipping_normal_end)
+        field = MovedField(straightBeamField(pos1,pos2,radius,radial_fade_factor,clipping_normal_start,clipping_normal_end),np.linalg.inv(matrix)) # In the frame of the grid
+        return Element(grid,VolumicBeamMaterial(color,relative_intensity,opacity_unit_distance),matrix,field)
     if style=="semirealistic":
         grid = StraightBeamVolumeGrid(pos1,pos2,radius,radial_fade_factor,clipping_normal_start=clipping_normal_start,clipping_normal_end=clipping_normal_end)
         material = VolumicBeamMaterial(color,relative_intensity,opacity_unit_distance)
+        return Element(grid,material,field=straightBeamField(pos1,pos2,radius,radial_fade_factor,clipping_normal_start,clipping_normal_end))
     elif style=="simple":
         grid = StraightBeamVolumeGrid(pos1,pos2,radius,radial_fade_factor,resolution_radius=2,surfacic_cells=True,clipping_normal_start=clipping_normal_start,clipping_normal_end=clipping_normal_end)
         material = SimpleBeamMaterial(color,relative_intensity)
@@ -26,7 +38,8 @@ def StraightBeam(pos1,pos2,radius,style="simple",radial_fade_factor=2,color="red
         raise ValueError(f"Unkwnown beam style '{style}'")
     return Element(grid,material)
 
-def FocusedBeam(pos1,pos2,focus_pos_param,starting_radius=None,divergence=None,radial_fade_factor=2,style="simple",color="red",opacity_unit_distance=0.1,relative_intensity=1.0) -> Element:
+@instrumented("constructor")
+def FocusedBeam(pos1,pos2,focus_pos_param,starting_radius=None,divergence=None,radial_fade_factor=2,style="simple",color="red",opacity_unit_distance=0.1,relative_intensity=1.0,backend="unstructured") -> Element:
     """Creates an Element representing a light beam perfectly focused at a point.
 
     Args:
@@ -40,31 +53,43 @@ def FocusedBeam(pos1,pos2,focus_pos_param,starting_radius=None,divergence=None,r
         color (str, optional): Color of the beam. Defaults to "red".
         opacity_unit_distance (float, optional): Used in 'semirealistic' style. Defaults to 0.1.
         opacity (float, optional): Used in 'simple' style. Defaults to 0.1.
+        backend (str, optional): Used in 'semirealistic' style, 'unstructured' (grid of wedges following the beam) or 'image' (regular grid in the frame of the beam, faster to render, but heavier for tightly focused beams, see FocusedBeamImageGrid). Defaults to "unstructured".
 
     Returns:
         Element
     """
+    if backend not in ("unstructured","image"):
+        raise ValueError(f"Unknown beam backend '{backend}'")
+    if style=="semirealistic" and backend=="image":
+        material = VolumicBeamMaterial(color,relative_intensity,opacity_unit_distance,clim=[0,50])
+        grid,matrix = FocusedBeamImageGrid(pos1,pos2,focus_pos_param,starting_radius,divergence,radial_fade_factor=radial_fade_factor)
+        field = MovedField(focusedBeamField(pos1,pos2,focus_pos_param,starting_radius,divergence,radial_fade_factor),np.linalg.inv(matrix)) # In the frame of the grid
+        return Element(grid,material,matrix,field)
     if style=="semirealistic":
         material = VolumicBeamMaterial(color,relative_intensity,opacity_unit_distance,clim=[0,50])
-        grid = FocusedBeamVolumeGrid(pos1,pos2,focus_pos_param,starting_radius,divergence,resolution_height=30,resolution_radius=25,radial_fade_factor=radial_fade_factor)
+        grid = FocusedBeamVolumeGrid(pos1,pos2,focus_pos_param,starting_radius,divergence,radial_fade_factor=radial_fade_factor)
+        return Element(grid,material,field=focusedBeamField(pos1,pos2,focus_pos_param,starting_radius,divergence,radial_fade_factor))
     elif style=="simple":
         material = SimpleBeamMaterial(color,relative_intensity)
-        grid = FocusedBeamVolumeGrid(pos1,pos2,focus_pos_param,starting_radius,divergence,resolution_height=30,resolution_radius=2,radial_fade_factor=radial_fade_factor,surfacic_cells=True)
+        grid = FocusedBeamVolumeGrid(pos1,pos2,focus_pos_param,starting_radius,divergence,resolution_radius=2,radial_fade_factor=radial_fade_factor,surfacic_cells=True)
     else:
         raise ValueError(f"Unkwnown beam style '{style}'")
     return Element(grid,material)
 
+@instrumented("constructor")
 def GlowingOrb(center,radius,color,saturation_color="white") -> Element:
-    return Element(SphericalVolumeGrid(center,radius),GlowingOrbMaterial(color,saturation_color))
+    return Element(SphericalVolumeGrid(center,radius),GlowingOrbMaterial(color,saturation_color),field=DistanceField(center))
 
-def StraightBeamVolumeGrid(pos1,pos2,radius,radial_fade_factor=2,resolution_height=10,resolution_theta=15,resolution_radius=10,surfacic_cells=False,clipping_normal_start=None,clipping_normal_end=None):
+@instrumented("constructor")
+def StraightBeamVolumeGrid(pos1,pos2,radius,radial_fade_factor=2,resolution_height=None,resolution_theta=None,resolution_radius=None,surfacic_cells=False,clipping_normal_start=None,clipping_normal_end=None):
+    # Resolutions left to None depend on the quality settings (see phyvista.quality)
     if type(pos1) == OpticsElement:
         pos1, clipping_normal_start = pos1.center,pos1.normal
     if type(pos2) == OpticsElement:
         pos2, clipping_normal_end = pos2.center,pos2.normal
     
-    pos1_modified = np.array(pos1)
-    pos2_modified = np.array(pos2)
+    pos1_modified = np.array(pos1,dtype=np.float64)
+    pos2_modified = np.array(pos2,dtype=np.float64)
     axis = pos2_modified-pos1_modified
 
     # If we do additionnal clipping of the beam, we need to prolong the beam first
@@ -73,49 +98,260 @@ def StraightBeamVolumeGrid(pos1,pos2,radius,radial_fade_factor=2,resolution_heig
     if type(clipping_normal_end) != type(None):
         pos2_modified += 3*radius*normalized(axis)
     axis = pos2_modified-pos1_modified
+    resolution_height = resolution(10,norm(axis),minimum=2) if resolution_height == None else resolution_height
+    resolution_theta = resolution(15) if resolution_theta == None else resolution_theta
+    resolution_radius = resolution(10,minimum=2) if resolution_radius == None else resolution_radius
+
+    # The grid is obtained by scaling and moving a cached beam of unit length and radius (along U_X)
+    template = UnitBeamGrid(radial_fade_factor,resolution_height,resolution_theta,resolution_radius,surfacic_cells)
+    matrix = poseMatrix(pos1_modified,axis) @ np.diag((norm(axis),radius,radius,1.0))
+    grid = template.transform(matrix,inplace=False)
+    grid["r"] = template["r"]*floatType()(radius)
 
-    grid = CylindricalVolumeGrid(pos1_modified,axis,radius_profile=lambda p:radius,resolution_height=resolution_height,resolution_theta=resolution_theta,resolution_radius=resolution_radius,surfacic_cells=surfacic_cells)
-    
     # We then do the eventual clipping of the beam on both ends
     if type(clipping_normal_start) != type(None):
         if np.dot(clipping_normal_start,axis) > 0: # Automatically choose the right side of the clipping plane
             clipping_normal_start = -clipping_normal_start
-        grid.clip(clipping_normal_start,pos1,inplace=True)
+        grid.clip(normal=clipping_normal_start,origin=pos1,inplace=True)
     if type(clipping_normal_end) != type(None):
         if np.dot(clipping_normal_end,axis) < 0: # Automatically choose the right side of the clipping plane
             clipping_normal_end = -clipping_normal_end
-        grid.clip(clipping_normal_end,pos2,inplace=True)
+        grid.clip(normal=clipping_normal_end,origin=pos2,inplace=True)
+    if type(clipping_normal_start) != type(None) or type(clipping_normal_end) != type(None): # New points were created by the clipping
+        grid["intensity"] = StraightBeamIntensity(grid["r"],radius,radial_fade_factor).astype(floatType(),copy=False)
 
-    # Adding the 'intensity' scalar field
-    if radial_fade_factor == 0:
-        intensity = np.ones(grid["r"].shape)
-    else:
-        intensity = np.exp(-(grid["r"]/(radius/radial_fade_factor))**2)
-    grid["intensity"] = intensity
+    return grid
 
+@memoized
+def UnitBeamGrid(radial_fade_factor=2,resolution_height=10,resolution_theta=15,resolution_radius=10,surfacic_cells=False):
+    """Grid of a straight beam of unit length and radius, starting at the origin and directed along U_X, with its 'intensity' field."""
+    grid = CylindricalVolumeGrid(ORIGIN,U_X,radius_profile=lambda p:1.0,resolution_height=resolution_height,resolution_theta=resolution_theta,resolution_radius=resolution_radius,surfacic_cells=surfacic_cells)
+    grid["intensity"] = StraightBeamIntensity(grid["r"],1.0,radial_fade_factor).astype(floatType(),copy=False)
     return grid
 
-def FocusedBeamVolumeGrid(pos1,pos2,focus_pos_param,starting_radius=None,divergence=None,resolution_height=30,resolution_radius=25,radial_fade_factor=2,surfacic_cells=False):
+def StraightBeamIntensity(r,radius,radial_fade_factor=2):
+    """Gaussian radial intensity profile of a straight beam, as a function of the distance r to its axis."""
+    if radial_fade_factor == 0:
+        return np.ones(np.shape(r),dtype=np.asarray(r).dtype)
+    return np.exp(-(r/(radius/radial_fade_factor))**2)
+
+@instrumented("constructor")
+def FocusedBeamVolumeGrid(pos1,pos2,focus_pos_param,starting_radius=None,divergence=None,resolution_height=None,resolution_radius=None,radial_fade_factor=2,surfacic_cells=False):
+    # Resolutions left to None depend on the quality settings (see phyvista.quality)
     if divergence==None and starting_radius==None:
         raise ValueError("Please provide either a divergence value or a starting_radius.")
     pos1 = pos1.center if type(pos1)==OpticsElement else np.array(pos1)
     pos2 = ops2.center if type(pos2)==OpticsElement else np.array(pos2)
     length = np.sqrt(np.linalg.norm(pos1-pos2))
+    resolution_height = resolution(30,norm(pos2-pos1),minimum=2) if resolution_height == None else resolution_height
+    resolution_radius = resolution(25,minimum=2) if resolution_radius == None else resolution_radius
     if starting_radius == None:
         radius_factor = np.tan(divergence)*length
     else:
         radius_factor = starting_radius/focus_pos_param
     radius_profile = lambda p:np.maximum(abs(p-focus_pos_param),0.001)*radius_factor
-    grid = CylindricalVolumeGrid(pos1,pos2-pos1,radius_profile,resolution_height,resolution_theta=15,resolution_radius=resolution_radius,include_parameter=focus_pos_param,surfacic_cells=surfacic_cells)
+    grid = CylindricalVolumeGrid(pos1,pos2-pos1,radius_profile,resolution_height,resolution_theta=resolution(15),resolution_radius=resolution_radius,include_parameter=focus_pos_param,surfacic_cells=surfacic_cells)
     profile = radius_profile(grid["axis_param"])
     if radial_fade_factor == 0:
         intensity = 1/(profile**2)
     else:
         intensity = np.exp(-(grid["r"]/(profile/radial_fade_factor))**2)/(profile**2)
-    grid["intensity"] = intensity
+    grid["intensity"] = intensity.astype(floatType(),copy=False)
     return grid
 
+class StraightBeamField:
+    """Analytic intensity of a straight beam (see StraightBeamIntensity), as a function of world-space points.
+
+    Args:
+        pos1, pos2 (3Dvector-like): Ends of the beam axis
+        radius (float): Beam radius
+        radial_fade_factor (float, optional): Characterizes the gaussian cutoff. Defaults to 2.
+        clipping_planes (list of (normal,point), optional): The intensity is zero on the outer side (pointed by the normal) of each plane. Defaults to ().
+    """
+    def __init__(self,pos1,pos2,radius,radial_fade_factor=2,clipping_planes=()):
+        self.origin = np.array(pos1,dtype=np.float64)
+        self.end = np.array(pos2,dtype=np.float64)
+        self.axis = normalized(self.end-self.origin)
+        self.radius = radius
+        self.radial_fade_factor = radial_fade_factor
+        self.clipping_planes = [(np.array(normal,dtype=np.float64),np.array(point,dtype=np.float64)) for normal,point in clipping_planes]
+
+    def __call__(self,points):
+        relative = np.asarray(points,dtype=np.float64) - self.origin
+        r = np.linalg.norm(relative - np.outer(relative @ self.axis,self.axis),axis=1)
+        intensity = np.where(r <= self.radius,StraightBeamIntensity(r,self.radius,self.radial_fade_factor),0.0)
+        return clippedIntensity(intensity,points,self.clipping_planes)
+
+def straightBeamField(pos1,pos2,radius,radial_fade_factor=2,clipping_normal_start=None,clipping_normal_end=None) -> StraightBeamField:
+    """Returns the StraightBeamField of a beam defined as in StraightBeam (its ends may be OpticsElements, the clipping normals are oriented outwards)."""
+    if type(pos1) == OpticsElement:
+        pos1, clipping_normal_start = pos1.center,pos1.normal
+    if type(pos2) == OpticsElement:
+        pos2, clipping_normal_end = pos2.center,pos2.normal
+    pos1 = np.array(pos1,dtype=np.float64)
+    pos2 = np.array(pos2,dtype=np.float64)
+    axis = pos2-pos1
+    planes = []
+    if type(clipping_normal_start) != type(None):
+        clipping_normal_start = normalized(np.array(clipping_normal_start,dtype=np.float64))
+        planes.append((-clipping_normal_start if np.dot(clipping_normal_start,axis) > 0 else clipping_normal_start,pos1))
+    if type(clipping_normal_end) != type(None):
+        clipping_normal_end = normalized(np.array(clipping_normal_end,dtype=np.float64))
+        planes.append((-clipping_normal_end if np.dot(clipping_normal_end,axis) < 0 else clipping_normal_end,pos2))
+    return StraightBeamField(pos1,pos2,radius,radial_fade_factor,planes)
+
+class FocusedBeamField:
+    """Analytic intensity of a beam perfectly focused at a point (see FocusedBeamVolumeGrid), as a function of world-space points.
+
+    Args:
+        pos1, pos2 (3Dvector-like): Ends of the beam axis
+        focus_pos_param (float): Relative distance from pos1 to the focusing point
+        radius_factor (float): Beam radius per unit of relative distance to the focusing point
+        radial_fade_factor (float, optional): Characterizes the radial fade-out. Defaults to 2.
+    """
+    def __init__(self,pos1,pos2,focus_pos_param,radius_factor,radial_fade_factor=2):
+        self.origin = np.array(pos1,dtype=np.float64)
+        self.axis = np.array(pos2,dtype=np.float64)-self.origin
+        self.focus_pos_param = focus_pos_param
+        self.radius_factor = radius_factor
+        self.radial_fade_factor = radial_fade_factor
+
+    def profile(self,axis_param):
+        return np.maximum(abs(axis_param-self.focus_pos_param),0.001)*self.radius_factor
+
+    def __call__(self,points):
+        relative = np.asarray(points,dtype=np.float64) - self.origin
+        axis_param = relative @ self.axis/np.dot(self.axis,self.axis)
+        r = np.linalg.norm(relative - np.outer(axis_param,self.axis),axis=1)
+        profile = self.profile(axis_param)
+        if self.radial_fade_factor == 0:
+            intensity = 1/(profile**2)
+        else:
+            intensity = np.exp(-(r/(profile/self.radial_fade_factor))**2)/(profile**2)
+        inside = (r <= profile) & (axis_param >= 0) & (axis_param <= 1)
+        return np.where(inside,intensity,0.0)
+
+def focusedBeamField(pos1,pos2,focus_pos_param,starting_radius=None,divergence=None,radial_fade_factor=2) -> FocusedBeamField:
+    """Returns the FocusedBeamField of a beam defined as in FocusedBeam."""
+    if divergence==None and starting_radius==None:
+        raise ValueError("Please provide either a divergence value or a starting_radius.")
+    pos1 = pos1.center if type(pos1)==OpticsElement else np.array(pos1,dtype=np.float64)
+    pos2 = pos2.center if type(pos2)==OpticsElement else np.array(pos2,dtype=np.float64)
+    length = np.sqrt(np.linalg.norm(pos1-pos2)) # Same convention as FocusedBeamVolumeGrid
+    if starting_radius == None:
+        radius_factor = np.tan(divergence)*length
+    else:
+        radius_factor = starting_radius/focus_pos_param
+    return FocusedBeamField(pos1,pos2,focus_pos_param,radius_factor,radial_fade_factor)
+
+class DistanceField:
+    """Distance to a center, as a function of world-space points (field 'r' of SphericalVolumeGrid)."""
+    def __init__(self,center):
+        self.center = np.array(center,dtype=np.float64)
+
+    def __call__(self,points):
+        return np.linalg.norm(np.asarray(points,dtype=np.float64)-self.center,axis=1)
+
+def clippedIntensity(intensity,points,clipping_planes):
+    """Sets the intensity to zero on the outer side of each (normal,point) plane."""
+    for normal,point in clipping_planes:
+        intensity = np.where((np.asarray(points)-point) @ normal > 0,0.0,intensity)
+    return intensity
+
+FIELD_CHUNK_SIZE = 2**12
+
+def FieldImageGrid(field,matrix,bounds,dimensions,name="intensity"):
+    """Samples a world-space field on a regular grid defined in a local frame.
+
+    Args:
+        field (callable): Function of an (N,3) array of world-space points, returning N values
+        matrix (4x4 array): Placement of the local frame in the world
+        bounds (6-tuple): Local bounds (xmin,xmax,ymin,ymax,zmin,zmax) of the grid
+        dimensions (3-tuple of int): Number of points along each local axis
+        name (str, optional): Name of the point field. Defaults to "intensity".
+
+    Returns:
+        pyvista.ImageData, in local coordinates (to be placed with matrix, e.g. as the matrix of an Element)
+    """
+    bounds = np.asarray(bounds,dtype=np.float64).reshape(3,2)
+    dimensions = np.asarray(dimensions)
+    spacing = (bounds[:,1]-bounds[:,0])/np.maximum(dimensions-1,1)
+    image = pv.ImageData(dimensions=dimensions,origin=bounds[:,0],spacing=spacing)
+    values = np.empty(image.n_points,dtype=np.float32) # Single precision is enough for rendering
+    for start in range(0,image.n_points,FIELD_CHUNK_SIZE): # The points are generated by chunks, to bound the temporary memory
+        index = np.arange(start,min(start+FIELD_CHUNK_SIZE,image.n_points))
+        ijk = np.stack((index % dimensions[0],(index // dimensions[0]) % dimensions[1],index // (dimensions[0]*dimensions[1])),axis=-1)
+        local_points = bounds[:,0] + ijk*spacing
+        values[start:start+len(index)] = field(local_points @ matrix[0:3,0:3].T + matrix[0:3,3])
+    image[name] = values
+    return image
+
+@instrumented("constructor")
+def StraightBeamImageGrid(pos1,pos2,radius,radial_fade_factor=2,resolution_height=None,resolution_transverse=None,clipping_normal_start=None,clipping_normal_end=None):
+    """Regular grid of the intensity of a straight beam, in the frame of the beam (its axis along U_X, starting at the origin).
+    The clipping planes are applied analytically on the intensity, and the sampling along the axis is refined near them.
+
+    Returns:
+        (pyvista.ImageData, 4x4 numpy array): The grid, and the matrix placing it in the world
+    """
+    # Resolutions left to None depend on the quality settings (see phyvista.quality)
+    field = straightBeamField(pos1,pos2,radius,radial_fade_factor,clipping_normal_start,clipping_normal_end)
+    axis = field.end-field.origin
+    length = norm(axis)
+    resolution_transverse = resolution(15) if resolution_transverse == None else resolution_transverse
+    start,end = 0.0,length
+    # The beam is prolonged up to its clipping planes (oriented outwards), as far as their tilt requires
+    for normal,point in field.clipping_planes:
+        if np.dot(normal,axis) < 0:
+            start = -clippingOverhang(normal,axis,radius)
+        else:
+            end = length+clippingOverhang(normal,axis,radius)
+    if resolution_height == None:
+        # The intensity is constant along the axis : only the clipped ends need a finer sampling (voxels twice as long as wide)
+        resolution_height = resolution(10,length,minimum=2)
+        if len(field.clipping_planes) > 0:
+            resolution_height = max(resolution_height,int(np.ceil((end-start)/(4*radius/resolution_transverse)))+1)
+    matrix = poseMatrix(field.origin,axis)
+    grid = FieldImageGrid(field,matrix,(start,end,-radius,radius,-radius,radius),(resolution_height,resolution_transverse,resolution_transverse))
+    return grid,matrix
+
+def clippingOverhang(normal,axis,radius):
+    """Distance along the axis between the center and the farthest edge of a beam of the given radius, cut by a plane of the given normal (at most 3 radii)."""
+    cosine = abs(np.dot(normalized(normal),normalized(axis)))
+    return radius*min(np.sqrt(1-cosine**2)/max(cosine,1e-12),3.0)
+
+@instrumented("constructor")
+def FocusedBeamImageGrid(pos1,pos2,focus_pos_param,starting_radius=None,divergence=None,resolution_height=None,resolution_transverse=None,radial_fade_factor=2):
+    """Regular grid of the intensity of a beam perfectly focused at a point, in the frame of the beam (its axis along U_X, starting at the origin). See FocusedBeam.
+
+    A plane of samples goes through the focusing point, and the transverse spacing resolves the waist seen by the axial sampling (the beam radius one axial step away from the focus) with two voxels.
+    As the spacing is uniform, the number of voxels grows as the cube of resolution_height : for tightly focused beams, the 'unstructured' grid (see FocusedBeamVolumeGrid), whose cells follow the beam radius, is lighter.
+
+    Args:
+        resolution_height (int, optional): Number of sample planes along the beam (one more may be added to sample the focus). Defaults to None (depending on the quality settings).
+        resolution_transverse (int, optional): Number of samples across the beam. Defaults to None (resolving the waist, within 6 times the default resolution).
+
+    Returns:
+        (pyvista.ImageData, 4x4 numpy array): The grid, and the matrix placing it in the world
+    """
+    field = focusedBeamField(pos1,pos2,focus_pos_param,starting_radius,divergence,radial_fade_factor)
+    length = norm(field.axis)
+    resolution_height = resolution(30,length,minimum=2) if resolution_height == None else resolution_height
+    step = length/(resolution_height-1)
+    # The planes are shifted to include the focus, the grid starting and ending less than a step beyond the beam (where the field is zero)
+    focus = focus_pos_param*length
+    start,end = focus-np.ceil(focus/step-1e-9)*step,focus+np.ceil((length-focus)/step-1e-9)*step
+    half_width = field.profile(np.array((0.0,1.0))).max()
+    if resolution_transverse == None:
+        waist = field.profile(focus_pos_param+step/length)
+        resolution_transverse = int(np.clip(np.ceil(4*half_width/waist)+1,resolution(25,minimum=3),resolution(150,minimum=3)))
+        resolution_transverse += 1-resolution_transverse%2 # Odd, for samples on the axis
+    matrix = poseMatrix(field.origin,field.axis)
+    grid = FieldImageGrid(field,matrix,(start,end,-half_width,half_width,-half_width,half_width),(int(round((end-start)/step))+1,resolution_transverse,resolution_transverse))
+    return grid,matrix
+
 def GlowingOrbMaterial(color,saturation_color="white"):
+    from matplotlib import colors # Only imported when needed, for a faster import of phyvista
     return materials.Material("volume",cmap=colors.LinearSegmentedColormap.from_list("",[saturation_color,color]),opacity="linear_r",opacity_unit_distance=0.7)
 
 def VolumicBeamMaterial(color="red",relative_intensity=1,opacity_unit_distance=1,**parameters):
@@ -125,8 +361,9 @@ def SimpleBeamMaterial(color="red",relative_intensity=1.0):
     opacity = 0.1 if (materials.getAutoStyle() == "light") else 0.2 # Default opacity depending on the overall theme
     return materials.Material(color=color,opacity=opacity*relative_intensity,ambient=1,diffuse=1)
 
+@instrumented("constructor")
 def CylindricalVolumeGrid(origin,axis,radius_profile,resolution_height=20,resolution_radius=20,resolution_theta=60,include_parameter=None,surfacic_cells=False):
-    # radius_profile is a function of the axis parameter (from 0 to 1)
+    # radius_profile is a function of the axis parameter (from 0 to 1), evaluated once on the array of all the axis parameters
     # include_parameter has to be included in addition to the equidistant points
     # First, get a basis for the plane orthgonal to the axis
     U_temp = U_X if norm(np.cross(axis,U_X)) != 0 else U_Y
@@ -135,72 +372,52 @@ def CylindricalVolumeGrid(origin,axis,radius_profile,resolution_height=20,resolu
 
     origin = np.array(origin)
     axis = np.array(axis)
-    pointlist = []
-    
-    cells = []
-    celltypes = []
-    rlist = []
-    paramlist = []
-    # Build manually the different values of axis_param :
-    axis_param_stops = []
-    for i_h in range(resolution_height):
-        next_axis_param = i_h/(resolution_height-1)
-        if include_parameter != None and include_parameter < next_axis_param:
-            axis_param_stops.append(include_parameter)
-            include_parameter = None
-        axis_param_stops.append(next_axis_param)
-
-    i = -1
-    points_per_cylinder = resolution_theta*len(axis_param_stops)
-
-    # Start with the points on the central axis
-    for axis_param in axis_param_stops:
-        pt = origin + axis_param*axis
-        pointlist.append(pt)
-        paramlist.append(axis_param)
-        rlist.append(0)
-    i = len(pointlist)-1 # Index of the last point added
-
-    # We build the grid from the inside out
-    for i_r in range(1,resolution_radius):
-        for i_axis,axis_param in enumerate(axis_param_stops):
-            r = i_r*radius_profile(axis_param)/(resolution_radius-1)
-            for i_theta in range(resolution_theta):
-                theta = 2*np.pi*i_theta/resolution_theta
-                pt = origin + axis_param*axis + (np.cos(theta)*U + np.sin(theta)*V)*r
-                pointlist.append(pt)
-                paramlist.append(axis_param)
-                rlist.append(r)
-                i += 1
-                if i_r > 0 and i_axis > 0:
-                    im1 = i-1
-                    if i_theta == 0:
-                        im1 += resolution_theta
-                    if surfacic_cells:# Case where we only want 'leek' surfaces
-                        cell = [4,i,im1,im1-resolution_theta,i-resolution_theta]
-                        cells.append(cell)
-                    else:
-                        if i_r == 1: # First circle (wedges)
-                            cell = [6,i,im1,i_axis,i-resolution_theta,im1-resolution_theta,i_axis-1]
-                            cells.append(cell)
-                        else: # Hexahedrons
-                            # Changed into 2 wedges
-                            cell1 = [6,i,im1-points_per_cylinder,i-points_per_cylinder,i-resolution_theta,im1-points_per_cylinder-resolution_theta,i-points_per_cylinder-resolution_theta]
-                            cells.append(cell1)
-                            cell2 = [6,i,im1,im1-points_per_cylinder,i-resolution_theta,im1-resolution_theta,im1-points_per_cylinder-resolution_theta]
-                            cells.append(cell2)
-    if surfacic_cells:
-        usg = pv.UnstructuredGrid(cells, np.full(len(cells),pv.CellType.QUAD,dtype=np.uint), pointlist)
-    else: 
-        usg = pv.UnstructuredGrid(cells, np.full(len(cells),pv.CellType.WEDGE,dtype=np.uint), pointlist)
-    usg["r"] = rlist
-    usg["axis_param"] = paramlist
+
+    # Build the different values of axis_param :
+    axis_param_stops = np.arange(resolution_height)/(resolution_height-1)
+    if include_parameter != None and include_parameter < axis_param_stops[-1]: # Inserted before the first larger stop
+        axis_param_stops = np.insert(axis_param_stops,np.searchsorted(axis_param_stops,include_parameter,side="right"),include_parameter)
+    n_axis = len(axis_param_stops)
+    points_per_cylinder = resolution_theta*n_axis
+
+    # Points on the central axis first, then the cylinders from the inside out (index order : radius, axis, angle)
+    axis_points = origin + axis_param_stops[:,None]*axis
+    profile = np.broadcast_to(np.asarray(radius_profile(axis_param_stops),dtype=np.float64),axis_param_stops.shape)
+    radii = np.arange(1,resolution_radius)[:,None]*profile[None,:]/(resolution_radius-1) # Shape (radius,axis)
+    thetas = 2*np.pi*np.arange(resolution_theta)/resolution_theta
+    directions = np.cos(thetas)[:,None]*U + np.sin(thetas)[:,None]*V # Shape (angle,3)
+    cylinder_points = axis_points[None,:,None,:] + directions[None,None,:,:]*radii[:,:,None,None]
+    points = np.concatenate((axis_points,cylinder_points.reshape(-1,3)))
+    rlist = np.concatenate((np.zeros(n_axis),np.repeat(radii.reshape(-1),resolution_theta)))
+    paramlist = np.concatenate((axis_param_stops,np.tile(np.repeat(axis_param_stops,resolution_theta),resolution_radius-1)))
+
+    # Connectivity : each point 'i' not on the first axis stop closes a cell with its neighbours in angle ('im1'), axis ('-resolution_theta') and radius ('-points_per_cylinder')
+    i_axis = np.arange(1,n_axis)[None,:,None]
+    i = n_axis + np.arange(resolution_radius-1)[:,None,None]*points_per_cylinder + i_axis*resolution_theta + np.arange(resolution_theta)[None,None,:]
+    im1 = i - 1 + resolution_theta*(np.arange(resolution_theta) == 0)
+    i_axis = np.broadcast_to(i_axis,i.shape)
+    T,P = resolution_theta,points_per_cylinder
+    if surfacic_cells:# Case where we only want 'leek' surfaces
+        cells = np.stack((i,im1,im1-T,i-T),axis=-1).reshape(-1,4)
+        celltype = pv.CellType.QUAD
+    else:
+        wedges = np.stack((i[0],im1[0],i_axis[0],i[0]-T,im1[0]-T,i_axis[0]-1),axis=-1).reshape(-1,6) # First circle
+        i,im1 = i[1:],im1[1:] # Hexahedrons, changed into 2 wedges
+        cell1 = np.stack((i,im1-P,i-P,i-T,im1-P-T,i-P-T),axis=-1)
+        cell2 = np.stack((i,im1,im1-P,i-T,im1-T,im1-P-T),axis=-1)
+        cells = np.concatenate((wedges,np.stack((cell1,cell2),axis=-2).reshape(-1,6)))
+        celltype = pv.CellType.WEDGE
+    usg = UnstructuredGridFromCells(points,cells,celltype)
+    usg["r"] = rlist.astype(floatType(),copy=False)
+    usg["axis_param"] = paramlist.astype(floatType(),copy=False)
     return usg
 
+@instrumented("constructor")
 def SphericalVolumeGrid(center,radius):
     """
     Builds a spherical volume grid based on pyvista.SolidSphere, but adds the scalar field 'r' (distance to the center) on the points.
     """
-    s = pv.SolidSphere(outer_radius=radius,theta_resolution=20,phi_resolution=20)
-    s["r"] = [norm(v) for v in s.points]
+    s = pv.SolidSphere(outer_radius=radius,theta_resolution=resolution(20,2*radius),phi_resolution=resolution(20,2*radius))
+    s = compactGrid(s)
+    s["r"] = np.linalg.norm(s.points,axis=1)
     return s.translate(center)
\ No newline at end of file
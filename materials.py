@@ -1,23 +1,91 @@
 import pyvista as pv
-from matplotlib import colors
+import numpy as np
+import operator
+import weakref
+from types import MappingProxyType
+from phyvista.profiling import instrumented
+
+MATERIALS = weakref.WeakValueDictionary() # Interned materials, by class and frozen properties
+PLOTTER_PROPERTIES = weakref.WeakKeyDictionary() # Properties shared by the actors of each material, by plotter (see actorProperties)
+THEME_SETTINGS = operator.attrgetter("color","edge_color","edge_opacity","show_edges","show_vertices","line_width","point_size","point_shape","opacity","render_lines_as_tubes","render_points_as_spheres",
+                                     "lighting_params.ambient","lighting_params.diffuse","lighting_params.specular","lighting_params.specular_power","lighting_params.metallic","lighting_params.roughness","lighting_params.interpolation") # Settings of a theme used by add_mesh for the properties of new actors
+PROPERTY_KEYS = {"color","ambient","diffuse","specular","specular_power","metallic","roughness","pbr","show_edges","edge_color","edge_opacity","line_width","point_size","lighting","render_lines_as_tubes"} # Arguments of add_mesh only setting the vtkProperty of the actor
+
+class IdentityKey:
+    """Hashable stand-in for a property value which can neither be hashed nor compared by content (compared by identity)."""
+    __slots__ = ("value",)
+    def __init__(self,value):
+        self.value = value
+
+    def __hash__(self):
+        return id(self.value)
+
+    def __eq__(self,other):
+        return type(other) == IdentityKey and other.value is self.value
+
+def frozen(value):
+    """Returns a hashable version of a property value, equal for values rendered identically (e.g. [0,1] and (0,1))."""
+    if isinstance(value,(list,tuple)):
+        return ("sequence",)+tuple(frozen(v) for v in value)
+    if isinstance(value,np.ndarray):
+        return ("array",value.dtype.str,value.shape,value.tobytes())
+    if isinstance(value,dict):
+        return ("dict",)+tuple(sorted(((key,frozen(v)) for key,v in value.items()),key=lambda item:item[0]))
+    if callable(value) and hasattr(value,"N") and hasattr(value,"name"): # Matplotlib colormap, compared by its colors
+        return ("colormap",value.name,np.asarray(value(np.linspace(0,1,value.N))).tobytes())
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return IdentityKey(value)
 
 class Material:
-    def __init__(self,renderingStyle="mesh",plottedField=None,**properties):
-        self.renderingStyle = renderingStyle
-        self.properties = properties
-        self.plottedField = plottedField
+    """Rendering properties of an Element : keyword arguments of pyvista.Plotter.add_mesh (or add_volume if renderingStyle is 'volume').
+    Materials are immutable and interned : creating a material equal to an existing one returns the same object, so that elements share their materials and equal materials are recognized by identity (e.g. to batch elements, see Group.plotSelf).
+
+    Args:
+        renderingStyle (str, optional): 'mesh' or 'volume'. Defaults to "mesh".
+        plottedField (str, optional): Name of the scalar field plotted by volumes. Defaults to None.
+        **properties: Keyword arguments of add_mesh or add_volume
+    """
+    __slots__ = ("renderingStyle","plottedField","properties","__weakref__")
+
+    def __new__(cls,renderingStyle="mesh",plottedField=None,**properties):
+        key = (cls,renderingStyle,plottedField,tuple(sorted(((name,frozen(value)) for name,value in properties.items()),key=lambda item:item[0])))
+        material = MATERIALS.get(key)
+        if material == None:
+            material = object.__new__(cls)
+            object.__setattr__(material,"renderingStyle",renderingStyle)
+            object.__setattr__(material,"plottedField",plottedField)
+            object.__setattr__(material,"properties",MappingProxyType(dict(properties)))
+            MATERIALS[key] = material
+        return material
+
+    def __setattr__(self,name,value):
+        raise AttributeError("Materials are immutable, use variant() to get a modified material")
+
+    def __delattr__(self,name):
+        raise AttributeError("Materials are immutable")
+
+    def __reduce__(self): # Unpickled materials are interned as well
+        return (internedMaterial,(type(self),self.renderingStyle,self.plottedField,dict(self.properties)))
+
+    def __repr__(self):
+        arguments = [repr(self.renderingStyle)] + ([repr(self.plottedField)] if self.plottedField != None else []) + [f"{name}={value!r}" for name,value in self.properties.items()]
+        return f"{type(self).__name__}({','.join(arguments)})"
 
     def modify(self,**properties):
-        for key in properties.keys():
-            self.properties[key] = properties[key]
+        raise TypeError("Materials are immutable (they are shared between elements), use variant() to get a modified material")
 
     def copy(self):
-        return Material(self.renderingStyle,self.plottedField,**(self.properties))
+        return self # Immutable, hence shared
 
     def variant(self,**properties):
-        newmat = self.copy()
-        newmat.modify(**properties)
-        return newmat
+        """Returns the material with some properties added or changed."""
+        return type(self)(self.renderingStyle,self.plottedField,**{**self.properties,**properties})
+
+def internedMaterial(cls,renderingStyle,plottedField,properties):
+    return cls(renderingStyle,plottedField,**properties)
 
 GLASS_DARK_THEME = Material(color="white",opacity=0.6,specular=1,diffuse=0.1,smooth_shading=True, split_sharp_edges=True,specular_power=20)
 GLASS_LIGHT_THEME = Material(color="lightblue",opacity=0.3,specular=1,diffuse=0.2,ambient=1,smooth_shading=True, split_sharp_edges=True,specular_power=20)
@@ -48,16 +116,70 @@ def getMETAL(style="auto"):
 def SmoothMaterial(color) -> Material:
     return Material(color=color,smooth_shading=True)
 
+@instrumented("actor")
 def plotGridWithMaterial(plotter,grid,material):
-    if type(material) == Material:
-        if material.renderingStyle == "mesh":
-            plotter.add_mesh(grid,**(material.properties))
-        elif material.renderingStyle == "volume":
-            if material.plottedField != None:
-                plotter.add_volume(grid,scalars=material.plottedField,**material.properties,show_scalar_bar=False)
-            else:
-                plotter.add_volume(grid,**material.properties,show_scalar_bar=False)
+    """Adds the grid to the plotter with the given material (or color string), and returns the created actor.
+    The first actor of a material in a plotter is created by add_mesh from all its properties, and its vtkProperty is then shared by the next actors of the material in this plotter (see actorProperties). Set a new property (actor.prop = ...) rather than modifying it to change a single actor."""
+    if type(material) == str:
+        material = Material(color=material) # Simple color material
+    if material.renderingStyle == "mesh":
+        return plotMesh(plotter,grid,material)
+    elif material.renderingStyle == "volume":
+        if material.plottedField != None:
+            return plotter.add_volume(grid,scalars=material.plottedField,**material.properties,show_scalar_bar=False)
         else:
-            raise ValueError(f"Unknown material renderingStyle : '{material.renderingStyle}'")
+            return plotter.add_volume(grid,**material.properties,show_scalar_bar=False)
     else:
-        plotter.add_mesh(grid,color=material)
\ No newline at end of file
+        raise ValueError(f"Unknown material renderingStyle : '{material.renderingStyle}'")
+
+def meshArguments(material):
+    """Returns the properties of a mesh material which are not stored in the vtkProperty of its actors (see PROPERTY_KEYS), such as smooth_shading or scalar mappings."""
+    opacity = material.properties.get("opacity",1.0)
+    return {name:value for name,value in material.properties.items() if name not in PROPERTY_KEYS and not (name == "opacity" and isinstance(opacity,(int,float)))}
+
+def actorProperties(plotter):
+    """Returns the dictionnary {material : vtkProperty} of the properties shared by the actors of the plotter, or None if they cannot be shared.
+    It is emptied when the settings of the theme of the plotter change, so that the next actors follow them."""
+    theme = getattr(plotter,"theme",None)
+    if theme == None or theme.silhouette.enabled: # Silhouettes are extra actors, only created by add_mesh
+        return None
+    settings = THEME_SETTINGS(theme)
+    entry = PLOTTER_PROPERTIES.get(plotter)
+    if entry == None or entry[0] != settings:
+        entry = PLOTTER_PROPERTIES[plotter] = (settings,weakref.WeakKeyDictionary())
+    return entry[1]
+
+def meshProperty(plotter,material):
+    """Returns a vtkProperty for the actors of a mesh material in the plotter : the shared one if any, or a new one built from the properties of the material (see PROPERTY_KEYS) and the theme of the plotter."""
+    shared = actorProperties(plotter)
+    prop = shared.get(material) if shared != None else None
+    if prop is None:
+        properties = material.properties
+        arguments = {name:value for name,value in properties.items() if name in PROPERTY_KEYS and name != "pbr"}
+        if isinstance(properties.get("opacity"),(int,float)):
+            arguments["opacity"] = properties["opacity"]
+        interpolation = "pbr" if properties.get("pbr",False) else "phong" if properties.get("smooth_shading",False) else None # None : from the theme
+        prop = pv.Property(theme=getattr(plotter,"theme",None),interpolation=interpolation,**arguments)
+        if shared != None and "color" in properties:
+            shared[material] = prop
+    return prop
+
+def plotMesh(plotter,grid,material):
+    properties = material.properties
+    shared = actorProperties(plotter)
+    prop = shared.get(material) if shared != None else None
+    if prop is None:
+        actor = plotter.add_mesh(grid,**properties)
+        if shared != None and "color" in properties: # Otherwise the color depends on the plotter (color cycling, plotted scalars)
+            shared[material] = actor.prop
+        return actor
+    arguments = meshArguments(material)
+    if len(arguments) == 0 or arguments == {"smooth_shading":False}: # Only the appearance of the surface : the actor is built directly
+        mapper = pv.DataSetMapper(grid)
+        mapper.scalar_visibility = False
+        actor = pv.Actor(mapper=mapper,prop=prop)
+        plotter.add_actor(actor)
+        return actor
+    actor = plotter.add_mesh(grid,**arguments) # e.g. smooth shading, which also needs the normals of the grid
+    actor.prop = prop
+    return actor
@@ -3,17 +3,21 @@ import numpy as np
 import os
 from phyvista.core import *
 from phyvista.materials import getGLASS, getMETAL
+from phyvista import constructors as constr
+from phyvista.cache import persistent
+from phyvista.profiling import instrumented
+from phyvista.quality import resolution
 from pyvista.core.utilities import transformations as transf
 
 class OpticsElement(Element):
-    def __init__(self,grid,material,center,normal):
-        super().__init__(grid,material)
+    def __init__(self,grid,material,center,normal,matrix=None,kind="plate",aperture=np.inf,focal_length=None):
+        super().__init__(grid,material,matrix)
         self.center = np.array(center) # Position on which light beams can be transmitted/reflected
         self.normal = np.array(normal) # Normal of the reflective/transmissive surface
+        self.kind = kind # Effect on light rays (see phyvista.raytracing) : 'mirror', 'splitter', 'lens' or 'plate' (no deviation)
+        self.aperture = aperture # Radius of the reflective/transmissive surface around its center
+        self.focal_length = focal_length # For lenses only
 
-    def copy(self):
-        return OpticsElement(self.grid.copy(),self.material.copy(),self.center,self.normal)
-    
     def transform(self,transform,normal_transform=np.eye(4),inplace=False):
         if inplace:
             super().transform(transform,True)
@@ -52,8 +56,8 @@ class OpticsElement(Element):
         """
         if type(point) == type(None):
             point = self.center
-        point_transform = transf.axis_angle_rotation(vector,angle,point)
-        normal_transform = transf.axis_angle_rotation(vector,angle,ORIGIN)
+        point_transform = transf.axis_angle_rotation(vector,angle,point=point)
+        normal_transform = transf.axis_angle_rotation(vector,angle,point=ORIGIN)
         return self.transform(point_transform,normal_transform,inplace=inplace)
 
     def rotate_x(self,angle,point=None,inplace=False):
@@ -67,21 +71,26 @@ class OpticsElement(Element):
 
     # TODO : also other transformations...
 
-def BiconvexLensGrid(position,direction,radius,curvature_radius,minimum_width=0,curvature_radius_back=None): 
-    """Builds the geometry of a lens as an intersection of two spheres and a cylinder."""
+@instrumented("constructor")
+@persistent
+def BiconvexLensGrid(position,direction,radius,curvature_radius,minimum_width=0,curvature_radius_back=None,theta_resolution=None,phi_resolution=None): 
+    """Builds the geometry of a lens as an intersection of two spheres and a cylinder. The default resolutions of the spheres depend on the quality settings (see phyvista.quality)."""
     position,direction = np.array(position), np.array(direction)
+    theta_resolution = resolution(100,2*radius) if theta_resolution == None else theta_resolution
+    phi_resolution = resolution(50,2*radius) if phi_resolution == None else phi_resolution
     d1 = np.sqrt(curvature_radius**2-radius**2) - minimum_width/2 # Pythagoras
-    s1 = pv.Sphere(center=position-d1*direction,radius=curvature_radius,theta_resolution=100,phi_resolution=50)
+    s1 = pv.Sphere(center=position-d1*direction,radius=curvature_radius,theta_resolution=theta_resolution,phi_resolution=phi_resolution)
     if curvature_radius_back == None:
         curvature_radius_back = curvature_radius
     d2 = np.sqrt(curvature_radius_back**2-radius**2) - minimum_width/2
-    s2 = pv.Sphere(center=position+d2*direction,radius=curvature_radius_back,theta_resolution=100,phi_resolution=50)
+    s2 = pv.Sphere(center=position+d2*direction,radius=curvature_radius_back,theta_resolution=theta_resolution,phi_resolution=phi_resolution)
     if minimum_width == 0:
-        return s1.boolean_intersection(s2)
+        return constr.compactGrid(s1.boolean_intersection(s2))
     c = pv.Cylinder(center=position,direction=direction,radius=radius,height=2*(d1+d2)).triangulate(inplace=True)
-    return s1.boolean_intersection(s2).boolean_intersection(c)
+    return constr.compactGrid(s1.boolean_intersection(s2).boolean_intersection(c))
 
-def BiconvexLens(position,direction,radius,curvature_radius,minimum_width=0,curvature_radius_back=None) -> OpticsElement:
+@instrumented("constructor")
+def BiconvexLens(position,direction,radius,curvature_radius,minimum_width=0,curvature_radius_back=None,refractive_index=1.5) -> OpticsElement:
     """Returns an Element representing a biconvex lens
 
     Args:
@@ -91,6 +100,7 @@ def BiconvexLens(position,direction,radius,curvature_radius,minimum_width=0,curv
         curvature_radius (float): Curvature of the lens face
         minimum_width (float, optional): Edge width. Defaults to 0.
         curvature_radius_back (float, optional): Curvature of the backface. If None, it will be the same as the front face. Defaults to None.
+        refractive_index (float, optional): Used to compute the focal length (thin lens approximation) for ray tracing. Defaults to 1.5.
 
     Returns:
         Element
@@ -98,9 +108,12 @@ def BiconvexLens(position,direction,radius,curvature_radius,minimum_width=0,curv
     
     grid = BiconvexLensGrid(position,direction,radius,curvature_radius,minimum_width,curvature_radius_back)
     material = getGLASS()
-    return OpticsElement(grid,material,position,direction)
+    back = curvature_radius if curvature_radius_back == None else curvature_radius_back
+    focal_length = 1/((refractive_index-1)*(1/curvature_radius+1/back)) # Lensmaker's equation, thin lens
+    return OpticsElement(grid,material,position,direction,kind="lens",aperture=radius,focal_length=focal_length)
 
 
+@instrumented("constructor")
 def CubicSplitter(position,direction1,direction2,size=1.0) -> OpticsElement:
     """Creates an Element representing typically a polarized beam splitter
 
@@ -120,13 +133,14 @@ def CubicSplitter(position,direction1,direction2,size=1.0) -> OpticsElement:
     plane = [(dir1+dir2)/2,(dir1-dir2)/2,(-dir1-dir2)/2,(-dir1+dir2)/2]
     points = [pt - dir3/2 for pt in plane] + [pt + dir3/2 for pt in plane]
 
-    cells = [(4,0,1,2,3),(4,0,1,5,4),(4,1,2,6,5),(4,2,3,7,6),(4,0,3,7,4),(4,1,3,7,5),(4,4,5,6,7)]
+    cells = [(0,1,2,3),(0,1,5,4),(1,2,6,5),(2,3,7,6),(0,3,7,4),(1,3,7,5),(4,5,6,7)]
 
-    grid = pv.UnstructuredGrid(cells, np.full(len(cells),pv.CellType.QUAD,dtype=np.uint), points)
+    grid = constr.UnstructuredGridFromCells(points,cells,pv.CellType.QUAD)
     grid = grid.scale(size).translate(position)
 
-    return OpticsElement(grid,getGLASS(),position,direction1+direction2)
+    return OpticsElement(grid,getGLASS(),position,direction1+direction2,kind="splitter",aperture=size/2)
 
+@instrumented("constructor")
 def Plate(position,direction,radius=0.5,width=0.0) -> OpticsElement:
     """Creates an Element representing a waveplate or beamsplitter
 
@@ -139,9 +153,10 @@ def Plate(position,direction,radius=0.5,width=0.0) -> OpticsElement:
     Returns:
         Element : Element to be added to the plot
     """
-    grid = pv.Cylinder(position,direction,radius,height=width)
-    return OpticsElement(grid,getGLASS(),position,direction)
+    grid = constr.Cylinder(position,direction,radius,height=width)
+    return OpticsElement(grid,getGLASS(),position,direction,aperture=radius)
 
+@instrumented("constructor")
 def Mirror(position,direction,radius=0.5,width=0.0) -> OpticsElement:
     """Creates an Element representing a circular flat mirror
 
@@ -155,5 +170,5 @@ def Mirror(position,direction,radius=0.5,width=0.0) -> OpticsElement:
         OpticsElement: Element to be added to the plot
     """
     direction = normalized(np.array(direction))
-    grid = pv.Cylinder(center=position-width/2*direction,radius=radius,height=width,direction=direction)
-    return OpticsElement(grid,getMETAL(),position,direction)
\ No newline at end of file
+    grid = constr.Cylinder(center=position-width/2*direction,direction=direction,radius=radius,height=width)
+    return OpticsElement(grid,getMETAL(),position,direction,kind="mirror",aperture=radius)
\ No newline at end of file
@@ -0,0 +1,128 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+from phyvista.core import Element,Group
+from phyvista.serialization import elementToArrays,elementFromArrays
+
+class SceneBuilder:
+    """Collects deferred constructions of Elements (or Groups), and builds them all at once in a pool of processes.
+
+    The point, cell and data arrays of the results are sent back through shared memory blocks rather than pickled VTK objects.
+    Constructors (and their arguments) must be picklable, which is the case of all the module-level functions of phyvista.
+
+    Example:
+        builder = SceneBuilder()
+        builder.add(optics.BiconvexLens,pos_lens,U_X,0.5,1,minimum_width=0.05)
+        builder.add(light.StraightBeam,pos1,pos2,0.3,style="semirealistic")
+        group = builder.build()
+    """
+    def __init__(self):
+        self.tasks = []
+
+    def add(self,constructor,*args,**kwargs):
+        """Adds a deferred call to constructor(*args,**kwargs), which should return an Element or a Group. Returns the index of the task."""
+        self.tasks.append((constructor,args,kwargs))
+        return len(self.tasks)-1
+
+    def build(self,processes=None) -> Group:
+        """Runs all the constructions and returns a Group of the resulting elements, in the order in which they were added.
+
+        Args:
+            processes (int, optional): Number of worker processes. If None, the number of CPUs is used. If 1, the elements are built in the current process. Defaults to None.
+
+        Returns:
+            Group
+        """
+        if processes == 1:
+            results = [elementsOf(constructor(*args,**kwargs)) for constructor,args,kwargs in self.tasks]
+        else:
+            with ProcessPoolExecutor(processes) as pool:
+                futures = [pool.submit(buildAndSend,task) for task in self.tasks]
+                try:
+                    results = [[receiveElement(sent) for sent in future.result()] for future in futures]
+                except BaseException: # The blocks sent by the other tasks are not tracked by any process : they are freed before raising
+                    for future in futures:
+                        future.cancel()
+                    for future in futures:
+                        if not future.cancelled() and future.exception() == None:
+                            for sent in future.result():
+                                releaseBlocks(sent)
+                    raise
+        group = Group()
+        for elements in results:
+            group.elements.extend(elements)
+        return group
+
+def elementsOf(obj):
+    """Returns the list of elements of a Group, or a list containing only obj if it is an Element."""
+    if isinstance(obj,Element):
+        return [obj]
+    if isinstance(obj,Group):
+        return list(obj.elements)
+    raise TypeError(f"Constructors should return an Element or a Group, not '{type(obj).__name__}'")
+
+def buildAndSend(task):
+    """Worker function : builds the elements of a task and copies their arrays to new shared memory blocks."""
+    constructor,args,kwargs = task
+    sent_elements = []
+    try:
+        for element in elementsOf(constructor(*args,**kwargs)):
+            sent_elements.append(sendElement(element))
+    except BaseException: # The blocks already sent would never be received
+        for sent in sent_elements:
+            releaseBlocks(sent)
+        raise
+    return sent_elements
+
+def sendElement(element):
+    meta,arrays = elementToArrays(element)
+    blocks = {}
+    try:
+        for key,array in arrays.items():
+            array = np.ascontiguousarray(array)
+            if array.nbytes == 0: # Empty blocks are not allowed
+                blocks[key] = array
+                continue
+            block = shared_memory.SharedMemory(create=True,size=array.nbytes)
+            blocks[key] = (block.name,array.shape,array.dtype.str)
+            np.ndarray(array.shape,array.dtype,buffer=block.buf)[...] = array
+            resource_tracker.unregister(block._name,"shared_memory") # The receiving process is in charge of freeing the block
+            block.close()
+    except BaseException:
+        releaseBlocks((meta,blocks))
+        raise
+    return meta,blocks
+
+def receiveElement(sent):
+    """Copies the arrays of a sent element out of its shared memory blocks, and frees them (all of them, even if one fails)."""
+    meta,blocks = sent
+    arrays = {}
+    try:
+        for key,block_info in blocks.items():
+            if type(block_info) == np.ndarray:
+                arrays[key] = block_info
+                continue
+            name,shape,dtype = block_info
+            block = shared_memory.SharedMemory(name=name)
+            try:
+                arrays[key] = np.ndarray(shape,dtype,buffer=block.buf).copy()
+            finally:
+                block.close()
+                block.unlink()
+    except BaseException:
+        releaseBlocks(sent)
+        raise
+    return elementFromArrays(meta,arrays)
+
+def releaseBlocks(sent):
+    """Frees the shared memory blocks of a sent element which were not received yet."""
+    meta,blocks = sent
+    for block_info in blocks.values():
+        if type(block_info) == np.ndarray:
+            continue
+        try:
+            block = shared_memory.SharedMemory(name=block_info[0])
+        except FileNotFoundError: # Already freed
+            continue
+        block.close()
+        block.unlink()
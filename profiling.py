@@ -0,0 +1,113 @@
+import contextlib
+import functools
+import json
+import time
+import pyvista as pv
+
+PROFILER = None # Active Profiler, if any (see profile)
+
+class Profiler:
+    """Records timings and geometry statistics of the instrumented calls (constructors, Plotter.add, actor creation, grid copies)."""
+    def __init__(self):
+        self.records = []
+        self.origin = time.perf_counter()
+
+    def record(self,category,name,start,duration,copies=0,bytes=0,points=0,cells=0,actors=0):
+        self.records.append({"category":category,"name":name,"start":start-self.origin,"duration":duration,
+                             "copies":copies,"bytes":bytes,"points":points,"cells":cells,"actors":actors})
+
+    def summary(self):
+        """Returns the records aggregated by category and name, as a list of dictionnaries sorted by decreasing total time."""
+        rows = {}
+        for record in self.records:
+            key = (record["category"],record["name"])
+            if key not in rows:
+                rows[key] = {"category":key[0],"name":key[1],"calls":0,"time":0.0,"copies":0,"bytes":0,"points":0,"cells":0,"actors":0}
+            row = rows[key]
+            row["calls"] += 1
+            row["time"] += record["duration"]
+            for stat in ("copies","bytes","points","cells","actors"):
+                row[stat] += record[stat]
+        return sorted(rows.values(),key=lambda row:-row["time"])
+
+    def table(self):
+        """Returns the summary as a text table. Times are inclusive (nested instrumented calls are counted in their callers too)."""
+        lines = [f"{'category':16s} {'name':32s} {'calls':>7s} {'time (s)':>10s} {'copies':>7s} {'MB':>9s} {'points':>10s} {'cells':>10s} {'actors':>7s}"]
+        for row in self.summary():
+            lines.append(f"{row['category']:16s} {row['name']:32s} {row['calls']:7d} {row['time']:10.4f} {row['copies']:7d} {row['bytes']/1e6:9.2f} {row['points']:10d} {row['cells']:10d} {row['actors']:7d}")
+        return "\n".join(lines)
+
+    def exportTable(self,path):
+        with open(path,"w") as file:
+            file.write(self.table()+"\n")
+
+    def exportTrace(self,path):
+        """Writes the records as a trace file in the Chrome trace event format (readable with chrome://tracing or https://ui.perfetto.dev)."""
+        events = [{"name":record["name"],"cat":record["category"],"ph":"X","ts":record["start"]*1e6,"dur":record["duration"]*1e6,"pid":0,"tid":0,
+                   "args":{stat:record[stat] for stat in ("copies","bytes","points","cells","actors")}} for record in self.records]
+        with open(path,"w") as file:
+            json.dump({"traceEvents":events},file)
+
+@contextlib.contextmanager
+def profile():
+    """Context in which the instrumented calls of phyvista are recorded.
+
+    Example:
+        with profile() as profiler:
+            p.add(crystal,(-5,5),(-5,5),(-5,5))
+        print(profiler.table())
+        profiler.exportTrace("trace.json")
+    """
+    global PROFILER
+    previous = PROFILER
+    PROFILER = Profiler()
+    try:
+        yield PROFILER
+    finally:
+        PROFILER = previous
+
+def gridStats(obj):
+    """Returns the number of bytes, points and cells of a grid, of the grid of an Element, or of the dataset of an actor (which also counts as one actor), summed over the actors of a Handle."""
+    stats = {}
+    if hasattr(obj,"actors"): # Handle
+        stats = {"actors":0,"bytes":0,"points":0,"cells":0}
+        for actor in obj.actors:
+            for stat,value in gridStats(actor).items():
+                stats[stat] += value
+        return stats
+    if hasattr(obj,"mapper"): # Actor or volume
+        stats["actors"] = 1
+        obj = obj.mapper.dataset
+    elif hasattr(obj,"_grid"): # Element
+        obj = obj._grid
+    if isinstance(obj,pv.DataSet):
+        stats.update(bytes=obj.actual_memory_size*1024,points=obj.n_points,cells=obj.n_cells)
+    return stats
+
+def instrumented(category,typed_argument=None):
+    """Decorator recording the calls of a function in the active Profiler (if any), with the statistics of the returned grid, Element or actor.
+
+    Args:
+        category (str): Category of the calls in the summary ('constructor','Plotter.add'...)
+        typed_argument (int, optional): If given, the name of the type of this positional argument is appended to the recorded name. Defaults to None.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args,**kwargs):
+            if PROFILER == None:
+                return func(*args,**kwargs)
+            start = time.perf_counter()
+            result = func(*args,**kwargs)
+            duration = time.perf_counter()-start
+            name = func.__qualname__ if typed_argument == None else f"{func.__qualname__}({type(args[typed_argument]).__name__})"
+            PROFILER.record(category,name,start,duration,**gridStats(result))
+            return result
+        return wrapper
+    return decorator
+
+def recordCopy(name,grid,start=None):
+    """Records a copy of a grid (made since start, if given) in the active Profiler (if any)."""
+    if PROFILER != None:
+        now = time.perf_counter()
+        start = now if start == None else start
+        PROFILER.record("copy",name,start,now-start,copies=1,**gridStats(grid))
@@ -0,0 +1,67 @@
+import numpy as np
+
+PRESETS = {"draft":0.4,"interactive":1.0,"publication":2.0}
+QUALITY = 1.0 # Factor applied to all the default resolutions
+SCENE_SIZE = None # If set, resolutions are also scaled by the size of each element relative to it
+REFERENCE_FRACTION = 0.1 # Relative size of an element getting the nominal resolution
+PRECISIONS = {"double":(np.float64,np.int64),"single":(np.float32,np.int32)} # Types of the point coordinates and scalar fields, and of the connectivity
+PRECISION = "double"
+
+def setQuality(quality="interactive",scene_size=None):
+    """Sets the level of detail of the geometry generated by all the constructors of phyvista.
+
+    Args:
+        quality (str or float, optional): Preset ('draft','interactive' or 'publication'), or factor applied to the default resolutions. Defaults to "interactive" (factor 1).
+        scene_size (float, optional): Typical size of the scene (e.g. the length of the diagonal of its bounds). If given, elements smaller than a tenth of it get a lower resolution, and larger ones a higher resolution. Defaults to None.
+    """
+    global QUALITY,SCENE_SIZE
+    if type(quality) == str:
+        if quality not in PRESETS:
+            raise ValueError(f"Unknown quality preset '{quality}'")
+        quality = PRESETS[quality]
+    QUALITY = float(quality)
+    SCENE_SIZE = scene_size
+
+def setPrecision(precision="double"):
+    """Sets the numeric precision of the grids generated by all the constructors of phyvista.
+    In single precision, the points and scalar fields (such as 'r' or 'intensity') are stored as float32 and the connectivity as int32, which halves the memory used by large lattices and beam volumes without visible change in the rendering.
+    The cells created by VTK filters (clipping, transforms, merging...) then also use 32-bit storage.
+
+    Args:
+        precision (str, optional): 'double' or 'single'. Defaults to "double".
+    """
+    global PRECISION
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}'")
+    PRECISION = precision
+    from vtkmodules.vtkCommonDataModel import vtkCellArray
+    if hasattr(vtkCellArray,"SetDefaultStorageIs64Bit"): # Recent versions of VTK only
+        vtkCellArray.SetDefaultStorageIs64Bit(precision == "double")
+
+def floatType():
+    """Returns the numpy type of the point coordinates and scalar fields of the generated grids, according to the precision settings."""
+    return PRECISIONS[PRECISION][0]
+
+def indexType():
+    """Returns the numpy type of the connectivity of the generated grids, according to the precision settings."""
+    return PRECISIONS[PRECISION][1]
+
+def qualityState():
+    """Returns the current quality and precision settings, as a tuple (used in cache keys)."""
+    return (QUALITY,SCENE_SIZE,PRECISION)
+
+def resolution(base,size=None,minimum=3):
+    """Returns the resolution to use instead of a default resolution, according to the current quality settings.
+
+    Args:
+        base (int): Default resolution (at 'interactive' quality)
+        size (float, optional): Size of the element, used if a scene size was set. Defaults to None.
+        minimum (int, optional): Minimum resolution returned. Defaults to 3.
+
+    Returns:
+        int
+    """
+    factor = QUALITY
+    if SCENE_SIZE != None and size != None:
+        factor *= np.clip(np.sqrt(size/(REFERENCE_FRACTION*SCENE_SIZE)),0.25,2)
+    return max(minimum,int(round(base*factor)))
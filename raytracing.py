@@ -0,0 +1,145 @@
+import pyvista as pv
+import numpy as np
+from phyvista.core import *
+from phyvista import light
+from phyvista.profiling import instrumented
+
+KINDS = ("plate","mirror","splitter","lens")
+
+class RayPaths:
+    """Straight segments of traced light rays.
+
+    Attributes:
+        starts, ends (numpy arrays of shape (N,3)): Ends of the segments
+        intensities (numpy array of shape (N,)): Relative intensity of the ray along each segment
+        rays (numpy array of shape (N,)): Index of the initial ray each segment comes from
+    """
+    def __init__(self,starts,ends,intensities,rays):
+        self.starts = starts
+        self.ends = ends
+        self.intensities = intensities
+        self.rays = rays
+
+    def lines(self) -> pv.PolyData:
+        """Returns all the segments as a single PolyData of lines, with the cell field 'intensity'."""
+        n = len(self.starts)
+        lines = np.hstack((np.full((n,1),2),np.arange(2*n).reshape(n,2))).reshape(-1)
+        grid = pv.PolyData(np.concatenate((self.starts,self.ends)).reshape(2,n,3).transpose(1,0,2).reshape(-1,3),lines=lines)
+        grid.cell_data["intensity"] = self.intensities
+        return grid
+
+    def tubes(self,radius,resolution=8) -> pv.PolyData:
+        """Returns all the segments as a single merged tube mesh."""
+        return self.lines().tube(radius=radius,n_sides=resolution)
+
+    def element(self,color="red",radius=None,opacity=1.0) -> Element:
+        """Returns an Element with all the segments, as lines (if radius is None) or tubes."""
+        grid = self.lines() if radius == None else self.tubes(radius)
+        return Element(grid,Material(color=color,opacity=opacity,line_width=2))
+
+    def beams(self,radius,**kwargs) -> Group:
+        """Returns a Group of light.StraightBeam along all the segments, with a relative intensity given by the traced one. Keyword arguments are passed to StraightBeam."""
+        relative_intensity = kwargs.pop("relative_intensity",1.0)
+        return Group([light.StraightBeam(start,end,radius,relative_intensity=relative_intensity*intensity,**kwargs) for start,end,intensity in zip(self.starts,self.ends,self.intensities)])
+
+@instrumented("constructor")
+def traceRays(origins,directions,elements,intensities=None,max_interactions=20,max_length=10.0,min_intensity=1e-3) -> RayPaths:
+    """Traces a batch of light rays through optics elements, all the rays being propagated at once.
+
+    The effect of each OpticsElement depends on its 'kind' : 'mirror' (reflection), 'splitter' (half transmitted, half reflected), 'lens' (paraxial thin lens refraction, using its focal_length) or 'plate' (no deviation).
+    The surface of each element is modeled as a disk of radius 'aperture' around its center, orthogonal to its normal.
+
+    Args:
+        origins (array of shape (N,3)): Starting points of the rays
+        directions (array of shape (N,3)): Initial directions of the rays
+        elements (list of OpticsElement or Group): Optics elements
+        intensities (array of shape (N,), optional): Initial intensities. Defaults to 1 for all rays.
+        max_interactions (int, optional): Maximum number of reflections/transmissions of each ray. Defaults to 20.
+        max_length (float, optional): Length of the last segment of rays leaving the system. Defaults to 10.0.
+        min_intensity (float, optional): Rays with a lower intensity are dropped. Defaults to 1e-3.
+
+    Returns:
+        RayPaths
+    """
+    if isinstance(elements,Group):
+        elements = elements.elements
+    elements = [elmt for elmt in elements if hasattr(elmt,"kind")]
+    origins = np.array(origins,dtype=np.float64).reshape(-1,3)
+    directions = np.array(directions,dtype=np.float64).reshape(-1,3)
+    directions /= np.linalg.norm(directions,axis=1,keepdims=True)
+    intensities = np.ones(len(origins)) if intensities is None else np.array(intensities,dtype=np.float64)
+    rays = np.arange(len(origins))
+    last = np.full(len(origins),-1) # Last element hit by each ray, which can not be hit again immediately
+
+    centers = np.array([elmt.center for elmt in elements],dtype=np.float64).reshape(-1,3)
+    normals = np.array([normalized(elmt.normal) for elmt in elements],dtype=np.float64).reshape(-1,3)
+    apertures = np.array([elmt.aperture for elmt in elements],dtype=np.float64)
+    kinds = np.array([KINDS.index(elmt.kind) for elmt in elements],dtype=int)
+    focal_lengths = np.array([elmt.focal_length if elmt.focal_length != None else np.inf for elmt in elements],dtype=np.float64)
+
+    segments = []
+    for interaction in range(max_interactions+1):
+        if len(origins) == 0:
+            break
+        # Intersections of all the rays with all the surfaces, shape (rays,elements)
+        with np.errstate(divide="ignore",invalid="ignore"):
+            cosines = directions @ normals.T
+            t = np.einsum("rek,ek->re",centers[None,:,:]-origins[:,None,:],normals)/cosines
+            hit_points = origins[:,None,:] + t[:,:,None]*directions[:,None,:]
+            valid = (np.abs(cosines) > 1e-12) & (t > 1e-9) & (np.linalg.norm(hit_points-centers[None,:,:],axis=2) <= apertures[None,:])
+        valid &= np.arange(len(elements))[None,:] != last[:,None]
+        t = np.where(valid,t,np.inf)
+        hit_elements = np.argmin(t,axis=1) if len(elements) > 0 else np.zeros(len(origins),dtype=int)
+        t_hit = t[np.arange(len(origins)),hit_elements] if len(elements) > 0 else np.full(len(origins),np.inf)
+        hit = np.isfinite(t_hit)
+        ends = origins + np.where(hit,t_hit,max_length)[:,None]*directions
+        segments.append((origins,ends,intensities,rays))
+        if interaction == max_interactions:
+            break
+
+        # Interaction of the rays which hit an element
+        origins,directions,intensities,rays,j = ends[hit],directions[hit],intensities[hit],rays[hit],hit_elements[hit]
+        normal = normals[j]
+        reflected = directions - 2*np.sum(directions*normal,axis=1,keepdims=True)*normal
+        new_directions = directions.copy()
+        mirror = kinds[j] == KINDS.index("mirror")
+        new_directions[mirror] = reflected[mirror]
+        lens = kinds[j] == KINDS.index("lens")
+        if np.any(lens): # Thin lens : D' = D/(D.a) - h/f, with a the axis oriented along the propagation and h the distance to the axis
+            axis = normal[lens]*np.sign(np.sum(directions[lens]*normal[lens],axis=1,keepdims=True))
+            offset = origins[lens]-centers[j[lens]]
+            h = offset - np.sum(offset*axis,axis=1,keepdims=True)*axis
+            deviated = directions[lens]/np.sum(directions[lens]*axis,axis=1,keepdims=True) - h/focal_lengths[j[lens]][:,None]
+            new_directions[lens] = deviated/np.linalg.norm(deviated,axis=1,keepdims=True)
+        splitter = kinds[j] == KINDS.index("splitter")
+        intensities = np.where(splitter,intensities/2,intensities)
+        # Reflected part of the rays hitting a splitter (the transmitted part keeps its direction)
+        origins = np.concatenate((origins,origins[splitter]))
+        directions = np.concatenate((new_directions,reflected[splitter]))
+        intensities = np.concatenate((intensities,intensities[splitter]))
+        rays = np.concatenate((rays,rays[splitter]))
+        last = np.concatenate((j,j[splitter]))
+        keep = intensities >= min_intensity
+        origins,directions,intensities,rays,last = origins[keep],directions[keep],intensities[keep],rays[keep],last[keep]
+
+    if len(segments) == 0:
+        return RayPaths(np.zeros((0,3)),np.zeros((0,3)),np.zeros(0),np.zeros(0,dtype=int))
+    return RayPaths(*[np.concatenate(arrays) for arrays in zip(*segments)])
+
+def parallelRays(center,direction,radius,n=11,normal=None):
+    """Returns origins and directions of n parallel rays, evenly spaced on a segment of half-length radius orthogonal to direction (in the plane orthogonal to normal if given)."""
+    direction = normalized(np.asarray(direction,dtype=np.float64))
+    if normal is None:
+        normal = U_Z if norm(np.cross(direction,U_Z)) > 1e-6 else U_X
+    transverse = normalized(np.cross(normal,direction))
+    origins = np.asarray(center,dtype=np.float64) + np.linspace(-radius,radius,n)[:,None]*transverse
+    return origins,np.tile(direction,(n,1))
+
+def rayFan(origin,direction,half_angle,n=11,normal=None):
+    """Returns origins and directions of n rays coming from a point, with directions spread up to half_angle (in degrees) around direction (in the plane orthogonal to normal if given)."""
+    direction = normalized(np.asarray(direction,dtype=np.float64))
+    if normal is None:
+        normal = U_Z if norm(np.cross(direction,U_Z)) > 1e-6 else U_X
+    transverse = normalized(np.cross(normal,direction))
+    angles = np.radians(np.linspace(-half_angle,half_angle,n))[:,None]
+    return np.tile(np.asarray(origin,dtype=np.float64),(n,1)),np.cos(angles)*direction + np.sin(angles)*transverse
@@ -0,0 +1,157 @@
+import numpy as np
+from phyvista.core import *
+from phyvista.materials import frozen,meshArguments,meshProperty
+
+class ElementState:
+    """What an actor was built from : the base grid, pending matrix and material of an Element when it was last synchronized."""
+    __slots__ = ("element","grid","matrix","material")
+    def __init__(self,element):
+        self.element = element # The element and its grid are kept alive, so that identity comparisons stay valid
+        self.grid = element._grid
+        self.matrix = element.matrix.copy()
+        self.material = element.material
+
+def statesEqual(state1,state2):
+    """Compares two states (see Scene.crystalState), the objects they contain being compared by identity."""
+    return state1[0:2] == state2[0:2] and len(state1[2]) == len(state2[2]) and all(all(a is b for a,b in zip(item1[0:2],item2[0:2])) and item1[2:] == item2[2:] for item1,item2 in zip(state1[2],state2[2]))
+
+class Scene:
+    """Retained set of Elements, Groups and Crystals, kept in sync with the actors of one or more plotters.
+
+    Objects are added and removed from the scene, and modified in place as usual (inplace transforms, new materials, elements appended to a Group...). Each call to sync only updates the actors of what changed since the previous one :
+    a transformed Element gets a new actor matrix, a new material is set on the existing actor when only its surface appearance changes, and only new or removed elements create or remove actors. Other changes (new grid, volume material...) re-add the actor of the element, without rebuilding its geometry.
+    Example :
+
+        scene = Scene([table,lens,beams])
+        scene.sync(plotter)
+        lens.translate((0.1,0,0),inplace=True)
+        scene.sync(plotter) # Only the actors of the lens are moved
+
+    Changes are detected on the elements themselves : the points of a grid modified in place are not tracked (but are shared with the plotted dataset). Crystals are re-plotted as a whole when their pattern or lattice changes.
+    """
+    def __init__(self,objects=()):
+        self.objects = [] # (object, arguments of plotSelf for Crystals)
+        self.synced = {} # id of a plotter : (plotter, {key of an element : (actor, ElementState)}, {key of a crystal : (Handle, state)})
+        for obj in objects:
+            self.add(obj)
+
+    def add(self,obj,*args,**kwargs):
+        """Adds an Element, Group or Crystal to the scene. The other arguments are passed to Crystal.plotSelf (e.g. the ranges of indices)."""
+        from phyvista.lattices import Crystal
+        if not isinstance(obj,(Element,Group,Crystal)):
+            raise TypeError(f"Cannot add an object of type '{type(obj).__name__}' to a Scene")
+        self.objects.append((obj,args,kwargs))
+
+    def remove(self,obj):
+        """Removes an object from the scene. Its actors are removed at the next sync."""
+        count = len(self.objects)
+        self.objects = [entry for entry in self.objects if entry[0] is not obj]
+        if len(self.objects) == count:
+            raise ValueError("The object is not in the scene")
+
+    def __contains__(self,obj):
+        return any(entry[0] is obj for entry in self.objects)
+
+    def elements(self):
+        """Returns the Elements of the scene (those of Groups included) as a dictionnary {key : element}. The key of an element is its id, and the number of previous occurrences of the same element."""
+        from phyvista.lattices import Crystal
+        elements = {}
+        def visit(obj):
+            if isinstance(obj,Group):
+                for element in obj.elements:
+                    visit(element)
+            elif isinstance(obj,Element):
+                occurrence = 0
+                while (id(obj),occurrence) in elements:
+                    occurrence += 1
+                elements[(id(obj),occurrence)] = obj
+        for obj,args,kwargs in self.objects:
+            if not isinstance(obj,Crystal):
+                visit(obj)
+        return elements
+
+    def crystals(self):
+        """Returns the Crystals of the scene as a dictionnary {key : (crystal, args, kwargs)}, the key depending on the crystal and on the arguments of its plotSelf."""
+        from phyvista.lattices import Crystal
+        return {(id(obj),frozen(args),frozen(kwargs)):(obj,args,kwargs) for obj,args,kwargs in self.objects if isinstance(obj,Crystal)}
+
+    def crystalState(self,crystal):
+        """Returns a value which changes when the crystal needs to be plotted again (new lattice, or new elements, grids, matrices or materials in its pattern)."""
+        pattern = tuple((element,element._grid,element.matrix.tobytes(),element.material) for element in crystal.pattern.elements)
+        return (crystal.position.tobytes(),np.array(crystal.vectors).tobytes(),pattern)
+
+    def sync(self,plotter,render=True):
+        """Updates the actors of the plotter to match the scene, changing only what was modified since the previous sync with this plotter.
+
+        Args:
+            plotter (pyvista.Plotter)
+            render (bool, optional): If True, the plotter is rendered again when something changed. Defaults to True.
+
+        Returns:
+            dict: Number of actors added, removed, moved (new matrix), restyled (new property) and re-added.
+        """
+        stats = {"added":0,"removed":0,"moved":0,"restyled":0,"readded":0}
+        _,actors,crystal_actors = self.synced.setdefault(id(plotter),(plotter,{},{}))
+        elements = self.elements()
+        for key in list(actors.keys()):
+            if key not in elements:
+                plotter.remove_actor(actors.pop(key)[0],render=False)
+                stats["removed"] += 1
+        for key,element in elements.items():
+            if key not in actors:
+                actors[key] = (element.plotSelf(plotter),ElementState(element))
+                stats["added"] += 1
+                continue
+            actor,state = actors[key]
+            if state.element is not element or element._grid is not state.grid or element.material.renderingStyle != state.material.renderingStyle:
+                plotter.remove_actor(actor,render=False)
+                actors[key] = (element.plotSelf(plotter),ElementState(element))
+                stats["readded"] += 1
+                continue
+            if element.material is not state.material:
+                if element.material.renderingStyle == "mesh" and frozen(meshArguments(element.material)) == frozen(meshArguments(state.material)):
+                    actor.prop = meshProperty(plotter,element.material)
+                    stats["restyled"] += 1
+                else: # The new material needs another mapping of the data
+                    plotter.remove_actor(actor,render=False)
+                    actor = element.plotSelf(plotter)
+                    stats["readded"] += 1
+            if not np.array_equal(element.matrix,state.matrix):
+                actor.user_matrix = element.matrix
+                stats["moved"] += 1
+            actors[key] = (actor,ElementState(element))
+
+        crystals = self.crystals()
+        for key in list(crystal_actors.keys()):
+            if key not in crystals or not statesEqual(crystal_actors[key][1],self.crystalState(crystals[key][0])):
+                for actor in crystal_actors.pop(key)[0].actors:
+                    plotter.remove_actor(actor,render=False)
+                    stats["removed"] += 1
+        for key,(crystal,args,kwargs) in crystals.items():
+            if key not in crystal_actors:
+                handle = crystal.plotSelf(plotter,*args,**kwargs)
+                crystal_actors[key] = (handle,self.crystalState(crystal)) # Taken after plotting, which may apply the pending transforms of the pattern
+                stats["added"] += len(handle.actors)
+
+        if render and any(count > 0 for count in stats.values()):
+            plotter.render()
+        return stats
+
+    def plotSelf(self,plotter):
+        """Synchronizes the scene with the plotter (see sync), so that a Scene can be given to Plotter.add.
+
+        Returns:
+            Handle: on the actors of the scene in the plotter, elements first (in the order of elements()), then crystals
+        """
+        self.sync(plotter)
+        _,actors,crystal_actors = self.synced[id(plotter)]
+        handle = Handle()
+        for key in self.elements():
+            handle.addActor(actors[key][0])
+        for key in self.crystals():
+            handle.extend(crystal_actors[key][0])
+        return handle
+
+    def forget(self,plotter):
+        """Stops tracking the actors of the scene in a plotter (e.g. after it was closed or cleared)."""
+        self.synced.pop(id(plotter),None)
@@ -0,0 +1,146 @@
+import pyvista as pv
+import numpy as np
+import os
+import pickle
+import shutil
+import tempfile
+
+ACTIVE_ATTRIBUTES = ("scalars","vectors","normals") # Roles of data arrays, used by filters (e.g. normals rotated by transforms) and plotting
+TEMPORARY_PREFIX = ".tmp" # Directories being written by save, next to their destination
+GRID_TYPES = {"PolyData":pv.PolyData,"UnstructuredGrid":pv.UnstructuredGrid,"StructuredGrid":pv.StructuredGrid,"ImageData":pv.ImageData}
+
+def gridToArrays(grid):
+    """Returns a dictionnary of numpy arrays describing the grid (geometry, topology and data arrays), from which it can be rebuilt with gridFromArrays."""
+    if type(grid) == pv.PolyData:
+        arrays = {"points":grid.points,"verts":grid.verts,"lines":grid.lines,"faces":grid.faces,"strips":grid.strips}
+    elif type(grid) == pv.UnstructuredGrid:
+        arrays = {"points":grid.points,"cells":grid.cells,"celltypes":grid.celltypes}
+    elif type(grid) == pv.StructuredGrid:
+        arrays = {"points":grid.points,"dimensions":np.array(grid.dimensions)}
+    elif type(grid) == pv.ImageData:
+        arrays = {"dimensions":np.array(grid.dimensions),"origin":np.array(grid.origin),"spacing":np.array(grid.spacing)}
+    else:
+        raise TypeError(f"Unsupported grid type '{type(grid).__name__}'")
+    for name in grid.point_data.keys():
+        arrays["point_data/"+name] = grid.point_data[name]
+    for name in grid.cell_data.keys():
+        arrays["cell_data/"+name] = grid.cell_data[name]
+    for kind in ("point_data","cell_data"):
+        for attribute in ACTIVE_ATTRIBUTES:
+            name = getattr(getattr(grid,kind),f"active_{attribute}_name")
+            if name != None:
+                arrays[f"active/{kind}/{attribute}"] = np.array(name)
+    return arrays
+
+def gridFromArrays(grid_type,arrays):
+    """Rebuilds a grid of the given type name ('PolyData','UnstructuredGrid','StructuredGrid' or 'ImageData') from the arrays returned by gridToArrays."""
+    if grid_type == "PolyData":
+        grid = pv.PolyData()
+        grid.points = arrays["points"]
+        for cell_kind in ("verts","lines","faces","strips"):
+            if len(arrays[cell_kind]) > 0:
+                setattr(grid,cell_kind,arrays[cell_kind])
+    elif grid_type == "UnstructuredGrid":
+        grid = pv.UnstructuredGrid(arrays["cells"],arrays["celltypes"],arrays["points"])
+    elif grid_type == "StructuredGrid":
+        grid = pv.StructuredGrid()
+        grid.points = arrays["points"]
+        grid.dimensions = arrays["dimensions"]
+    elif grid_type == "ImageData":
+        grid = pv.ImageData(dimensions=arrays["dimensions"],origin=arrays["origin"],spacing=arrays["spacing"])
+    else:
+        raise TypeError(f"Unsupported grid type '{grid_type}'")
+    for key,array in arrays.items():
+        if key.startswith("point_data/"):
+            grid.point_data[key[len("point_data/"):]] = array
+        elif key.startswith("cell_data/"):
+            grid.cell_data[key[len("cell_data/"):]] = array
+    for kind in ("point_data","cell_data"): # Set again, as adding arrays may have made some of them active
+        for attribute in ACTIVE_ATTRIBUTES:
+            name = arrays.get(f"active/{kind}/{attribute}")
+            setattr(getattr(grid,kind),f"active_{attribute}_name",None if name is None else str(name.item()))
+    return grid
+
+def elementToArrays(element):
+    """Splits an Element (or an instance of a subclass, such as OpticsElement) into numpy arrays (its grid and its array attributes), and a dictionnary of the remaining (picklable) metadata.
+
+    Returns:
+        (dict,dict): metadata and arrays, from which the element can be rebuilt with elementFromArrays
+    """
+    arrays = {"grid/"+key:array for key,array in gridToArrays(element._grid).items()}
+    attributes = {}
+    for name,value in vars(element).items():
+        if name in ("_grid","_shared"):
+            continue
+        if type(value) == np.ndarray:
+            arrays["attribute/"+name] = value
+        else:
+            attributes[name] = value
+    meta = {"class":type(element),"grid_type":type(element._grid).__name__,"attributes":attributes}
+    return meta,arrays
+
+def elementFromArrays(meta,arrays):
+    element = meta["class"].__new__(meta["class"])
+    element.__dict__.update(meta["attributes"])
+    grid_arrays = {}
+    for key,array in arrays.items():
+        if key.startswith("attribute/"):
+            setattr(element,key[len("attribute/"):],array)
+        elif key.startswith("grid/"):
+            grid_arrays[key[len("grid/"):]] = array
+    element._grid = gridFromArrays(meta["grid_type"],grid_arrays)
+    element._shared = False
+    return element
+
+def save(obj,path):
+    """Saves a grid, an Element or a Group to a directory, with one .npy file per array (so that they can be memory-mapped when loaded) and a pickled metadata file.
+    An existing directory is replaced by renaming : loaders see either the old or the new complete directory (or briefly none), never a partially written one.
+    """
+    from phyvista.core import Element,Group
+    if isinstance(obj,pv.DataSet):
+        kind,parts = "grid",[({"grid_type":type(obj).__name__},gridToArrays(obj))]
+    elif isinstance(obj,Element):
+        kind,parts = "element",[elementToArrays(obj)]
+    elif isinstance(obj,Group):
+        kind,parts = "group",[elementToArrays(element) for element in obj.elements]
+    else:
+        raise TypeError(f"Cannot save an object of type '{type(obj).__name__}'")
+    parent = os.path.dirname(os.path.abspath(path))
+    os.makedirs(parent,exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=parent,prefix=TEMPORARY_PREFIX)
+    keys = []
+    for i,(meta,arrays) in enumerate(parts):
+        keys.append(list(arrays.keys()))
+        for j,array in enumerate(arrays.values()):
+            np.save(os.path.join(tmp,f"{i}_{j}.npy"),np.ascontiguousarray(array),allow_pickle=False)
+    with open(os.path.join(tmp,"meta.pkl"),"wb") as file:
+        pickle.dump({"kind":kind,"metas":[meta for meta,arrays in parts],"keys":keys},file)
+    if os.path.isdir(path): # Moved aside (ignored by DiskCache like tmp) and deleted once replaced, so that path is never partially written
+        old = tmp+".old"
+        os.replace(path,old)
+        os.replace(tmp,path)
+        shutil.rmtree(old)
+    else:
+        os.replace(tmp,path)
+
+def load(path,mmap=True):
+    """Loads a grid, an Element or a Group saved with save.
+
+    Args:
+        path (str): Directory of the saved object
+        mmap (bool, optional): If True, the arrays are memory-mapped (copy-on-write) instead of being read. Defaults to True.
+    """
+    from phyvista.core import Group
+    with open(os.path.join(path,"meta.pkl"),"rb") as file:
+        content = pickle.load(file)
+    parts = []
+    for i,(meta,keys) in enumerate(zip(content["metas"],content["keys"])):
+        arrays = {key:np.load(os.path.join(path,f"{i}_{j}.npy"),mmap_mode="c" if mmap else None) for j,key in enumerate(keys)}
+        parts.append((meta,arrays))
+    if content["kind"] == "grid":
+        meta,arrays = parts[0]
+        return gridFromArrays(meta["grid_type"],arrays)
+    elements = [elementFromArrays(meta,arrays) for meta,arrays in parts]
+    if content["kind"] == "element":
+        return elements[0]
+    return Group(elements)
@@ -0,0 +1,23 @@
+import importlib.util
+import os
+import sys
+import pytest
+
+os.environ.setdefault("PYVISTA_OFF_SCREEN","true")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import phyvista
+except ImportError: # Run from inside the package directory : it is imported from its path, under its own name
+    spec = importlib.util.spec_from_file_location("phyvista",os.path.join(ROOT,"__init__.py"),submodule_search_locations=[ROOT])
+    phyvista = importlib.util.module_from_spec(spec)
+    sys.modules["phyvista"] = phyvista
+    spec.loader.exec_module(phyvista)
+
+@pytest.fixture
+def plotter():
+    import pyvista as pv
+    plotter = pv.Plotter(off_screen=True)
+    yield plotter
+    plotter.close()
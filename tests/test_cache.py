@@ -0,0 +1,126 @@
+import os
+import tempfile
+import numpy as np
+import pytest
+import pyvista as pv
+from phyvista import cache,constructors,quality
+from phyvista.cache import memoized
+
+@pytest.fixture(autouse=True)
+def emptyCache():
+    cache.clearCache()
+    yield
+    cache.clearCache()
+    quality.setQuality()
+
+def test_hits_for_equal_arguments():
+    stats = cache.cacheStats()
+    sphere1 = constructors.CanonicalSphere(0.5,theta_resolution=20)
+    sphere2 = constructors.CanonicalSphere(np.float64(0.5),np.int64(20))
+    stats2 = cache.cacheStats()
+    assert stats2["misses"] == stats["misses"]+1
+    assert stats2["hits"] == stats["hits"]+1
+    assert sphere1 is not sphere2
+    assert np.array_equal(sphere1.points,sphere2.points)
+
+def test_returned_grids_can_be_transformed_in_place():
+    sphere = constructors.Sphere(0.5)
+    points = np.array(sphere.points)
+    sphere.translate((1,0,0),inplace=True)
+    assert np.array_equal(constructors.Sphere(0.5).points,points)
+    copy = constructors.Sphere(0.5,copy=True)
+    copy.points[:] += 1
+    assert np.array_equal(constructors.Sphere(0.5).points,points)
+
+def test_writes_to_a_shared_grid_are_detected():
+    points = np.array(constructors.Sphere(0.3).points)
+    sphere = constructors.Sphere(0.3)
+    sphere.points[:,0] += 1
+    with pytest.raises(RuntimeError,match="copy=True"):
+        constructors.Sphere(0.3)
+    assert np.array_equal(constructors.Sphere(0.3).points,points)
+    normals = np.array(constructors.CanonicalSphere(0.3)["Normals"])
+    sphere = constructors.CanonicalSphere(0.3)
+    sphere["Normals"] *= 2
+    with pytest.raises(RuntimeError,match="copy=True"):
+        constructors.CanonicalSphere(0.3)
+    assert np.array_equal(constructors.CanonicalSphere(0.3)["Normals"],normals)
+
+def test_quality_invalidates_the_entries():
+    n_points = constructors.Sphere(0.5).n_points
+    quality.setQuality("publication")
+    assert constructors.Sphere(0.5).n_points > n_points
+    quality.setQuality("interactive")
+    assert constructors.Sphere(0.5).n_points == n_points
+
+def test_evict_and_lru_size():
+    constructors.Sphere(0.5)
+    assert constructors.Sphere.evict(0.5)
+    assert not constructors.Sphere.evict(0.5)
+    cache.setCacheSize(2)
+    try:
+        for radius in (1,2,3):
+            constructors.CanonicalSphere(radius)
+        assert cache.cacheStats()["size"] == 2
+        misses = cache.cacheStats()["misses"]
+        constructors.CanonicalSphere(1) # Least recently used : evicted
+        assert cache.cacheStats()["misses"] == misses+1
+    finally:
+        cache.setCacheSize(256)
+
+def test_unhashable_arguments_bypass_the_cache():
+    calls = []
+    @memoized
+    def build(value):
+        calls.append(value)
+        return pv.Sphere()
+    build({1,2})
+    build({1,2})
+    assert len(calls) == 2
+    assert cache.cacheStats()["size"] == 0
+
+def test_type_error_of_the_builder_is_raised_once():
+    calls = []
+    @memoized
+    def build(value):
+        calls.append(value)
+        raise TypeError("Bad value")
+    with pytest.raises(TypeError):
+        build(1)
+    assert calls == [1]
+
+@pytest.fixture
+def diskCache(tmp_path):
+    yield cache.setDiskCache(str(tmp_path/"cache"),max_entries=2)
+    cache.setDiskCache(None)
+
+def test_disk_cache_hits(diskCache):
+    from phyvista import optics
+    grid1 = optics.BiconvexLensGrid((0,0,0),(1,0,0),0.5,1)
+    grid2 = optics.BiconvexLensGrid((0,0,0),[1,0,0],0.5,1)
+    assert diskCache.stats()["misses"] == 1 and diskCache.stats()["hits"] == 1
+    assert np.allclose(grid1.points,grid2.points) and grid1.n_cells == grid2.n_cells
+    assert grid2.point_data.active_normals_name == grid1.point_data.active_normals_name
+
+def test_disk_cache_invalidation_and_eviction(diskCache):
+    from phyvista import optics
+    optics.BiconvexLensGrid((0,0,0),(1,0,0),0.5,1)
+    quality.setQuality("draft")
+    optics.BiconvexLensGrid((0,0,0),(1,0,0),0.5,1)
+    assert diskCache.stats()["misses"] == 2
+    optics.BiconvexLensGrid((0,0,0),(1,0,0),0.5,2)
+    stats = diskCache.stats()
+    assert stats["misses"] == 3 and stats["size"] == 2 and stats["evictions"] == 1
+    cache.setDiskCache(None)
+    optics.BiconvexLensGrid((0,0,0),(1,0,0),0.5,1)
+    assert diskCache.stats()["misses"] == 3
+
+def test_disk_cache_ignores_the_entries_being_saved(diskCache):
+    from phyvista import optics
+    from phyvista.serialization import TEMPORARY_PREFIX
+    in_progress = tempfile.mkdtemp(dir=diskCache.directory,prefix=TEMPORARY_PREFIX)
+    for radius in (1,2,3):
+        optics.BiconvexLensGrid((0,0,0),(1,0,0),0.5,radius)
+    assert diskCache.stats()["size"] == 2
+    diskCache.clear()
+    assert os.listdir(diskCache.directory) == [os.path.basename(in_progress)]
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+import pyvista as pv
+from phyvista.core import *
+from phyvista import light
+from phyvista.compositing import compositeVolumes,isComposable
+
+BOUNDS = (-2,3,-1.5,1.5,-1.5,1.5)
+
+def orbs():
+    return [light.GlowingOrb((0,0,0),1.0,"red"),light.GlowingOrb((1,0,0),1.0,"blue")]
+
+def alpha(element):
+    return element.grid["rgba"][:,3].astype(np.float64)/255
+
+def test_composable_elements():
+    assert isComposable(light.GlowingOrb((0,0,0),1.0,"red"))
+    assert isComposable(light.StraightBeam(ORIGIN,U_X,0.1,style="semirealistic"))
+    assert not isComposable(light.StraightBeam(ORIGIN,U_X,0.1))
+    assert not isComposable(Element(pv.Sphere(),"red"))
+    with pytest.raises(ValueError):
+        compositeVolumes([Element(pv.Sphere(),"red")])
+
+def test_composite_bounds():
+    elements = orbs()+[light.StraightBeam((0,0,0),(0,2,0),0.2,style="semirealistic").translate((0,0,1))]
+    composite = compositeVolumes(elements,resolution=40)
+    bounds = np.array(composite.grid.bounds).reshape(3,2)
+    spacing = composite.grid.spacing[0]
+    for element in elements:
+        element_bounds = np.array(element.grid.bounds).reshape(3,2)
+        assert np.all(bounds[:,0] <= element_bounds[:,0]+1e-9)
+        assert np.all(bounds[:,1] >= element_bounds[:,1]-spacing-1e-9)
+    assert np.all(bounds[:,1]-bounds[:,0] <= np.ptp(np.array([element.grid.bounds for element in elements]).reshape(-1,3,2),axis=(0,2))+spacing+1e-9)
+
+def test_composite_intensity_matches_the_separate_volumes():
+    orb1,orb2 = orbs()
+    composite = compositeVolumes([orb1,orb2],spacing=0.1,bounds=BOUNDS)
+    alpha1 = alpha(compositeVolumes([orb1],spacing=0.1,bounds=BOUNDS))
+    alpha2 = alpha(compositeVolumes([orb2],spacing=0.1,bounds=BOUNDS))
+    assert alpha1.max() > 0.5 and alpha2.max() > 0.5
+    assert np.allclose(alpha(composite),1-(1-alpha1)*(1-alpha2),atol=2/255) # Extinctions add up
+    points = composite.grid.points
+    assert np.all(alpha1[np.linalg.norm(points,axis=1) > 1+1e-6] == 0) # Nothing outside of the orb
+    colors = composite.grid["rgba"][:,0:3]
+    only1,only2 = (alpha1 > 0) & (alpha2 == 0),(alpha1 == 0) & (alpha2 > 0)
+    assert np.array_equal(colors[only1],compositeVolumes([orb1],spacing=0.1,bounds=BOUNDS).grid["rgba"][only1,0:3])
+    assert np.array_equal(colors[only2],compositeVolumes([orb2],spacing=0.1,bounds=BOUNDS).grid["rgba"][only2,0:3])
+
+def test_composite_in_a_handle(plotter):
+    group = Group([Element(pv.Sphere(),"green")]+orbs())
+    handle = plotter.add(group,composite=True)
+    assert handle.n_instances == 3
+    sphere_actor,volume_actor = handle.actors[1],handle.actors[0]
+    rest_points = np.array(sphere_actor.mapper.dataset.points)
+    handle.translate(np.zeros((3,3)))
+    handle.translate([(0,0,1),(5,0,0),(5,0,0)]) # The offsets of composited elements are ignored
+    assert np.allclose(sphere_actor.mapper.dataset.points,rest_points+(0,0,1))
+    assert np.allclose(volume_actor.user_matrix,np.eye(4))
+    matrix = np.eye(4)
+    matrix[0:3,3] = (1,2,3)
+    handle.transform(matrix)
+    assert np.allclose(volume_actor.user_matrix,matrix)
+    handle.displace(np.zeros((sphere_actor.mapper.dataset.n_points,3)))
+    assert np.allclose(sphere_actor.mapper.dataset.points,rest_points)
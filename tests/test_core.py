@@ -0,0 +1,61 @@
+import numpy as np
+import pyvista as pv
+from phyvista.core import *
+from phyvista import optics
+
+def test_copy_shares_the_grid_until_accessed():
+    e1 = Element(pv.Sphere(),"red")
+    e2 = e1.copy()
+    assert e2._grid is e1._grid
+    assert e2.grid is not e1.grid
+
+def test_copy_isolation_assigned_points():
+    e1 = Element(pv.Sphere(),"red")
+    points = np.array(e1.grid.points)
+    e2 = e1.copy()
+    e2.grid.points = e2.grid.points + 1
+    assert np.array_equal(e1.grid.points,points)
+
+def test_copy_isolation_points_written_in_place():
+    e1 = Element(pv.Sphere(),"red")
+    points = np.array(e1.grid.points)
+    e2 = e1.copy()
+    e2.grid.points[:] += 1
+    assert np.array_equal(e1.grid.points,points)
+    assert np.allclose(e2.grid.points,points+1)
+
+def test_copy_isolation_point_data():
+    grid = pv.Sphere()
+    grid["values"] = np.zeros(grid.n_points)
+    e1 = Element(grid,"red")
+    e2 = e1.copy()
+    e2.grid["values"][:] = 1
+    assert np.all(e1.grid["values"] == 0)
+
+def test_pending_transforms():
+    e1 = Element(pv.Sphere(),"red")
+    e2 = e1.translate((1,0,0)).rotate_z(90)
+    assert np.array_equal(e1.matrix,np.eye(4))
+    assert np.allclose(e2.grid.center,(0,1,0),atol=1e-6)
+    assert np.array_equal(e2.matrix,np.eye(4))
+
+def test_deep_copy():
+    e1 = Element(pv.Sphere(),"red").translate((0,0,1))
+    e2 = e1.copy(deep=True)
+    assert e2._grid is not e1._grid
+    assert np.allclose(e2.grid.points,e1.grid.points)
+
+def test_rotate_about_a_point():
+    e = Element(pv.Sphere(center=(2,0,0)),"red").rotate_z(180,point=(1,0,0))
+    assert np.allclose(e.grid.center,(0,0,0),atol=1e-6)
+
+def test_rotate_optics_element():
+    mirror = optics.Mirror((2,0,0),U_X).rotate_z(90,point=(1,0,0))
+    assert np.allclose(mirror.center,(1,1,0))
+    assert np.allclose(mirror.normal,U_Y)
+
+def test_star_import_only_exports_the_library_names():
+    namespace = {}
+    exec("from phyvista.core import *",namespace)
+    assert {"Element","Group","Handle","U_X","np","pv"} <= set(namespace)
+    assert not {"sys","time","importlib","shallowCopy"} & set(namespace)
@@ -0,0 +1,76 @@
+import json
+import struct
+import numpy as np
+import pyvista as pv
+from phyvista.core import *
+from phyvista import export,light
+from phyvista import lattices as lat
+
+def readGLB(path):
+    """Returns the JSON document of a .glb file, and a function reading its accessors."""
+    with open(path,"rb") as file:
+        content = file.read()
+    assert content[0:4] == b"glTF"
+    length = struct.unpack("<I",content[12:16])[0]
+    document = json.loads(content[20:20+length])
+    binary = content[20+length+8:]
+    def accessor(index):
+        info = document["accessors"][index]
+        view = document["bufferViews"][info["bufferView"]]
+        dtype = {5126:np.float32,5125:np.uint32,5123:np.uint16}[info["componentType"]]
+        size = {"SCALAR":1,"VEC3":3,"VEC4":4}[info["type"]]
+        return np.frombuffer(binary,dtype,info["count"]*size,view.get("byteOffset",0)+info.get("byteOffset",0)).reshape(info["count"],size)
+    return document,accessor
+
+def quaternionMatrix(q):
+    x,y,z,w = q
+    return np.array(((1-2*(y*y+z*z),2*(x*y-z*w),2*(x*z+y*w)),(2*(x*y+z*w),1-2*(x*x+z*z),2*(y*z-x*w)),(2*(x*z-y*w),2*(y*z+x*w),1-2*(x*x+y*y))))
+
+def instancePoints(document,accessor):
+    """Returns the list of the world-space points of each instance of each mesh (the root node being the identity)."""
+    instances = []
+    for node in document["nodes"][1:]:
+        points = accessor(document["meshes"][node["mesh"]]["primitives"][0]["attributes"]["POSITION"])
+        if "extensions" in node:
+            attributes = node["extensions"]["EXT_mesh_gpu_instancing"]["attributes"]
+            translations = accessor(attributes["TRANSLATION"])
+            rotations = accessor(attributes["ROTATION"]) if "ROTATION" in attributes else np.tile((0,0,0,1.0),(len(translations),1))
+            scales = accessor(attributes["SCALE"]) if "SCALE" in attributes else np.ones((len(translations),3))
+        else:
+            translations,rotations,scales = [node["translation"]],[node["rotation"]],[node["scale"]]
+        for translation,rotation,scale in zip(translations,rotations,scales):
+            instances.append((points*scale) @ quaternionMatrix(rotation).T + translation)
+    return instances
+
+def sortedPoints(points):
+    return np.unique(np.round(np.asarray(points,dtype=np.float64),4),axis=0)
+
+def test_instance_transforms(tmp_path):
+    base = Element(pv.Cone(),"red")
+    elements = [base.transform(np.diag((2,1,1,1))).rotate_z(30).translate((1,2,3)),base.rotate_x(70).translate((0,1,0)),base.reflect(U_Y,(0,0,1)),base.copy()]
+    stats = export.exportGLTF(Group(elements),str(tmp_path/"cones.glb"),rotate_scene=False)
+    assert stats == {"meshes":1,"materials":1,"instances":4,"skipped":0}
+    document,accessor = readGLB(tmp_path/"cones.glb")
+    assert "EXT_mesh_gpu_instancing" in document["extensionsUsed"]
+    exported = sorted(sortedPoints(points).tobytes() for points in instancePoints(document,accessor))
+    expected = sorted(sortedPoints(element.grid.points).tobytes() for element in elements)
+    assert exported == expected
+
+def test_crystal_instances(tmp_path):
+    crystal = lat.Crystal(ORIGIN,[U_X,U_Y,U_Z])
+    crystal.addNewElement(pv.Sphere(radius=0.2),"red",[(0,0,0),(0.5,0.5,0.5)])
+    stats = export.exportGLTF(crystal,str(tmp_path/"crystal.glb"),(0,2),(0,2),(0,2),rotate_scene=False)
+    assert stats == {"meshes":1,"materials":1,"instances":54,"skipped":0}
+    document,accessor = readGLB(tmp_path/"crystal.glb")
+    centers = sortedPoints([points.mean(axis=0) for points in instancePoints(document,accessor)])
+    expected = sortedPoints(np.concatenate([crystal.points((0,2),(0,2),(0,2))+offset for offset in ((0,0,0),(0.5,0.5,0.5))]))
+    assert np.allclose(centers,expected,atol=1e-3)
+
+def test_volumes_are_skipped_and_gltf_files(tmp_path):
+    group = Group([Element(pv.Cube(),"blue"),light.StraightBeam(ORIGIN,U_X,0.1,style="semirealistic")])
+    stats = export.exportGLTF(group,str(tmp_path/"scene.gltf"))
+    assert stats["skipped"] == 1 and stats["instances"] == 1
+    with open(tmp_path/"scene.gltf") as file:
+        document = json.load(file)
+    assert document["buffers"][0]["uri"] == "scene.bin"
+    assert (tmp_path/"scene.bin").stat().st_size == document["buffers"][0]["byteLength"]
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+import pyvista as pv
+from phyvista.core import *
+from phyvista import lattices as lat
+
+def simpleCrystal():
+    crystal = lat.Crystal(ORIGIN,[U_X,U_Y,U_Z])
+    crystal.addElement(Element(pv.Cube(x_length=0.3,y_length=0.3,z_length=0.3),"red"),[(0,0,0)])
+    return crystal
+
+def test_translate_one_instance_leaves_the_others_unchanged(plotter):
+    crystal = simpleCrystal()
+    base_points = np.array(crystal.pattern.elements[0]._grid.points)
+    handle = plotter.add(crystal,(0,2),(0,0),(0,0))
+    assert handle.n_instances == 3
+    before = [np.array(actor.mapper.dataset.points) for actor in handle.actors]
+    handle.translate([(0,0,1),(0,0,0),(0,0,0)])
+    after = [np.array(actor.mapper.dataset.points) for actor in handle.actors]
+    assert np.allclose(after[0],before[0]+(0,0,1))
+    assert np.array_equal(after[1],before[1])
+    assert np.array_equal(after[2],before[2])
+    assert np.array_equal(crystal.pattern.elements[0]._grid.points,base_points)
+
+def test_translate_instanced_crystal(plotter):
+    crystal = simpleCrystal()
+    handle = plotter.add(crystal,(0,1),(0,0),(0,0),instanced=True)
+    rest = np.array(handle.actors[0].mapper.dataset.points)
+    handle.translate([(1,0,0),(0,0,0)])
+    n = crystal.pattern.elements[0].grid.n_points
+    points = handle.actors[0].mapper.dataset.points
+    assert np.allclose(points[:n],rest[:n]+(1,0,0))
+    assert np.array_equal(points[n:],rest[n:])
+    handle.translate(np.zeros((2,3)))
+    assert np.array_equal(handle.actors[0].mapper.dataset.points,rest)
+
+def test_transform_moves_the_actors(plotter):
+    handle = plotter.add(Element(pv.Sphere(),"blue"))
+    matrix = np.eye(4)
+    matrix[0:3,3] = (1,2,3)
+    handle.transform(matrix)
+    assert np.array_equal(handle.actors[0].user_matrix,matrix)
+
+def test_image_data_is_moved_rigidly(plotter):
+    from phyvista import light
+    beam = light.StraightBeam(ORIGIN,2*U_X,0.2,style="semirealistic",backend="image")
+    handle = plotter.add(Group([Element(pv.Sphere(),"red"),beam]))
+    rest = np.array(handle.actors[1].user_matrix)
+    sphere_points = np.array(handle.actors[0].mapper.dataset.points)
+    handle.translate([(0,1,0),(0,0,1)])
+    assert np.allclose(handle.actors[0].mapper.dataset.points,sphere_points+(0,1,0))
+    expected = rest.copy()
+    expected[0:3,3] += (0,0,1)
+    assert np.allclose(handle.actors[1].user_matrix,expected)
+    matrix = np.eye(4)
+    matrix[0:3,3] = (5,0,0)
+    handle.transform(matrix)
+    assert np.allclose(handle.actors[1].user_matrix,matrix @ expected)
+    handle.translate(np.zeros((2,3)))
+    assert np.allclose(handle.actors[1].user_matrix,matrix @ rest)
+
+def test_image_data_cannot_be_displaced(plotter):
+    from phyvista import light
+    handle = plotter.add(light.StraightBeam(ORIGIN,2*U_X,0.2,style="semirealistic",backend="image"))
+    with pytest.raises(TypeError,match="implicit"):
+        handle.displace(np.zeros((handle.actors[0].mapper.dataset.n_points,3)))
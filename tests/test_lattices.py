@@ -0,0 +1,88 @@
+import itertools
+import numpy as np
+import pytest
+import pyvista as pv
+from phyvista.core import *
+from phyvista import lattices as lat
+from phyvista.constructors import CylindersStartEnd
+
+def cubicCrystal():
+    crystal = lat.Crystal(ORIGIN,[U_X,U_Y,U_Z])
+    crystal.addNewElement(pv.Cube(x_length=0.3,y_length=0.3,z_length=0.3),"red",[(0,0,0)])
+    return crystal
+
+def exposedCells(occupied):
+    """Brute force : set of the occupied cells with at least one empty neighbour (sharing a face, an edge or a corner)."""
+    exposed = set()
+    for cell in zip(*np.nonzero(occupied)):
+        for offset in itertools.product((-1,0,1),repeat=3):
+            neighbour = tuple(c+o for c,o in zip(cell,offset))
+            if any(n < 0 or n >= s for n,s in zip(neighbour,occupied.shape)) or not occupied[neighbour]:
+                exposed.add(tuple(int(c) for c in cell))
+                break
+    return exposed
+
+def test_visible_cells_of_a_cube():
+    crystal = cubicCrystal()
+    visible = crystal.visibleIndices((0,9),(0,9),(0,9))
+    assert len(visible) == 10**3-8**3 == 488
+    assert np.all(np.any((visible == 0) | (visible == 9),axis=1))
+    assert len(np.unique(visible,axis=0)) == 488
+    assert len(crystal.visibleIndices((0,9),(0,9),(0,9),depth=2)) == 10**3-6**3
+
+def test_cutaway_exposes_the_cells_behind():
+    crystal = cubicCrystal()
+    cutaway = lambda indices: np.all(indices >= 5,axis=1) # Removes a corner of the cube
+    visible = {tuple(int(i) for i in cell) for cell in crystal.visibleIndices((0,9),(0,9),(0,9),cutaway=cutaway)}
+    indices,occupied = crystal.occupancy((0,9),(0,9),(0,9),cutaway=cutaway)
+    assert visible == exposedCells(occupied)
+    assert (4,7,7) in visible and (7,4,7) in visible and (4,4,4) in visible # Faces and corner of the cut
+    assert (4,7,7) not in {tuple(int(i) for i in cell) for cell in crystal.visibleIndices((0,9),(0,9),(0,9))}
+    assert not any(all(i >= 5 for i in cell) for cell in visible)
+
+@pytest.mark.parametrize("instanced",[False,True])
+def test_culled_plot(plotter,instanced):
+    crystal = cubicCrystal()
+    culled = crystal.plotSelf(plotter,(0,3),(0,3),(0,3),instanced=instanced,cull_interior=True)
+    assert culled.n_instances == 4**3-2**3
+    plain = crystal.plotSelf(plotter,(0,3),(0,3),(0,3),instanced=instanced)
+    assert plain.n_instances == 4**3
+    n_points = crystal.pattern.elements[0].grid.n_points
+    assert sum(actor.mapper.dataset.n_points for actor in culled.actors) == n_points*culled.n_instances
+    plotter.render()
+
+def bruteForcePairs(points,distance):
+    distances = np.linalg.norm(points[:,None,:]-points[None,:,:],axis=2)
+    i,j = np.nonzero(np.triu(distances <= distance,k=1))
+    return set(zip(i.tolist(),j.tolist()))
+
+def test_neighbour_pairs_match_the_brute_force_search():
+    distance = 0.625 # Exactly representable, as all the coordinates below : the pairs at the cutoff are exactly at the cutoff
+    rng = np.random.default_rng(0)
+    points = [(0,0,0)] + list(np.round(rng.uniform(0,3,(300,3))*64)/64)
+    points += [(1,1,1),(1.625,1,1),(2,2,2),(2.375,2.5,2)] # At the cutoff, along an axis and in a diagonal
+    points += [(0.615,0.1,0.1),(0.635,0.1,0.1),(0.62,0.62,0.62),(0.63,0.63,0.63)] # On each side of a face and of a corner of the cells
+    points = np.array(points,dtype=np.float64)
+    i,j = lat.neighbourPairs(points,distance)
+    pairs = {(min(a,b),max(a,b)) for a,b in zip(i.tolist(),j.tolist())}
+    assert len(pairs) == len(i) and np.all(i != j) # Each pair once, without self-pairs
+    n = len(points)
+    assert {(n-8,n-7),(n-6,n-5),(n-4,n-3),(n-2,n-1)} <= pairs
+    assert pairs == bruteForcePairs(points,distance)
+    assert len(lat.neighbourPairs(points[0:1],distance)[0]) == 0
+
+def grapheneCrystal():
+    crystal = lat.Crystal(ORIGIN,lat.hexagonalLatticeVectors())
+    crystal.addNewElement(pv.Sphere(radius=0.1),"black",(0,0),species="C")
+    crystal.addNewElement(pv.Sphere(radius=0.1),"black",(2/3,1/3),species="C")
+    return crystal
+
+def test_graphene_bonds():
+    crystal = grapheneCrystal()
+    n = 9 # Cells along each lattice vector, as in examples/example_graphene.py
+    points,species = crystal.sitePositions((-4,4),(-4,4))
+    i,j = lat.neighbourPairs(points,0.6)
+    assert np.allclose(np.linalg.norm(points[i]-points[j],axis=1),1/np.sqrt(3)) # Only the nearest neighbours
+    assert len(i) == n**2 + n*(n-1) + (n-1)**2 == len(bruteForcePairs(points,0.6)) # Bonds of each first atom with the second atom of the cells (0,0), (-1,0) and (-1,-1)
+    bonds = crystal.bonds((-4,4),(-4,4),rules={("C","C"):0.6},radius=0.03,resolution=8)
+    assert bonds.grid.n_cells == len(i)*CylindersStartEnd([ORIGIN],[U_X],0.03,8).n_cells
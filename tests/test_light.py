@@ -0,0 +1,64 @@
+import warnings
+import numpy as np
+import pytest
+import pyvista as pv
+from phyvista.core import *
+from phyvista import light
+
+@pytest.mark.parametrize("style",["simple","semirealistic"])
+def test_unknown_backend(style):
+    with pytest.raises(ValueError):
+        light.StraightBeam(ORIGIN,U_X,0.1,style=style,backend="voxels")
+    with pytest.raises(ValueError):
+        light.FocusedBeam(ORIGIN,U_X,0.5,starting_radius=0.1,style=style,backend="voxels")
+
+def test_clipped_beam():
+    normal = np.array((1.0,1.0,0))
+    with warnings.catch_warnings():
+        warnings.simplefilter("error",pv.PyVistaDeprecationWarning)
+        beam = light.StraightBeam(ORIGIN,4*U_X,0.2,style="semirealistic",clipping_normal_start=normal,clipping_normal_end=normal)
+    points = beam.grid.points
+    assert np.all(points @ normalized(normal) >= -1e-6)
+    assert np.all((points-4*U_X) @ normalized(normal) <= 1e-6)
+    assert np.all(np.isfinite(beam.grid["intensity"]))
+
+def test_focused_image_grid_resolves_the_waist():
+    pos1,pos2,focus = ORIGIN,4*U_X,0.3
+    grid,matrix = light.FocusedBeamImageGrid(pos1,pos2,focus,starting_radius=0.3,resolution_height=20)
+    field = light.focusedBeamField(pos1,pos2,focus,starting_radius=0.3)
+    assert np.isclose(grid["intensity"].max(),field(np.array([focus*pos2]))[0],rtol=1e-5) # A sample is on the focusing point
+    spacing = grid.spacing
+    assert spacing[1] <= field.profile(focus+spacing[0]/4)/2 # Two samples across the narrowest section resolved along the axis
+    x_min,x_max = grid.bounds[0:2]
+    assert x_min <= 0 and x_max >= 4
+
+def test_image_backend_matches_the_unstructured_grid():
+    image = light.FocusedBeam(ORIGIN,4*U_X,0.5,starting_radius=0.3,style="semirealistic",backend="image")
+    unstructured = light.FocusedBeam(ORIGIN,4*U_X,0.5,starting_radius=0.3,style="semirealistic")
+    points = np.array(((1.0,0.05,0),(2.5,0,0.02),(3.2,-0.1,0.1)))
+    assert np.allclose(image.worldField()(points),unstructured.worldField()(points))
+    bounds = np.array(image.grid.bounds).reshape(3,2)
+    assert np.all(bounds[:,0] <= np.array(unstructured.grid.bounds).reshape(3,2)[:,0]+1e-6)
+
+@pytest.mark.parametrize("surfacic_cells",[False,True])
+@pytest.mark.parametrize("profile,max_radius,profile_integral",[(lambda p:1.0,1.0,1.0),(lambda p:0.5+p,1.5,13/12)],ids=["constant","cone"])
+def test_cylindrical_volume_grid(surfacic_cells,profile,max_radius,profile_integral):
+    grid = light.CylindricalVolumeGrid(ORIGIN,U_X,profile,resolution_height=5,resolution_radius=4,resolution_theta=6,surfacic_cells=surfacic_cells)
+    assert grid.n_points == 5 + 3*6*5 # Axis, then 3 cylinders of 6 points on 5 stops
+    assert np.array_equal(grid["r"][0:5],np.zeros(5))
+    assert np.isclose(grid["r"].max(),max_radius) and grid["r"].min() == 0
+    assert np.array_equal(np.unique(grid["axis_param"]),np.linspace(0,1,5))
+    hexagon_area = 3*np.sqrt(3)/2 # Sections are hexagons of unit radius (times the profile)
+    if surfacic_cells:
+        assert grid.n_cells == 3*4*6 and np.all(grid.celltypes == pv.CellType.QUAD)
+        areas = grid.compute_cell_sizes(length=False,volume=False)["Area"]
+        assert np.all(areas > 0)
+    else:
+        assert grid.n_cells == 6*4 + 2*2*4*6 and np.all(grid.celltypes == pv.CellType.WEDGE) # Wedges around the axis, then hexahedrons split in two
+        volumes = grid.compute_cell_sizes(length=False,area=False)["Volume"]
+        assert np.all(volumes > 0) and np.isclose(volumes.sum(),hexagon_area*profile_integral)
+
+def test_cylindrical_volume_grid_included_parameter():
+    grid = light.CylindricalVolumeGrid(ORIGIN,U_X,lambda p:1.0,resolution_height=5,resolution_radius=4,resolution_theta=6,include_parameter=0.3)
+    assert grid.n_points == 6 + 3*6*6 and grid.n_cells == 6*5 + 2*2*5*6
+    assert np.allclose(np.unique(grid["axis_param"]),(0,0.25,0.3,0.5,0.75,1))
@@ -0,0 +1,66 @@
+import pickle
+import numpy as np
+import pytest
+import pyvista as pv
+from phyvista.core import *
+from phyvista import materials as mat
+
+def test_materials_are_interned():
+    assert mat.Material(color="red",opacity=0.5) is mat.Material(opacity=0.5,color="red")
+    assert mat.Material(color=[1,0,0]) is mat.Material(color=(1,0,0))
+    assert mat.Material(color="red") is not mat.Material(color="blue")
+    assert mat.Material(color="red") is not mat.Material("volume",color="red")
+
+def test_materials_are_immutable():
+    material = mat.Material(color="red")
+    with pytest.raises(AttributeError):
+        material.renderingStyle = "volume"
+    with pytest.raises(TypeError):
+        material.properties["color"] = "blue"
+    with pytest.raises(TypeError):
+        material.modify(color="blue")
+    assert material.copy() is material
+
+def test_variant():
+    metal = mat.getMETAL("dark")
+    gold = metal.variant(color="gold")
+    assert gold.properties["color"] == "gold"
+    assert metal.properties["color"] == "white"
+    assert gold is metal.variant(color="gold")
+    assert metal.variant(color=metal.properties["color"]) is metal
+
+def test_pickled_materials_are_interned():
+    material = mat.SmoothMaterial("#00aaff")
+    assert pickle.loads(pickle.dumps(material)) is material
+    element = pickle.loads(pickle.dumps(Element(pv.Sphere(),material)))
+    assert element.material is material
+
+def test_actors_of_a_material_share_their_property(plotter):
+    material = mat.Material(color="red",specular=0.5)
+    actor1 = mat.plotGridWithMaterial(plotter,pv.Sphere(),material)
+    actor2 = mat.plotGridWithMaterial(plotter,pv.Cube(),material)
+    actor3 = mat.plotGridWithMaterial(plotter,pv.Cube(),mat.SmoothMaterial("red"))
+    assert actor1.prop is actor2.prop
+    assert actor3.prop is not actor1.prop
+    assert np.allclose(actor2.prop.color.float_rgb,(1,0,0))
+    assert actor2.prop.specular == 0.5
+
+def test_properties_are_not_shared_between_plotters():
+    material = mat.Material(color="red")
+    plotter1,plotter2 = pv.Plotter(off_screen=True),pv.Plotter(off_screen=True)
+    try:
+        actor1 = mat.plotGridWithMaterial(plotter1,pv.Sphere(),material)
+        plotter2.theme.show_edges = True
+        actor2 = mat.plotGridWithMaterial(plotter2,pv.Sphere(),material)
+        assert actor1.prop is not actor2.prop
+        assert actor2.prop.show_edges and not actor1.prop.show_edges
+    finally:
+        plotter1.close()
+        plotter2.close()
+
+def test_theme_changes_are_followed(plotter):
+    material = mat.Material(color="red")
+    actor1 = mat.plotGridWithMaterial(plotter,pv.Sphere(),material)
+    plotter.theme.show_edges = True
+    actor2 = mat.plotGridWithMaterial(plotter,pv.Sphere(),material)
+    assert actor2.prop.show_edges and not actor1.prop.show_edges
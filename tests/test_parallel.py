@@ -0,0 +1,41 @@
+import os
+import numpy as np
+import pytest
+import pyvista as pv
+from phyvista.core import *
+from phyvista import light,optics
+from phyvista.parallel import SceneBuilder
+
+def sharedBlocks():
+    return {name for name in os.listdir("/dev/shm") if name.startswith("psm_")} if os.path.isdir("/dev/shm") else set()
+
+def spheres(n):
+    group = Group()
+    for i in range(n):
+        group.elements.append(Element(pv.Sphere(center=(i,0,0)),"red"))
+    return group
+
+def failing(n):
+    raise RuntimeError("Construction failed")
+
+def builder(*tasks):
+    builder = SceneBuilder()
+    for task in tasks:
+        builder.add(*task)
+    return builder
+
+def test_parallel_build_matches_serial_build():
+    tasks = [(optics.BiconvexLens,(0,0,0),U_X,0.5,1),(spheres,3),(light.StraightBeam,(0,0,0),(2,0,0),0.3)]
+    serial,parallel = builder(*tasks).build(processes=1),builder(*tasks).build(processes=2)
+    assert len(serial.elements) == len(parallel.elements) == 5
+    for element1,element2 in zip(serial.elements,parallel.elements):
+        assert type(element1) == type(element2)
+        assert element1.material is element2.material
+        assert np.allclose(element1.grid.points,element2.grid.points)
+        assert element1.grid.n_cells == element2.grid.n_cells
+
+def test_failed_build_frees_the_shared_memory():
+    before = sharedBlocks()
+    with pytest.raises(RuntimeError):
+        builder((spheres,4),(failing,1),(spheres,2)).build(processes=2)
+    assert sharedBlocks() <= before
@@ -0,0 +1,39 @@
+import json
+import pyvista as pv
+from phyvista.core import *
+from phyvista import lattices as lat
+from phyvista import optics
+from phyvista.profiling import profile
+
+def sphereCrystal():
+    crystal = lat.Crystal(ORIGIN,[U_X,U_Y,U_Z])
+    crystal.addElement(Element(pv.Sphere(theta_resolution=8,phi_resolution=8),"red"),[(0,0,0),(0.5,0.5,0.5)])
+    return crystal
+
+def addRecords(profiler):
+    return {record["name"]:record for record in profiler.records if record["category"] == "Plotter.add"}
+
+def test_plotter_add_counts(plotter):
+    crystal = sphereCrystal()
+    sphere = pv.Sphere(theta_resolution=8,phi_resolution=8)
+    with profile() as profiler:
+        plotter.add(crystal,(0,1),(0,0),(0,0))
+        plotter.add(Element(sphere,"blue"))
+        plotter.add(optics.Mirror((0,0,0),U_X))
+    records = addRecords(profiler)
+    assert records["add(Crystal)"]["actors"] == 4
+    assert records["add(Crystal)"]["points"] == 4*sphere.n_points
+    assert records["add(Crystal)"]["cells"] == 4*sphere.n_cells
+    assert records["add(Element)"]["actors"] == 1
+    assert records["add(Element)"]["points"] == sphere.n_points
+    for name in ("add(Crystal)","add(Element)","add(OpticsElement)"):
+        assert records[name]["points"] > 0 and records[name]["cells"] > 0 and records[name]["bytes"] > 0
+
+def test_summary_and_trace(tmp_path):
+    with profile() as profiler:
+        sphereCrystal().bonds((0,1),(0,1),(0,1),cutoff=0.9)
+    assert profiler.summary()
+    assert "category" in profiler.table()
+    profiler.exportTrace(tmp_path/"trace.json")
+    with open(tmp_path/"trace.json") as file:
+        assert "traceEvents" in json.load(file)
@@ -0,0 +1,44 @@
+import numpy as np
+from phyvista.core import *
+from phyvista import optics
+from phyvista.raytracing import parallelRays,traceRays
+
+def test_parallel_rays_meet_at_the_focal_length():
+    lens = optics.BiconvexLens(ORIGIN,U_X,0.5,1.0) # Focal length 1/((1.5-1)*(1/1+1/1)) = 1
+    assert np.isclose(lens.focal_length,1.0)
+    origins,directions = parallelRays(-U_X,U_X,0.4,n=9)
+    paths = traceRays(origins,directions,[lens])
+    assert len(paths.starts) == 2*9
+    refracted = np.isclose(paths.starts[:,0],0) & (np.abs(paths.starts[:,1]) > 1e-9)
+    assert np.count_nonzero(refracted) == 8
+    starts,directions = paths.starts[refracted],paths.ends[refracted]-paths.starts[refracted]
+    crossings = starts - (starts[:,1]/directions[:,1])[:,None]*directions # Points where the rays cross the axis
+    assert np.allclose(crossings,lens.focal_length*U_X)
+
+def test_mirror_reflection_angle():
+    normal = np.array((-np.cos(np.radians(20)),np.sin(np.radians(20)),0))
+    mirror = optics.Mirror(ORIGIN,normal)
+    paths = traceRays([(-2,0,0)],[U_X],[mirror])
+    assert len(paths.starts) == 2
+    assert np.allclose(paths.ends[0],ORIGIN) and np.allclose(paths.starts[1],ORIGIN)
+    reflected = normalized(paths.ends[1]-paths.starts[1])
+    assert np.isclose(np.dot(reflected,normal),-np.dot(U_X,normal)) # Same angle with the normal, on the other side
+    assert np.isclose(np.degrees(np.arccos(np.dot(reflected,U_X))),180-2*20)
+    assert np.isclose(reflected[2],0) # In the plane of incidence
+
+def test_splitter_intensity_and_ray_count():
+    splitter = optics.CubicSplitter(ORIGIN,U_X,U_Y,size=1.0)
+    origins,directions = parallelRays(-2*U_X,U_X,0.2,n=5)
+    paths = traceRays(origins,directions,[splitter])
+    assert len(paths.starts) == 5+2*5 # Incoming, transmitted and reflected rays
+    assert np.array_equal(np.bincount(paths.rays),np.full(5,3))
+    split = paths.intensities[len(origins):]
+    assert np.allclose(split,0.5)
+    for ray in range(5):
+        split_rays = (paths.rays == ray) & (np.arange(len(paths.rays)) >= 5)
+        assert np.isclose(paths.intensities[split_rays].sum(),1.0) # Energy is conserved
+    outgoing = paths.ends[5:]-paths.starts[5:]
+    outgoing /= np.linalg.norm(outgoing,axis=1,keepdims=True)
+    assert np.allclose(outgoing[0:5],U_X) and np.allclose(outgoing[5:],-U_Y)
+    dropped = traceRays(origins,directions,[splitter],min_intensity=0.6)
+    assert len(dropped.starts) == 5
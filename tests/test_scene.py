@@ -0,0 +1,81 @@
+import numpy as np
+import pyvista as pv
+from phyvista.core import *
+from phyvista import light,optics
+from phyvista import lattices as lat
+from phyvista import materials as mat
+from phyvista.scene import Scene
+
+NOTHING = {"added":0,"removed":0,"moved":0,"restyled":0,"readded":0}
+
+def counts(**changes):
+    return {**NOTHING,**changes}
+
+def makeScene():
+    mirror = optics.Mirror((0,0,0),(1,1,0))
+    lens = optics.BiconvexLens((3,0,0),U_X,0.5,1.5)
+    beams = Group([light.StraightBeam((-3,0,0),(0,0,0),0.1),light.StraightBeam((0,0,0),(0,3,0),0.1,style="semirealistic")])
+    crystal = lat.Crystal((0,-4,0),[U_X,U_Y,U_Z])
+    crystal.addNewElement(pv.Sphere(radius=0.1),"red",(0,0,0))
+    scene = Scene([mirror,lens,beams])
+    scene.add(crystal,(0,1),(0,1),(0,1),instanced=True)
+    return scene,mirror,lens,beams,crystal
+
+def test_sync_counts(plotter):
+    scene,mirror,lens,beams,crystal = makeScene()
+    assert scene.sync(plotter) == counts(added=5)
+    assert len(plotter.actors) == 5
+    assert scene.sync(plotter) == NOTHING
+    lens.translate((0.5,0,0),inplace=True)
+    assert scene.sync(plotter) == counts(moved=1)
+    lens.material = lens.material.variant(color="gold")
+    assert scene.sync(plotter) == counts(restyled=1)
+    mirror.material = lens.material
+    assert scene.sync(plotter) == counts(restyled=1)
+    beams.append(light.StraightBeam((0,3,0),(3,3,0),0.1))
+    assert scene.sync(plotter) == counts(added=1)
+    beams.elements.pop(0)
+    assert scene.sync(plotter) == counts(removed=1)
+    scene.remove(lens)
+    assert scene.sync(plotter) == counts(removed=1)
+    crystal.addNewElement(pv.Sphere(radius=0.1),"blue",(0.5,0.5,0.5))
+    assert scene.sync(plotter) == counts(removed=1,added=2)
+    assert len(plotter.actors) == 5
+
+def test_restyle_without_a_shared_property(plotter):
+    sphere = Element(pv.Sphere(),mat.Material(specular=0.5))
+    scene = Scene([sphere])
+    scene.sync(plotter)
+    actor = next(iter(plotter.actors.values()))
+    sphere.material = mat.Material(specular=0.8,opacity=0.5,pbr=True)
+    assert scene.sync(plotter) == counts(restyled=1)
+    assert next(iter(plotter.actors.values())) is actor
+    assert actor.prop.specular == 0.8 and actor.prop.opacity == 0.5
+    assert actor.prop.interpolation == pv.plotting.opts.InterpolationType.PBR
+
+def test_synced_scene_looks_like_a_fresh_plot():
+    scene,mirror,lens,beams,crystal = makeScene()
+    plotter1 = pv.Plotter(off_screen=True,window_size=(300,200))
+    plotter2 = pv.Plotter(off_screen=True,window_size=(300,200))
+    try:
+        scene.sync(plotter1)
+        lens.translate((0.5,0,0),inplace=True)
+        lens.material = lens.material.variant(color="gold")
+        mirror.rotate_z(10,inplace=True)
+        scene.sync(plotter1)
+        scene.sync(plotter2)
+        plotter2.camera = plotter1.camera
+        image1 = plotter1.screenshot(return_img=True).astype(int)
+        image2 = plotter2.screenshot(return_img=True).astype(int)
+        assert np.abs(image1-image2).max() <= 1
+    finally:
+        plotter1.close()
+        plotter2.close()
+
+def test_plot_self_returns_a_handle(plotter):
+    scene,mirror,lens,beams,crystal = makeScene()
+    handle = plotter.add(scene)
+    assert isinstance(handle,Handle)
+    assert len(handle.actors) == 5
+    assert handle.n_instances == 4+8 # Elements, then the cells of the instanced crystal
+    assert scene.plotSelf(plotter).actors == handle.actors
@@ -0,0 +1,83 @@
+import os
+import pickle
+import numpy as np
+import pytest
+import pyvista as pv
+from phyvista.core import *
+from phyvista import light,optics
+from phyvista import materials as mat
+from phyvista.serialization import elementFromArrays,elementToArrays,gridFromArrays,gridToArrays,load,save
+
+def assertSameGrid(grid1,grid2):
+    assert type(grid1) == type(grid2)
+    assert grid1.n_points == grid2.n_points and grid1.n_cells == grid2.n_cells
+    assert np.allclose(grid1.points,grid2.points)
+    for name in grid1.point_data.keys():
+        assert np.allclose(grid1.point_data[name],grid2.point_data[name])
+    for name in grid1.cell_data.keys():
+        assert np.allclose(grid1.cell_data[name],grid2.cell_data[name])
+    for data1,data2 in ((grid1.point_data,grid2.point_data),(grid1.cell_data,grid2.cell_data)):
+        assert (data1.active_scalars_name,data1.active_vectors_name,data1.active_normals_name) == (data2.active_scalars_name,data2.active_vectors_name,data2.active_normals_name)
+
+def grids():
+    sphere = pv.Sphere()
+    sphere["height"] = sphere.points[:,2]
+    sphere.cell_data["index"] = np.arange(sphere.n_cells)
+    lines = pv.PolyData(np.array(((0,0,0),(1,0,0),(1,1,0.0))),lines=np.array((3,0,1,2)))
+    image = pv.ImageData(dimensions=(3,4,5),spacing=(0.1,0.2,0.3),origin=(1,2,3))
+    image["values"] = np.arange(image.n_points,dtype=np.float32)
+    return [sphere,lines,pv.Sphere().cast_to_unstructured_grid(),pv.ImageData(dimensions=(3,3,3)).cast_to_structured_grid(),image]
+
+@pytest.mark.parametrize("grid",grids(),ids=lambda grid:type(grid).__name__)
+def test_grid_round_trip(grid,tmp_path):
+    assertSameGrid(gridFromArrays(type(grid).__name__,gridToArrays(grid)),grid)
+    save(grid,tmp_path/"grid")
+    assertSameGrid(load(tmp_path/"grid"),grid)
+    assertSameGrid(load(tmp_path/"grid",mmap=False),grid)
+
+def test_element_round_trip(tmp_path):
+    lens = optics.BiconvexLens((1,0,0),U_Y,0.5,1).rotate_x(30)
+    copy = elementFromArrays(*elementToArrays(lens))
+    assert type(copy) == optics.OpticsElement
+    assert copy.material is lens.material
+    assert np.array_equal(copy.center,lens.center) and np.array_equal(copy.matrix,lens.matrix)
+    assertSameGrid(copy.grid,lens.grid)
+    save(lens,tmp_path/"lens")
+    loaded = load(tmp_path/"lens")
+    assert loaded.material is lens.material
+    assertSameGrid(loaded.grid,lens.grid)
+
+def test_group_round_trip(tmp_path):
+    group = Group([Element(pv.Cube(),mat.SmoothMaterial("red")),light.StraightBeam(ORIGIN,U_X,0.1,style="semirealistic")])
+    save(group,tmp_path/"group")
+    loaded = load(tmp_path/"group")
+    assert len(loaded.elements) == 2
+    for element1,element2 in zip(loaded.elements,group.elements):
+        assert element1.material is element2.material
+        assertSameGrid(element1.grid,element2.grid)
+    points = np.array([(0.5,0,0.02)])
+    assert np.allclose(loaded.elements[1].worldField()(points),group.elements[1].worldField()(points))
+
+def test_loaded_arrays_are_copy_on_write(tmp_path):
+    save(pv.Sphere(),tmp_path/"sphere")
+    grid = load(tmp_path/"sphere")
+    grid.points[:] += 1
+    assert np.allclose(load(tmp_path/"sphere").points,pv.Sphere().points)
+
+def test_save_replaces_the_directory(tmp_path):
+    save(pv.Sphere(),tmp_path/"entry")
+    save(pv.Cube(),tmp_path/"entry")
+    assert load(tmp_path/"entry").n_points == pv.Cube().n_points
+    assert os.listdir(tmp_path) == ["entry"] # No temporary or old directory left
+
+def test_elements_are_picklable():
+    element = Element(pv.Sphere(),"red").translate((1,0,0))
+    copy = pickle.loads(pickle.dumps(element))
+    assert copy.material is element.material
+    assertSameGrid(copy.grid,element.grid)
+
+def test_unsupported_objects():
+    with pytest.raises(TypeError):
+        gridToArrays(pv.RectilinearGrid(np.arange(3.0)))
+    with pytest.raises(TypeError):
+        save("not a grid","/tmp/never_written")